@@ -0,0 +1,305 @@
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pysyslink_toolkit.HighLevelBlock import HighLevelBlock
+from pysyslink_toolkit.LowLevelBlockStructure import LowLevelBlockStructure
+from pysyslink_toolkit.PortType import PortType
+from pysyslink_toolkit.block_libraries.BlockLibraryPlugin import BlockLibraryPlugin
+from pysyslink_toolkit.block_libraries.BlockLibraryPluginConfig import BlockTypeConfig
+from pysyslink_toolkit.user_cache import atomic_write, get_user_cache_dir, is_env_flag_set, is_user_cache_disabled
+
+logger = logging.getLogger(__name__)
+
+
+# Bump when the key or the layout of the disk entries changes
+CACHE_FORMAT_VERSION = 1
+
+DISK_CACHE_ENV_VAR = "PYSYSLINK_TOOLKIT_BLOCK_COMPILATION_DISK_CACHE"
+
+# Fixed, so that keys do not change with pickle.HIGHEST_PROTOCOL
+_PICKLE_PROTOCOL = 4
+
+
+def _get_toolkit_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version("pysyslink_toolkit")
+    except Exception:
+        return "unknown"
+
+
+class _Uncacheable(Exception):
+    """
+    A block whose fields cannot be pickled, and so have no key.
+    """
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    except OSError:
+        return "missing"
+    return digest.hexdigest()
+
+
+def _get_plugin_source_files(plugin: BlockLibraryPlugin) -> List[str]:
+    """
+    Plugin config file, Python file of high-level plugins and the module of the plugin class.
+    """
+    paths = []
+    yaml_filename = plugin.block_library_plugin_config.yaml_filename
+    if yaml_filename:
+        paths.append(os.path.abspath(yaml_filename))
+    python_path = getattr(plugin, "python_path", None)
+    if python_path:
+        paths.append(os.path.abspath(str(python_path)))
+    module_file = getattr(sys.modules.get(type(plugin).__module__), "__file__", None)
+    if module_file:
+        paths.append(os.path.abspath(module_file))
+    return paths
+
+
+class BlockCompilationCache:
+    """
+    Cache of the LowLevelBlockStructure compiled by a plugin for each block.
+
+    Entries are keyed on a hash of everything compile_block sees: the block fields, its evaluated
+    properties and resolved port types, the BlockTypeConfig of its type, and the plugin (class,
+    version in the plugin metadata, and contents of its config file, Python file and class module).
+    A block whose properties cannot be pickled is compiled every time.
+
+    Entries are kept in memory (max_entries blocks, least recently used evicted). With a
+    disk_cache_dir, they are also pickled there and reused by other processes. Cached structures
+    are shared between compilations and must not be changed.
+
+    hits (in memory), disk_hits, misses and uncacheable count the lookups since the last reset_stats.
+    """
+
+    MAX_TYPE_PREFIXES = 4096
+    MAX_PORT_TYPE_REPRS = 4096
+
+    _default_instance: Optional["BlockCompilationCache"] = None
+
+    def __init__(self, disk_cache_dir: str | None = None, max_entries: int = 100_000):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.disk_cache_dir = disk_cache_dir
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, LowLevelBlockStructure]" = OrderedDict()
+        self._lock = threading.RLock()
+        # Pickles of the same values may differ between Python versions
+        self._key_prefix = f"{CACHE_FORMAT_VERSION}:{_get_toolkit_version()}:{sys.version}".encode("utf-8")
+        # (id of the plugin, id of the BlockTypeConfig, an unhashable dataclass) -> (plugin, config, key prefix)
+        self._type_prefixes: Dict[Tuple[int, int], Tuple[BlockLibraryPlugin, BlockTypeConfig, bytes]] = {}
+        # PortType -> repr, pickling the port types themselves costs more than the rest of a block
+        self._port_type_reprs: Dict[PortType, str] = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+
+    @classmethod
+    def get_default(cls) -> "BlockCompilationCache":
+        """
+        Shared cache, on disk in the user cache directory when PYSYSLINK_TOOLKIT_BLOCK_COMPILATION_DISK_CACHE
+        is set (and PYSYSLINK_TOOLKIT_DISABLE_CACHE is not).
+        """
+        if cls._default_instance is None:
+            disk_cache_dir = None
+            if is_env_flag_set(DISK_CACHE_ENV_VAR) and not is_user_cache_disabled():
+                disk_cache_dir = get_user_cache_dir("block_compilations")
+            cls._default_instance = cls(disk_cache_dir)
+        return cls._default_instance
+
+    def get_or_compile(
+        self,
+        block: HighLevelBlock,
+        plugin: BlockLibraryPlugin,
+        block_type_config: BlockTypeConfig,
+        compile_uncached: Callable[[], LowLevelBlockStructure],
+    ) -> LowLevelBlockStructure:
+        """
+        Structure of block, computed by compile_uncached() if no entry exists for it.
+        """
+        key, struct = self.lookup(block, plugin, block_type_config)
+        if struct is None:
+            struct = compile_uncached()
+            if key is not None:
+                self.store(key, struct)
+        return struct
+
+    def lookup(
+        self, block: HighLevelBlock, plugin: BlockLibraryPlugin, block_type_config: BlockTypeConfig
+    ) -> Tuple[str | None, LowLevelBlockStructure | None]:
+        """
+        (key, cached structure or None) of block. The key is None for blocks that cannot be cached.
+        """
+        try:
+            key = self.make_key(block, plugin, block_type_config)
+        except _Uncacheable as e:
+            logger.debug("Block %s is compiled without cache: %s", block.id, e)
+            with self._lock:
+                self.uncacheable += 1
+            return None, None
+
+        with self._lock:
+            struct = self._entries.get(key)
+            if struct is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return key, struct
+
+        if self.disk_cache_dir is not None:
+            struct = self._read_disk_entry(key)
+            if struct is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._store(key, struct)
+                return key, struct
+        return key, None
+
+    def store(self, key: str, struct: LowLevelBlockStructure) -> None:
+        """
+        Keep struct, compiled after a lookup of key found nothing.
+        """
+        with self._lock:
+            self.misses += 1
+            self._store(key, struct)
+        if self.disk_cache_dir is not None:
+            self._write_disk_entry(key, struct)
+
+    def make_key(self, block: HighLevelBlock, plugin: BlockLibraryPlugin, block_type_config: BlockTypeConfig) -> str:
+        # Equal pickles mean equal values; equal values pickling differently (set order, shared
+        # references) only cost a miss
+        try:
+            fields = pickle.dumps((
+                block.id, block.label, block.block_library, block.block_type, block.input_ports,
+                block.output_ports, self._port_type_keys(block.input_port_types),
+                self._port_type_keys(block.output_port_types), block.properties,
+            ), protocol=_PICKLE_PROTOCOL)
+        except Exception as e:
+            raise _Uncacheable(str(e)) from e
+        entry = self._type_prefixes.get((id(plugin), id(block_type_config)))
+        if entry is None or entry[0] is not plugin or entry[1] is not block_type_config:
+            entry = self._add_type_prefix(plugin, block_type_config)
+        digest = hashlib.blake2b(entry[2], digest_size=20)
+        digest.update(fields)
+        return digest.hexdigest()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses, "uncacheable": self.uncacheable}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.disk_hits = self.misses = self.uncacheable = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._type_prefixes.clear()
+            self._port_type_reprs.clear()
+            if self.disk_cache_dir is not None:
+                try:
+                    shards = os.listdir(self.disk_cache_dir)
+                except OSError:
+                    shards = []
+                for shard in shards:
+                    shard_dir = os.path.join(self.disk_cache_dir, shard)
+                    try:
+                        names = os.listdir(shard_dir)
+                    except OSError:
+                        continue
+                    for name in names:
+                        if name.endswith(".pickle"):
+                            try:
+                                os.remove(os.path.join(shard_dir, name))
+                            except OSError:
+                                pass
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ---------------------------------------------------------
+    # Key parts
+    # ---------------------------------------------------------
+
+    def _port_type_keys(self, port_types: List[PortType]) -> List[str]:
+        reprs = self._port_type_reprs
+        try:
+            return [reprs[port_type] for port_type in port_types]
+        except KeyError:
+            if len(reprs) >= self.MAX_PORT_TYPE_REPRS:
+                # The keys keep their port types alive, drop the ones of past edits
+                reprs.clear()
+            keys = []
+            for port_type in port_types:
+                key = reprs.get(port_type)
+                if key is None:
+                    key = reprs[port_type] = repr(port_type)
+                keys.append(key)
+            return keys
+
+    def _add_type_prefix(self, plugin: BlockLibraryPlugin, block_type_config: BlockTypeConfig) -> Tuple[BlockLibraryPlugin, BlockTypeConfig, bytes]:
+        """
+        Key prefix of the blocks of a type: the format and toolkit versions, the plugin (class,
+        version and source files) and the block type config. Plugins are loaded again by the
+        sessions when their files change, so the files are hashed once per plugin object.
+        """
+        plugin_config = plugin.block_library_plugin_config
+        digest = hashlib.sha256(self._key_prefix)
+        digest.update(f"{type(plugin).__module__}.{type(plugin).__qualname__}\0".encode("utf-8"))
+        digest.update(f"{plugin_config.pluginName}\0{plugin_config.metadata.get('version')}\0".encode("utf-8"))
+        for path in _get_plugin_source_files(plugin):
+            digest.update(f"{path}\0{_hash_file(path)}\0".encode("utf-8"))
+        digest.update(repr(block_type_config).encode("utf-8"))
+
+        entry = (plugin, block_type_config, digest.digest())
+        with self._lock:
+            if len(self._type_prefixes) >= self.MAX_TYPE_PREFIXES:
+                # Types of plugins loaded again
+                self._type_prefixes.clear()
+            self._type_prefixes[(id(plugin), id(block_type_config))] = entry
+        return entry
+
+    def _store(self, key: str, struct: LowLevelBlockStructure) -> None:
+        self._entries[key] = struct
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # ---------------------------------------------------------
+    # Disk entries
+    # ---------------------------------------------------------
+
+    def _disk_entry_path(self, key: str) -> str:
+        return os.path.join(self.disk_cache_dir, key[:2], key + ".pickle")
+
+    def _read_disk_entry(self, key: str) -> LowLevelBlockStructure | None:
+        try:
+            with open(self._disk_entry_path(key), "rb") as f:
+                struct = pickle.load(f)
+        except Exception:
+            # Missing or unreadable entries just compile the block
+            return None
+        if not isinstance(struct, LowLevelBlockStructure):
+            return None
+        return struct
+
+    def _write_disk_entry(self, key: str, struct: LowLevelBlockStructure) -> None:
+        path = self._disk_entry_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write(path, pickle.dumps(struct, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            # Structures of plugins that cannot be pickled are only cached in memory
+            pass
@@ -1,10 +1,17 @@
 from __future__ import annotations
 
+import sys
 from typing import Any, Dict, List, Optional
 
 from pysyslink_toolkit.PortType import PortType
+from pysyslink_toolkit.expression_evaluation import ExpressionResults, evaluate_expression
 
 class HighLevelBlock:
+    __slots__ = (
+        "id", "label", "input_ports", "input_port_types", "output_ports", "output_port_types",
+        "block_library", "block_type", "properties",
+    )
+
     def __init__(
         self,
         id: str,
@@ -31,7 +38,8 @@ class HighLevelBlock:
     def from_dict(
         cls,
         data: Dict[str, Any],
-        parameter_environment_namespace: Dict[str, Any]
+        parameter_environment_namespace: Dict[str, Any],
+        expression_results: ExpressionResults | None = None,
     ) -> "HighLevelBlock":
         # Required fields validation
         required_fields = [
@@ -44,14 +52,14 @@ class HighLevelBlock:
 
         # Type and format checks
         try:
-            block_id = str(data["id"])
+            block_id = sys.intern(str(data["id"]))
             label = str(data["label"])
             input_ports = int(data["inputPorts"])
             input_port_types = [PortType.from_dict(data_i) for data_i in data["inputPortTypes"]]
             output_ports = int(data["outputPorts"])
             output_port_types = [PortType.from_dict(data_o) for data_o in data["outputPortTypes"]]
-            block_library = str(data["blockLibrary"])
-            block_type = str(data["blockType"])
+            block_library = sys.intern(str(data["blockLibrary"]))
+            block_type = sys.intern(str(data["blockType"]))
         except (TypeError, ValueError) as e:
             raise ValueError(f"Invalid type for one of the HighLevelBlock fields: {e}")
 
@@ -70,18 +78,14 @@ class HighLevelBlock:
             # Evaluate expressions when appropriate
             if isinstance(value, str) and ptype != "string" and not ptype.startswith("enum(") and not ptype.startswith("options("):
                 try:
-                    evaluated = eval(
-                        value,
-                        parameter_environment_namespace,
-                        parameter_environment_namespace
-                    )
+                    evaluated = evaluate_expression(value, parameter_environment_namespace, expression_results)
                 except Exception as e:
                     raise ValueError(f"Error evaluating property '{key}' of type '{ptype}': {e}")
             else:
                 evaluated = value
 
-            parsed_props[key] = {
-                "type": ptype,
+            parsed_props[sys.intern(key)] = {
+                "type": sys.intern(ptype) if type(ptype) is str else ptype,
                 "value": evaluated
             }
 
@@ -97,6 +101,22 @@ class HighLevelBlock:
             properties=parsed_props,
         )
 
+    def copy(self) -> "HighLevelBlock":
+        """
+        Shallow copy, sharing the properties and port type lists.
+        """
+        block = HighLevelBlock.__new__(HighLevelBlock)
+        block.id = self.id
+        block.label = self.label
+        block.input_ports = self.input_ports
+        block.input_port_types = self.input_port_types
+        block.output_ports = self.output_ports
+        block.output_port_types = self.output_port_types
+        block.block_library = self.block_library
+        block.block_type = self.block_type
+        block.properties = self.properties
+        return block
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             "id": self.id,
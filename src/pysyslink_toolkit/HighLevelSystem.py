@@ -2,11 +2,17 @@ from __future__ import annotations
 
 from enum import Enum
 import json
+import logging
 import os
 import runpy
-from typing import Any, Dict, List, Optional, Tuple
+import sys
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
 from pysyslink_toolkit.HighLevelBlock import HighLevelBlock
+from pysyslink_toolkit.expression_evaluation import ExpressionResults
 from pysyslink_toolkit.PortType import PortCategory, PortType, PortType
+from pysyslink_toolkit import port_type_propagation
+
+logger = logging.getLogger(__name__)
 
 
 class Orientation(Enum):
@@ -22,12 +28,22 @@ class Orientation(Enum):
         else:
             raise ValueError(f"Invalid orientation value: {value}")
 
+def _intern(value: Any) -> Any:
+    """
+    Ids are repeated across blocks, links and targets, share one string object per id.
+    """
+    return sys.intern(value) if type(value) is str else value
+
+
 class SegmentNode:
-    def __init__(self, id: str, orientation: Orientation, xOrY: float, children: list["SegmentNode"]):
-        self.id = id
+    __slots__ = ("id", "orientation", "xOrY", "children")
+
+    def __init__(self, id: str, orientation: Orientation, xOrY: float, children: Sequence["SegmentNode"]):
+        self.id = _intern(id)
         self.orientation = orientation
         self.xOrY = xOrY
-        self.children = children
+        # Tuples do not over-allocate and leaves share the empty tuple
+        self.children = tuple(children)
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "SegmentNode":
@@ -40,7 +56,18 @@ class SegmentNode:
             id=data["id"],
             orientation=Orientation.from_string(data["orientation"]),
             xOrY=float(data["xOrY"]),
-            children=[cls.from_dict(c) for c in data.get("children", [])]
+            children=tuple(cls.from_dict(c) for c in data.get("children", ()))
+        )
+
+    def with_id_prefix(self, prefix: str) -> "SegmentNode":
+        """
+        Copy of the tree with every segment renamed to f"{prefix}_{id}".
+        """
+        return SegmentNode(
+            id=f"{prefix}_{self.id}",
+            orientation=self.orientation,
+            xOrY=self.xOrY,
+            children=[child.with_id_prefix(prefix) for child in self.children],
         )
 
     def to_dict(self):
@@ -52,19 +79,28 @@ class SegmentNode:
         }
 
 class TargetNodeInfo:
+    __slots__ = ("target_id", "port", "_x", "_y", "_geometry")
+
     def __init__(self, target_id: str, port: int, x: float, y: float):
-        self.target_id = target_id
+        self.target_id = _intern(target_id)
         self.port = port
-        self.x = x
-        self.y = y
+        self._x = x
+        self._y = y
+        # Raw data x and y are read from on first access, None once loaded
+        self._geometry: Optional[Dict[str, Any]] = None
 
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> "TargetNodeInfo":
+    def from_dict(cls, data: Dict[str, Any], load_geometry: bool = True) -> "TargetNodeInfo":
         required = ("targetId", "port", "x", "y")
         missing = [k for k in required if k not in data]
         if missing:
             raise ValueError(f"Missing fields in TargetNodeInfo: {', '.join(missing)}")
 
+        if not load_geometry:
+            target = cls(target_id=data["targetId"], port=int(data["port"]), x=None, y=None)
+            target._geometry = data
+            return target
+
         return cls(
             target_id=data["targetId"],
             port=int(data["port"]),
@@ -72,6 +108,44 @@ class TargetNodeInfo:
             y=float(data["y"])
         )
 
+    def copy(self) -> "TargetNodeInfo":
+        target = TargetNodeInfo.__new__(TargetNodeInfo)
+        target.target_id = self.target_id
+        target.port = self.port
+        target._x = self._x
+        target._y = self._y
+        target._geometry = self._geometry
+        return target
+
+    def _load_geometry(self) -> None:
+        data, self._geometry = self._geometry, None
+        self._x = float(data["x"])
+        self._y = float(data["y"])
+
+    @property
+    def x(self) -> float:
+        if self._geometry is not None:
+            self._load_geometry()
+        return self._x
+
+    @x.setter
+    def x(self, value: float) -> None:
+        if self._geometry is not None:
+            self._load_geometry()
+        self._x = value
+
+    @property
+    def y(self) -> float:
+        if self._geometry is not None:
+            self._load_geometry()
+        return self._y
+
+    @y.setter
+    def y(self, value: float) -> None:
+        if self._geometry is not None:
+            self._load_geometry()
+        self._y = value
+
     def to_dict(self):
         return {
             "targetId": self.target_id,
@@ -80,6 +154,11 @@ class TargetNodeInfo:
             "y": self.y,
         }
 class LinkData:
+    __slots__ = (
+        "id", "source_id", "source_port", "_source_x", "_source_y", "_segment_node", "target_nodes",
+        "_geometry", "_segment_id_prefix",
+    )
+
     def __init__(
         self,
         id: str,
@@ -90,16 +169,24 @@ class LinkData:
         segment_node: SegmentNode,
         target_nodes: Dict[str, TargetNodeInfo]
     ):
-        self.id = id
-        self.source_id = source_id
+        self.id = _intern(id)
+        self.source_id = _intern(source_id)
         self.source_port = source_port
-        self.source_x = source_x
-        self.source_y = source_y
-        self.segment_node = segment_node
+        self._source_x = source_x
+        self._source_y = source_y
+        self._segment_node = segment_node
         self.target_nodes = target_nodes
+        # Raw data the source position and segment tree are built from on first access, None once loaded
+        self._geometry: Optional[Dict[str, Any]] = None
+        # Prefix given to the segment ids while they were not loaded
+        self._segment_id_prefix: Optional[str] = None
 
     @classmethod
-    def from_dict(cls, data: Dict[str, Any], parameter_env=None):
+    def from_dict(cls, data: Dict[str, Any], parameter_env=None, load_geometry: bool = True):
+        """
+        With load_geometry False, the source position, the segment tree and the target positions
+        are only parsed if read. The segment ids keying target_nodes are always loaded.
+        """
         required = [
             "id", "sourceId", "sourcePort",
             "sourceX", "sourceY",
@@ -109,13 +196,26 @@ class LinkData:
         if missing:
             raise ValueError(f"Missing fields in LinkData: {', '.join(missing)}")
 
-        segment_root = SegmentNode.from_dict(data["segmentNode"])
-
         targets = {
-            seg_id: TargetNodeInfo.from_dict(tgt)
+            _intern(seg_id): TargetNodeInfo.from_dict(tgt, load_geometry)
             for seg_id, tgt in data["targetNodes"].items()
         }
 
+        if not load_geometry:
+            link = cls(
+                id=data["id"],
+                source_id=data["sourceId"],
+                source_port=int(data["sourcePort"]),
+                source_x=None,
+                source_y=None,
+                segment_node=None,
+                target_nodes=targets,
+            )
+            link._geometry = data
+            return link
+
+        segment_root = SegmentNode.from_dict(data["segmentNode"])
+
         return cls(
             id=data["id"],
             source_id=data["sourceId"],
@@ -126,6 +226,82 @@ class LinkData:
             target_nodes=targets,
         )
 
+    def copy(self, target_nodes: Optional[Dict[str, TargetNodeInfo]] = None) -> "LinkData":
+        """
+        Shallow copy with its own target_nodes dict, a copy of this one unless given. The segment
+        tree is shared until renamed.
+        """
+        link = LinkData.__new__(LinkData)
+        link.id = self.id
+        link.source_id = self.source_id
+        link.source_port = self.source_port
+        link._source_x = self._source_x
+        link._source_y = self._source_y
+        link._segment_node = self._segment_node
+        link.target_nodes = dict(self.target_nodes) if target_nodes is None else target_nodes
+        link._geometry = self._geometry
+        link._segment_id_prefix = self._segment_id_prefix
+        return link
+
+    def _load_geometry(self) -> None:
+        data, self._geometry = self._geometry, None
+        self._source_x = float(data["sourceX"])
+        self._source_y = float(data["sourceY"])
+        self._segment_node = SegmentNode.from_dict(data["segmentNode"])
+        if self._segment_id_prefix is not None:
+            prefix, self._segment_id_prefix = self._segment_id_prefix, None
+            self.prefix_segment_ids(prefix)
+
+    def prefix_segment_ids(self, prefix: str) -> None:
+        """
+        Rename every segment of the tree to f"{prefix}_{id}", when it is loaded. The tree is
+        replaced by a renamed copy, trees shared with other links are left unchanged.
+        """
+        if self._geometry is not None:
+            # Prefixing twice, with a then b, gives f"{b}_{a}_{id}"
+            if self._segment_id_prefix is not None:
+                prefix = f"{prefix}_{self._segment_id_prefix}"
+            self._segment_id_prefix = prefix
+            return
+
+        self._segment_node = self._segment_node.with_id_prefix(prefix)
+
+    @property
+    def source_x(self) -> float:
+        if self._geometry is not None:
+            self._load_geometry()
+        return self._source_x
+
+    @source_x.setter
+    def source_x(self, value: float) -> None:
+        if self._geometry is not None:
+            self._load_geometry()
+        self._source_x = value
+
+    @property
+    def source_y(self) -> float:
+        if self._geometry is not None:
+            self._load_geometry()
+        return self._source_y
+
+    @source_y.setter
+    def source_y(self, value: float) -> None:
+        if self._geometry is not None:
+            self._load_geometry()
+        self._source_y = value
+
+    @property
+    def segment_node(self) -> SegmentNode:
+        if self._geometry is not None:
+            self._load_geometry()
+        return self._segment_node
+
+    @segment_node.setter
+    def segment_node(self, value: SegmentNode) -> None:
+        if self._geometry is not None:
+            self._load_geometry()
+        self._segment_node = value
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -139,6 +315,8 @@ class LinkData:
 
 
 class SubsystemData:
+    __slots__ = ("id", "label", "input_ports", "input_port_types", "output_ports", "output_port_types", "json_data")
+
     def __init__(
         self,
         id: str,
@@ -149,7 +327,7 @@ class SubsystemData:
         output_port_types: List[PortType],
         json_data: HighLevelSystem,
     ):
-        self.id = id
+        self.id = _intern(id)
         self.label = label
         self.input_ports = input_ports
         self.input_port_types = input_port_types
@@ -161,7 +339,8 @@ class SubsystemData:
     def from_dict(
         cls,
         data: Dict[str, Any],
-        parameter_environment_namespace: Dict[str, Any]
+        parameter_environment_namespace: Dict[str, Any],
+        load_geometry: bool = True,
     ) -> "HighLevelBlock":
         # Required fields validation
         required_fields = [
@@ -184,7 +363,7 @@ class SubsystemData:
             raise ValueError(f"Invalid type for one of the HighLevelBlock fields: {e}")
 
         raw_json_data = data["jsonData"]
-        json_data = HighLevelSystem.from_dict(raw_json_data, parameter_environment_namespace)
+        json_data = HighLevelSystem.from_dict(raw_json_data, parameter_environment_namespace, load_geometry)
 
         return cls(
             id=block_id,
@@ -204,11 +383,232 @@ class SubsystemData:
             "inputPortTypes": self.input_port_types,
             "outputPorts": self.output_ports,
             "outputPortTypes": self.output_port_types,
-            "blockLibrary": self.block_library,
-            "blockType": self.block_type,
-            "properties": self.properties,
+            "jsonData": self.json_data.to_dict(),
         }
 
+class _Scope:
+    """
+    A subsystem instance while flattening: the path of subsystem ids leading to it, as a tuple of
+    interned strings. Ids inside it are kept as (scope, id) pairs and only joined into the final
+    f"{path[0]}_..._{path[-1]}_{id}" strings once, when the flattened system is built.
+    """
+    __slots__ = ("path", "block_ids", "_prefix")
+
+    def __init__(self, path: Tuple[str, ...]):
+        self.path = path
+        # Ids of the blocks of the scope still in the flattened system
+        self.block_ids: Set[str] = set()
+        self._prefix: Optional[str] = None
+
+    def child(self, subsystem_id: str) -> "_Scope":
+        return _Scope(self.path + (sys.intern(subsystem_id),))
+
+    @property
+    def prefix(self) -> str:
+        if self._prefix is None:
+            self._prefix = "_".join(self.path)
+        return self._prefix
+
+    def full_id(self, id: str) -> str:
+        if not self.path:
+            return id
+        return sys.intern(f"{self._prefix or self.prefix}_{id}")
+
+
+# An id in its scope
+_Ref = Tuple[_Scope, str]
+
+
+class _FlatLink:
+    """
+    A link of a system being flattened. Rewiring changes its source and target nodes, never the
+    original LinkData.
+    """
+    __slots__ = (
+        "scope", "link", "source_scope", "source_id", "source_port", "_target_nodes", "source_position_link",
+        "removed",
+    )
+
+    def __init__(self, scope: _Scope, link: LinkData):
+        self.scope = scope
+        self.link = link
+        self.source_scope = scope
+        self.source_id = link.source_id
+        self.source_port = link.source_port
+        # (scope, segment id) -> target node, the target id is in the same scope as the segment id.
+        # None while the link has the target nodes of the original link.
+        self._target_nodes: Optional[Dict[_Ref, TargetNodeInfo]] = None
+        # Link whose source_x and source_y this link takes
+        self.source_position_link = link
+        self.removed = False
+
+    @property
+    def source(self) -> _Ref:
+        return (self.source_scope, self.source_id)
+
+    def target_items(self):
+        """
+        ((scope, segment id), target node) pairs.
+        """
+        if self._target_nodes is not None:
+            return self._target_nodes.items()
+        scope = self.scope
+        return (((scope, segment_id), target) for segment_id, target in self.link.target_nodes.items())
+
+    @property
+    def target_nodes(self) -> Dict[_Ref, TargetNodeInfo]:
+        """
+        The target nodes, as a dict of the link that can be changed.
+        """
+        if self._target_nodes is None:
+            self._target_nodes = dict(self.target_items())
+        return self._target_nodes
+
+    @target_nodes.setter
+    def target_nodes(self, target_nodes: Dict[_Ref, TargetNodeInfo]) -> None:
+        self._target_nodes = target_nodes
+
+    def remove_dangling_references(self) -> None:
+        """
+        Delete the target nodes of blocks no longer in the system, and remove the link if its source is not.
+        """
+        target_nodes_to_delete = [
+            key for key, target_node in self.target_items()
+            if target_node.target_id not in key[0].block_ids
+        ]
+
+        for key in target_nodes_to_delete:
+            del self.target_nodes[key]
+
+        if self.source_id not in self.source_scope.block_ids:
+            self.removed = True
+
+    def to_link_data(self) -> LinkData:
+        scope = self.scope
+
+        target_nodes = None
+        if self._target_nodes is not None or scope.path:
+            target_nodes = {}
+            for (segment_scope, segment_id), target in self.target_items():
+                if segment_scope.path:
+                    target = target.copy()
+                    target.target_id = segment_scope.full_id(target.target_id)
+                target_nodes[segment_scope.full_id(segment_id)] = target
+
+        link = self.link.copy(target_nodes)
+        link.id = scope.full_id(link.id)
+        link.source_id = self.source_scope.full_id(self.source_id)
+        link.source_port = self.source_port
+
+        if scope.path:
+            link.prefix_segment_ids(scope.prefix)
+
+        if self.source_position_link is not self.link:
+            link.source_x = self.source_position_link.source_x
+            link.source_y = self.source_position_link.source_y
+        return link
+
+
+class _LinkIndex:
+    """
+    Links of a system leaving or reaching one of ids, in the order of the links. Removed links
+    are skipped. Changes to the links made through the index keep it up to date.
+    """
+
+    def __init__(self, links: List[_FlatLink], ids: Set[_Ref]):
+        self.ids = ids
+        self._outgoing: Dict[_Ref, List[_FlatLink]] = {}
+        # A (link, port) entry per target node
+        self._incoming: Dict[_Ref, List[Tuple[_FlatLink, int]]] = {}
+        for link in links:
+            self.add(link)
+
+    def add(self, link: _FlatLink) -> None:
+        ids = self.ids
+        if not ids:
+            return
+        source = link.source
+        if source in ids:
+            self._outgoing.setdefault(source, []).append(link)
+        for (scope, _), target in link.target_items():
+            target_ref = (scope, target.target_id)
+            if target_ref in ids:
+                self._incoming.setdefault(target_ref, []).append((link, target.port))
+
+    def links_from(self, ref: _Ref, port: Optional[int] = None) -> List[_FlatLink]:
+        """
+        Links leaving ref, from port or from any port.
+        """
+        return [
+            l for l in self._outgoing.get(ref, ())
+            if not l.removed and (port is None or l.source_port == port)
+        ]
+
+    def links_to(self, ref: _Ref, port: Optional[int] = None) -> List[_FlatLink]:
+        """
+        Links reaching port of ref, once per target node, or reaching any port of ref, once per link.
+        """
+        if port is None:
+            return list({l: None for l, _ in self._incoming.get(ref, ()) if not l.removed})
+        return [l for l, p in self._incoming.get(ref, ()) if not l.removed and p == port]
+
+    def set_source(self, link: _FlatLink, source: _Ref, source_port: int) -> None:
+        old_source = link.source
+        if old_source in self.ids:
+            outgoing = self._outgoing[old_source]
+            del outgoing[next(i for i, l in enumerate(outgoing) if l is link)]
+        link.source_scope, link.source_id = source
+        link.source_port = source_port
+        if source in self.ids:
+            self._outgoing.setdefault(source, []).append(link)
+
+    def update_targets(self, link: _FlatLink, target_nodes) -> None:
+        """
+        target_nodes: ((scope, segment id), target node) pairs
+        """
+        ids = self.ids
+        link_target_nodes = link.target_nodes
+        for key, target in target_nodes:
+            replaced = link_target_nodes.get(key)
+            if replaced is not None and (key[0], replaced.target_id) in ids:
+                incoming = self._incoming[(key[0], replaced.target_id)]
+                del incoming[next(i for i, (l, p) in enumerate(incoming) if l is link and p == replaced.port)]
+            if (key[0], target.target_id) in ids:
+                self._incoming.setdefault((key[0], target.target_id), []).append((link, target.port))
+            link_target_nodes[key] = target
+
+
+
+class _FlatteningFrame:
+    """
+    A system on the flattening stack, with the blocks and links of the subsystems inlined so far,
+    in (scope, blocks) groups and in link groups.
+    """
+    __slots__ = ("system", "scope", "blocks", "links", "link_index", "next_subsystem", "to_check")
+
+    def __init__(self, system: "HighLevelSystem", scope: _Scope):
+        self.system = system
+        self.scope = scope
+        own_blocks = list(system.blocks or ())
+        own_links = [_FlatLink(scope, l) for l in system.links or ()]
+        scope.block_ids.update(b.id for b in own_blocks)
+        self.blocks: List[Tuple[_Scope, List[HighLevelBlock]]] = [(scope, own_blocks)]
+        self.links: List[List[_FlatLink]] = [own_links]
+        # Links are only looked up by subsystem (while inlining the subsystems) and by subsystem
+        # port block (while inlining this system)
+        ids = {(scope, s.id) for s in system.subsystems or ()}
+        ids.update((scope, b.id) for b in own_blocks if _is_port_block(b))
+        self.link_index = _LinkIndex(own_links, ids)
+        self.next_subsystem = 0
+        # Links that may reference blocks removed from the system: its own links, and the links
+        # of port blocks of inlined subsystems
+        self.to_check: List[_FlatLink] = list(own_links)
+
+
+def _is_port_block(block: HighLevelBlock) -> bool:
+    return block.block_library == "subsystems_library" and block.block_type in ("input_port", "output_port")
+
+
 class HighLevelSystem:
     def __init__(
         self,
@@ -231,7 +631,12 @@ class HighLevelSystem:
         cls,
         data: Dict[str, Any],
         parameter_environment_namespace: Dict[str, Any],
+        load_geometry: bool = True,
     ) -> Tuple["HighLevelSystem"]:
+        """
+        With load_geometry False, link geometry (source and target positions, segment trees) is
+        only parsed if read, for pipelines that only need the connections, like compilation.
+        """
         required = [
             "simulation_configuration",
             "initialization_python_script_path",
@@ -245,8 +650,10 @@ class HighLevelSystem:
             raise ValueError(f"Missing fields in HighLevelSystem: {', '.join(missing)}, raw json: {data}")
         # parse blocks
         raw_blocks = data["blocks"]
+        # Expressions shared by several blocks are evaluated once per system
+        expression_results: ExpressionResults = {}
         blocks = (
-            [HighLevelBlock.from_dict(b, parameter_environment_namespace) for b in raw_blocks]
+            [HighLevelBlock.from_dict(b, parameter_environment_namespace, expression_results) for b in raw_blocks]
             if raw_blocks is not None
             else None
         )
@@ -254,14 +661,14 @@ class HighLevelSystem:
         # parse links
         raw_links = data["links"]
         links = (
-            [LinkData.from_dict(l, parameter_environment_namespace) for l in raw_links]
+            [LinkData.from_dict(l, parameter_environment_namespace, load_geometry) for l in raw_links]
             if raw_links is not None
             else None
         )
 
         raw_subsystems = data["subsystems"]
         subsystems = (
-            [SubsystemData.from_dict(s, parameter_environment_namespace) for s in raw_subsystems]
+            [SubsystemData.from_dict(s, parameter_environment_namespace, load_geometry) for s in raw_subsystems]
             if raw_subsystems is not None
             else None
         )
@@ -280,7 +687,23 @@ class HighLevelSystem:
         cls,
         reference_path_or_file: str,
         data: Dict[str, Any],
+        parameter_environment_namespace: Optional[Dict[str, Any]] = None,
+        load_geometry: bool = True,
     ) -> Tuple["HighLevelSystem", Dict[str, Any]]:
+        """
+        Build the system from data loaded from reference_path_or_file, running its initialization
+        script unless an already evaluated parameter_environment_namespace is given. See from_dict
+        for load_geometry.
+        """
+        cls._check_required_fields(data)
+
+        if parameter_environment_namespace is None:
+            parameter_environment_namespace = cls.get_parameter_environment(reference_path_or_file, data)
+
+        return (HighLevelSystem.from_dict(data, parameter_environment_namespace, load_geometry), parameter_environment_namespace)
+
+    @classmethod
+    def _check_required_fields(cls, data: Dict[str, Any]) -> None:
         required = [
             "simulation_configuration",
             "initialization_python_script_path",
@@ -293,29 +716,59 @@ class HighLevelSystem:
         if missing:
             raise ValueError(f"Missing fields in HighLevelSystem: {', '.join(missing)}, data type: {type(data)}, raw data: {json.dumps(data, indent=4)}")
 
+    @staticmethod
+    def get_initialization_script_path(reference_path_or_file: str, data: Dict[str, Any]) -> str | None:
+        """
+        Absolute path of the initialization script of the system, or None if it has none.
+        """
         initialization_python_script_path = data.get("initialization_python_script_path", None)
 
+        if not initialization_python_script_path:
+            return None
 
-        if initialization_python_script_path:
-            # Resolve to absolute path if not already absolute
-            if not os.path.isabs(initialization_python_script_path):
-                pslk_dir = os.path.dirname(os.path.abspath(reference_path_or_file))
-                initialization_python_script_path = os.path.normpath(
-                    os.path.join(pslk_dir, initialization_python_script_path)
-                )
-            if os.path.isfile(initialization_python_script_path) and initialization_python_script_path.endswith(".py"):
-                try:
-                    parameter_environment_namespace = runpy.run_path(initialization_python_script_path, init_globals={})
-                except Exception as e:
-                    raise RuntimeError(f"Initialization script {initialization_python_script_path} load failed") from e
-            else:
-                raise FileNotFoundError(f"Initialization script '{initialization_python_script_path}' not found or not a .py file.")
-        else:
-            print(f"No initialization script provided.")
-            parameter_environment_namespace = dict()
+        # Resolve to absolute path if not already absolute
+        if not os.path.isabs(initialization_python_script_path):
+            pslk_dir = os.path.dirname(os.path.abspath(reference_path_or_file))
+            initialization_python_script_path = os.path.normpath(
+                os.path.join(pslk_dir, initialization_python_script_path)
+            )
+        if not (os.path.isfile(initialization_python_script_path) and initialization_python_script_path.endswith(".py")):
+            raise FileNotFoundError(f"Initialization script '{initialization_python_script_path}' not found or not a .py file.")
+        return initialization_python_script_path
 
-        
-        return (HighLevelSystem.from_dict(data, parameter_environment_namespace), parameter_environment_namespace)
+    @classmethod
+    def get_parameter_environment(cls, reference_path_or_file: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Namespace of the initialization script of the system, from the InitScriptCache while
+        neither the script nor the files it reads or imports changed.
+        """
+        initialization_python_script_path = cls.get_initialization_script_path(reference_path_or_file, data)
+
+        if initialization_python_script_path is None:
+            return cls.load_parameter_environment(reference_path_or_file, data)
+
+        from pysyslink_toolkit.InitScriptCache import InitScriptCache
+
+        return InitScriptCache.get_default().get_or_run(
+            initialization_python_script_path,
+            lambda: cls.load_parameter_environment(reference_path_or_file, data)
+        )
+
+    @classmethod
+    def load_parameter_environment(cls, reference_path_or_file: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run the initialization script of the system and return its namespace.
+        """
+        initialization_python_script_path = cls.get_initialization_script_path(reference_path_or_file, data)
+
+        if initialization_python_script_path is None:
+            logger.debug("No initialization script provided.")
+            return dict()
+
+        try:
+            return runpy.run_path(initialization_python_script_path, init_globals={})
+        except Exception as e:
+            raise RuntimeError(f"Initialization script {initialization_python_script_path} load failed") from e
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -328,57 +781,20 @@ class HighLevelSystem:
         }
 
 
-    def _prefix_ids(self, prefix: str):
-
-        def rename(id: str) -> str:
-            return f"{prefix}_{id}"
-
-        for block in self.blocks:
-            block.id = rename(block.id)
-
-        for link in self.links:
-            link.id = rename(link.id)
-            link.source_id = rename(link.source_id)
-
-            for target in link.target_nodes.values():
-                target.target_id = rename(target.target_id)
-
-            link.target_nodes = {
-                rename(segment_id): target
-                    for segment_id, target in link.target_nodes.items()
-            }
-
-            def visit(node: SegmentNode):
-                node.id = rename(node.id)
-                for child in node.children:
-                    visit(child)
-
-            visit(link.segment_node)
-
-    def _inline_subsystem(self, subsystem: SubsystemData):
-
-        inner = subsystem.json_data
-
-        # Prefix all ids
-        inner._prefix_ids(subsystem.id)
-
-        # --------------------------------------------------------
-        # Build lookup tables
-        # --------------------------------------------------------
-
-        incoming_links: Dict[Tuple[str, int], List[LinkData]] = {}   # (target_id, port) -> [LinkData]
-        outgoing_links: Dict[Tuple[str, int], List[LinkData]] = {}   # (source_id, port) -> [LinkData]
-
-        for link in self.links:
+    @staticmethod
+    def _inline_subsystem(frame: _FlatteningFrame, subsystem: SubsystemData, inner: _FlatteningFrame):
+        """
+        Append the flattened contents of subsystem (inner) to the blocks and links of frame,
+        rewiring the links of the subsystem ports. The link index of frame is kept up to date, so
+        that it can be used for the next subsystems.
 
-            outgoing_links.setdefault(
-                (link.source_id, link.source_port), []
-            ).append(link)
+        Links inside the subsystem never reference ids of frame, so they are not added to its index.
+        """
 
-            for target in link.target_nodes.values():
-                incoming_links.setdefault(
-                    (target.target_id, target.port), []
-                ).append(link)
+        subsystem_ref = (frame.scope, subsystem.id)
+        inner_scope = inner.scope
+        link_index = frame.link_index
+        inner_link_index = inner.link_index
 
         # --------------------------------------------------------
         # Find subsystem interface blocks
@@ -386,8 +802,9 @@ class HighLevelSystem:
 
         input_blocks = {}
         output_blocks = {}
+        port_blocks = []
 
-        for block in inner.blocks:
+        for block in inner.blocks[0][1]:
 
             if block.block_library != "subsystems_library":
                 continue
@@ -396,9 +813,11 @@ class HighLevelSystem:
 
             if block.block_type == "input_port":
                 input_blocks[port] = block
+                port_blocks.append(block)
 
             elif block.block_type == "output_port":
                 output_blocks[port] = block
+                port_blocks.append(block)
 
         # --------------------------------------------------------
         # INPUTS
@@ -408,7 +827,7 @@ class HighLevelSystem:
 
         for port, input_block in input_blocks.items():
 
-            outer_links = incoming_links.get((subsystem.id, port), [])
+            outer_links = link_index.links_to(subsystem_ref, port)
 
             if len(outer_links) != 1:
                 raise ValueError(
@@ -418,21 +837,19 @@ class HighLevelSystem:
             outer = outer_links[0]
 
             # link leaving input_port
-            produced = [
-                l for l in inner.links
-                if l.source_id == input_block.id
-            ]
+            produced = inner_link_index.links_from((inner_scope, input_block.id))
 
             if len(produced) != 1:
                 raise ValueError(
-                    f"input_port {input_block.id} must have one outgoing link."
+                    f"input_port {subsystem.id}_{input_block.id} must have one outgoing link."
                 )
 
             inner_link = produced[0]
 
             # append every internal destination
-            outer.target_nodes.update(inner_link.target_nodes)
+            link_index.update_targets(outer, inner_link.target_items())
 
+            inner_link.source_scope = outer.source_scope
             inner_link.source_id = outer.source_id
             inner_link.source_port = outer.source_port
 
@@ -444,101 +861,154 @@ class HighLevelSystem:
 
         for port, output_block in output_blocks.items():
 
-            producer = [
-                l for l in inner.links
-                if any(
-                    t.target_id == output_block.id
-                    for t in l.target_nodes.values()
-                )
-            ]
+            producer = inner_link_index.links_to((inner_scope, output_block.id))
 
             if len(producer) != 1:
                 raise ValueError(
-                    f"output_port {output_block.id} must have one incoming link."
+                    f"output_port {subsystem.id}_{output_block.id} must have one incoming link."
                 )
 
             producer = producer[0]
 
-            outer_links = outgoing_links.get((subsystem.id, port), [])
-
-            for outer in outer_links:
+            for outer in link_index.links_from(subsystem_ref, port):
 
-                outer.source_id = producer.source_id
-                outer.source_port = producer.source_port
-                outer.source_x = producer.source_x
-                outer.source_y = producer.source_y
+                link_index.set_source(outer, producer.source, producer.source_port)
+                outer.source_position_link = producer.source_position_link
 
             producer.target_nodes = {
-                seg_id: target
-                for seg_id, target in producer.target_nodes.items()
-                if target.target_id != output_block.id
+                key: target
+                for key, target in producer.target_items()
+                if not (key[0] is inner_scope and target.target_id == output_block.id)
             }
 
             if len(producer.target_nodes) == 0:
                 inner_links_to_delete.append(producer)
 
         # Remove interface links
-        inner.links = [
-            l for l in inner.links
-            if l not in inner_links_to_delete
-        ]
-
-        # Remove interface blocks
-        inner.blocks = [
-            b for b in inner.blocks
-            if not (
-                b.block_library == "subsystems_library"
-                and b.block_type in ("input_port", "output_port")
-            )
-        ]
+        for link in inner_links_to_delete:
+            link.removed = True
+
+        # Remove interface blocks, all in the group of the subsystem itself
+        inner_blocks = [b for b in inner.blocks[0][1] if not _is_port_block(b)]
+        inner_scope.block_ids = {b.id for b in inner_blocks}
+
+        # Links of the subsystem that may now reference removed blocks: all of them if the
+        # subsystem had no dangling links removed (it had no subsystems of its own), otherwise
+        # the links to or from its interface blocks other than the interface links
+        if not inner.system.subsystems:
+            frame.to_check.extend(inner.to_check)
+        for block in port_blocks:
+            block_ref = (inner_scope, block.id)
+            frame.to_check.extend(inner_link_index.links_from(block_ref))
+            frame.to_check.extend(inner_link_index.links_to(block_ref))
 
         # Merge
-        self.blocks.extend(inner.blocks)
-        self.links.extend(inner.links)
-        
-    def flatten_subsystems(self):
+        frame.blocks.append((inner_scope, inner_blocks))
+        frame.blocks.extend(inner.blocks[1:])
+        frame.links.extend(inner.links)
 
-        if not self.subsystems:
-            return
+    @staticmethod
+    def _remove_dangling_links(frame: _FlatteningFrame) -> None:
+        for link in frame.to_check:
+            if not link.removed:
+                link.remove_dangling_references()
 
-        if self.blocks is None:
-            self.blocks = []
+    def _flattened_parts(self) -> Tuple[List[HighLevelBlock], List[LinkData]]:
+        """
+        Blocks and links of the system with its subsystems inlined. The system is left unchanged:
+        the links are new, blocks are shared unless renamed.
 
-        if self.links is None:
-            self.links = []
+        Subsystems are visited depth first with an explicit stack, so the depth of the hierarchy is
+        not limited by the recursion limit. Ids are only prefixed with the ids of the subsystems
+        containing them once, at the end.
+        """
+        root = _FlatteningFrame(self, _Scope(()))
+        stack = [root]
+
+        while stack:
+            frame = stack[-1]
+            subsystems = frame.system.subsystems
 
-        for subsystem in self.subsystems:
-            subsystem.json_data.flatten_subsystems()
+            if subsystems and frame.next_subsystem < len(subsystems):
+                subsystem = subsystems[frame.next_subsystem]
+                stack.append(_FlatteningFrame(subsystem.json_data, frame.scope.child(subsystem.id)))
+                continue
 
-            self._inline_subsystem(subsystem)
+            stack.pop()
+            if subsystems:
+                self._remove_dangling_links(frame)
 
-        self.subsystems = []
+            if stack:
+                parent = stack[-1]
+                self._inline_subsystem(parent, parent.system.subsystems[parent.next_subsystem], frame)
+                parent.next_subsystem += 1
 
-        links_to_remove = []
+        blocks = []
+        for scope, scope_blocks in root.blocks:
+            if not scope.path:
+                blocks.extend(scope_blocks)
+                continue
+            for block in scope_blocks:
+                block = block.copy()
+                block.id = scope.full_id(block.id)
+                blocks.append(block)
 
-        # Cleanup dangling links
-        for link in self.links:
-            if link.source_id not in [b.id for b in self.blocks]:
-                links_to_remove.append(link)
+        links = [l.to_link_data() for group in root.links for l in group if not l.removed]
 
-            target_nodes_to_delete = []
-            for key, target_node in link.target_nodes.items():
-                if target_node.target_id not in [b.id for b in self.blocks]:
-                    target_nodes_to_delete.append(key)
+        return blocks, links
 
-            for key in target_nodes_to_delete:
-                del link.target_nodes[key]
+    def flattened(self) -> "HighLevelSystem":
+        """
+        A separate system with the subsystems inlined, leaving this one unchanged, so that a loaded
+        system can be flattened (and compiled) any number of times.
 
-        self.links = [
-            l for l in self.links
-            if l not in links_to_remove
-        ]
+        Blocks are shared with this system, except for the blocks of subsystems, which are renamed
+        copies, and for blocks with inherited port types, which are copies whose port type lists
+        propagate_and_validate_port_types can replace.
+        """
+        if self.subsystems:
+            blocks, links = self._flattened_parts()
+        else:
+            blocks = list(self.blocks) if self.blocks is not None else None
+            links = list(self.links) if self.links is not None else None
+
+        if blocks is not None:
+            blocks = [self._own_block_if_inherited(b) for b in blocks]
+
+        return HighLevelSystem(
+            simulation_configuration=self.simulation_configuration,
+            initialization_python_script_path=self.initialization_python_script_path,
+            toolkit_configuration_path=self.toolkit_configuration_path,
+            blocks=blocks,
+            links=links,
+            subsystems=[] if self.subsystems else self.subsystems,
+        )
+
+    @staticmethod
+    def _own_block_if_inherited(block: HighLevelBlock) -> HighLevelBlock:
+        def is_inherited(pt):
+            return pt.port_category == PortCategory.inherited
+
+        if not any(map(is_inherited, block.input_port_types)) and not any(map(is_inherited, block.output_port_types)):
+            return block
+        return block.copy()
+
+    def flatten_subsystems(self):
+        """
+        Inline the subsystems into this system, see flattened for a copy instead.
+        """
+
+        if not self.subsystems:
+            return
+
+        self.blocks, self.links = self._flattened_parts()
+        self.subsystems = []
                     
             
     def propagate_and_validate_port_types(self) -> None:
         """
         Resolve inherited port types by propagating through links and inheritance groups.
-        Modifies block port types in-place.
+        Blocks with resolved ports get new port type lists, PortType objects are immutable.
 
         Assumptions:
             self.blocks -> list[HighLevelBlock]
@@ -559,229 +1029,4 @@ class HighLevelSystem:
         if self.links is None:
             self.links = []
 
-        # ---------------------------------------------------------
-        # Helpers
-        # ---------------------------------------------------------
-
-        block_map = {b.id: b for b in self.blocks}
-
-        def is_inherited(pt):
-            return pt.port_category == PortCategory.inherited
-
-        def is_known(pt):
-            return not is_inherited(pt)
-
-        def clone_type(pt):
-            return PortType(
-                port_category=pt.port_category,
-                signal_value_type=pt.signal_value_type,
-                enumeration_name=pt.enumeration_name,
-                structure_name=pt.structure_name,
-                pointing_object_class_name=pt.pointing_object_class_name,
-                other_type_name=pt.other_type_name,
-                supported_port_types_for_inheritance=pt.supported_port_types_for_inheritance,
-                inheritance_group=pt.inheritance_group,
-            )
-
-        def same_type(a: PortType, b: PortType) -> bool:
-            return (
-                a.port_category == b.port_category
-                and a.signal_value_type == b.signal_value_type
-                and a.enumeration_name == b.enumeration_name
-                and a.structure_name == b.structure_name
-                and a.pointing_object_class_name == b.pointing_object_class_name
-                and a.other_type_name == b.other_type_name
-            )
-        
-        def is_allowed_inheritance(dst: PortType, src: PortType) -> bool:
-            """
-            Can dst inherit src?
-            """
-
-            # no restriction → always allowed
-            if not dst.supported_port_types_for_inheritance:
-                return True
-
-            # must match at least one allowed template
-            for allowed in dst.supported_port_types_for_inheritance:
-                print(f"Checking if {src} can be inherited for {dst} against allowed template {allowed}")
-                if allowed == "FullySupportedSignalValueType.Any":
-                    if src.port_category == PortCategory.fully_supported_signal_value:
-                        return True
-                else:
-                    if same_type(allowed, src):
-                        return True
-
-            return False
-
-        def assign(dst, src):
-            """
-            Copy concrete type src into inherited dst.
-            Returns True if changed.
-            """
-            if is_known(dst):
-                return False
-
-            if is_inherited(src):
-                return False
-            
-            if not is_allowed_inheritance(dst, src):
-                raise ValueError(
-                    f"Incompatible inheritance: {src} not allowed for port constraints {dst.supported_port_types_for_inheritance}"
-                )
-
-            dst.port_category = src.port_category
-            dst.signal_value_type = src.signal_value_type
-            dst.enumeration_name = src.enumeration_name
-            dst.structure_name = src.structure_name
-            dst.pointing_object_class_name = src.pointing_object_class_name
-            dst.other_type_name = src.other_type_name
-            dst.supported_port_types_for_inheritance = (
-                src.supported_port_types_for_inheritance
-            )
-
-            return True
-
-        def unify(a, b, context=""):
-            """
-            Make a and b compatible.
-            Returns True if something changed.
-            """
-            # both known
-            if is_known(a) and is_known(b):
-                if not same_type(a, b):
-                    raise ValueError(
-                        f"Incompatible port types {a} vs {b}. {context}"
-                    )
-                return False
-
-            # a known, b inherited
-            if is_known(a) and is_inherited(b):
-                return assign(b, a)
-
-            # b known, a inherited
-            if is_known(b) and is_inherited(a):
-                return assign(a, b)
-
-            # both inherited
-            return False
-
-        # ---------------------------------------------------------
-        # Iterative propagation
-        # ---------------------------------------------------------
-
-        changed = True
-
-        while changed:
-            changed = False
-
-            # -------------------------------------------------
-            # Pass A: propagate through links
-            # -------------------------------------------------
-            for link in self.links:
-                if link.source_id not in block_map:
-                    raise ValueError(
-                        f"Link source block '{link.source_id}' not found"
-                    )
-
-                src_block = block_map[link.source_id]
-
-                if link.source_port >= len(src_block.output_port_types):
-                    raise ValueError(
-                        f"Invalid source port {link.source_port} "
-                        f"on block '{src_block.id}'"
-                    )
-
-                src_type = src_block.output_port_types[link.source_port]
-
-                for target in link.target_nodes.values():
-                    if target.target_id not in block_map:
-                        raise ValueError(
-                            f"Link target block '{target.target_id}' not found"
-                        )
-
-                    tgt_block = block_map[target.target_id]
-
-                    if target.port >= len(tgt_block.input_port_types):
-                        raise ValueError(
-                            f"Invalid target port {target.port} "
-                            f"on block '{tgt_block.id}'"
-                        )
-
-                    tgt_type = tgt_block.input_port_types[target.port]
-
-                    changed |= unify(
-                        src_type,
-                        tgt_type,
-                        context=(
-                            f"Connection "
-                            f"{src_block.id}.out[{link.source_port}] -> "
-                            f"{tgt_block.id}.in[{target.port}]"
-                        ),
-                    )
-
-            # -------------------------------------------------
-            # Pass B: propagate inside each block by inheritance group
-            # -------------------------------------------------
-            for block in self.blocks:
-
-                groups = {}
-
-                # inputs
-                for i, pt in enumerate(block.input_port_types):
-                    g = pt.inheritance_group
-                    if g not in groups:
-                        groups[g] = []
-                    groups[g].append(("input", i, pt))
-
-                # outputs
-                for i, pt in enumerate(block.output_port_types):
-                    g = pt.inheritance_group
-                    if g not in groups:
-                        groups[g] = []
-                    groups[g].append(("output", i, pt))
-
-                # unify all ports inside each group
-                for group_id, ports in groups.items():
-                    known = None
-
-                    for _, _, pt in ports:
-                        if is_known(pt):
-                            if known is None:
-                                known = pt
-                            else:
-                                if not same_type(known, pt):
-                                    raise ValueError(
-                                        f"Conflicting inherited group "
-                                        f"{group_id} on block '{block.id}'"
-                                    )
-
-                    if known is not None:
-                        for _, _, pt in ports:
-                            changed |= unify(
-                                known,
-                                pt,
-                                context=(
-                                    f"Block '{block.id}' "
-                                    f"group {group_id}"
-                                ),
-                            )
-
-        # ---------------------------------------------------------
-        # Final unresolved check
-        # ---------------------------------------------------------
-        for block in self.blocks:
-
-            for i, pt in enumerate(block.input_port_types):
-                if is_inherited(pt):
-                    raise ValueError(
-                        f"Could not resolve input port type "
-                        f"{block.id}.in[{i}]"
-                    )
-
-            for i, pt in enumerate(block.output_port_types):
-                if is_inherited(pt):
-                    raise ValueError(
-                        f"Could not resolve output port type "
-                        f"{block.id}.out[{i}]"
-                    )
\ No newline at end of file
+        port_type_propagation.propagate_and_validate_port_types(self.blocks, self.links)
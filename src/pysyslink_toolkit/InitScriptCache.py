@@ -0,0 +1,374 @@
+import ast
+import builtins
+import hashlib
+import importlib
+import os
+import pickle
+import site
+import sys
+import sysconfig
+import threading
+import types
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from pysyslink_toolkit.user_cache import atomic_write, get_user_cache_dir, is_env_flag_set, is_user_cache_disabled
+
+
+# Bump when the layout of the disk entries changes
+CACHE_FORMAT_VERSION = 1
+
+DISK_CACHE_ENV_VAR = "PYSYSLINK_TOOLKIT_INIT_SCRIPT_DISK_CACHE"
+
+# (mtime_ns, size, sha256 of the contents), mtime_ns, size and digest are None for missing files
+DependencyState = Tuple[Optional[int], Optional[int], Optional[str]]
+
+
+def _file_state(path: str) -> DependencyState:
+    try:
+        stat = os.stat(path)
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    except OSError:
+        return (None, None, None)
+    return (stat.st_mtime_ns, stat.st_size, digest.hexdigest())
+
+
+def _get_library_dirs() -> Tuple[str, ...]:
+    """
+    Directories of the standard library and installed packages, whose files are not tracked.
+    """
+    dirs = set()
+    paths = sysconfig.get_paths()
+    for key in ("stdlib", "platstdlib", "purelib", "platlib"):
+        if paths.get(key):
+            dirs.add(os.path.normcase(os.path.abspath(paths[key])))
+    try:
+        dirs.update(os.path.normcase(os.path.abspath(p)) for p in site.getsitepackages())
+    except AttributeError:
+        pass
+    return tuple(sorted(dirs))
+
+
+class _DependencyRecorder:
+    """
+    Files opened for reading by the thread running an initialization script.
+    """
+
+    def __init__(self, library_dirs: Tuple[str, ...]):
+        self.library_dirs = library_dirs
+        self.opened: Set[str] = set()
+
+    def is_tracked(self, path: str) -> bool:
+        if path.endswith(".pyc") or "__pycache__" in path:
+            return False
+        normalized = os.path.normcase(path)
+        return not any(normalized.startswith(d + os.sep) for d in self.library_dirs)
+
+    def record_open(self, path: Any, mode: Any, flags: Any) -> None:
+        if isinstance(mode, str):
+            if "r" not in mode and "+" not in mode:
+                return
+        elif isinstance(flags, int) and flags & getattr(os, "O_ACCMODE", 3) == os.O_WRONLY:
+            return
+        if isinstance(path, int):
+            return
+        path = os.path.abspath(os.fsdecode(os.fspath(path)))
+        if self.is_tracked(path):
+            self.opened.add(path)
+
+
+_recorders = threading.local()
+_audit_hook_lock = threading.Lock()
+_audit_hook_installed = False
+
+
+def _audit_hook(event: str, args: Tuple[Any, ...]) -> None:
+    if event != "open":
+        return
+    stack = getattr(_recorders, "stack", None)
+    if not stack:
+        return
+    try:
+        stack[-1].record_open(*args[:3])
+    except Exception:
+        # Never break the open call of the script
+        pass
+
+
+def _install_audit_hook() -> None:
+    # Audit hooks cannot be removed, a single one dispatches to the recorder of the current thread
+    global _audit_hook_installed
+    with _audit_hook_lock:
+        if not _audit_hook_installed:
+            sys.addaudithook(_audit_hook)
+            _audit_hook_installed = True
+
+
+class _ModuleReference:
+    """
+    Pickled in place of a module bound in a namespace, imported again when loaded.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+class _InitScriptEntry:
+    def __init__(self, namespace: Dict[str, Any], dependencies: Dict[str, DependencyState], module_names: Dict[str, str]):
+        self.namespace = namespace
+        # Script, files it opened and files of the modules it imported
+        self.dependencies = dependencies
+        # Module file -> module name, to import changed modules again
+        self.module_names = module_names
+
+
+class InitScriptCache:
+    """
+    Cache of evaluated initialization script namespaces.
+
+    While a script runs, the files it opens for reading (through an audit hook, so np.load or
+    pandas readers are seen too) and the files of the modules it imports are recorded. The entry
+    of a script stays valid while the script and all those files keep their contents: each is
+    checked with a stat, and hashed again only when its mtime or size changed. Files of the
+    standard library and installed packages are not tracked. When any of them changed, all the
+    modules the script imported are removed from sys.modules before it runs again, so the script
+    sees the new code, also through modules importing the changed one.
+
+    Entries are kept in memory for the process (max_entries scripts, least recently used
+    evicted). With a disk_cache_dir, the namespaces are also pickled there and reused by other
+    processes; namespaces that cannot be pickled (functions or classes defined by the script)
+    are only cached in memory. Cached scripts do not run, so their side effects are skipped.
+    """
+
+    _default_instance: Optional["InitScriptCache"] = None
+
+    def __init__(self, disk_cache_dir: str | None = None, max_entries: int = 32):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.disk_cache_dir = disk_cache_dir
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _InitScriptEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._library_dirs: Tuple[str, ...] | None = None
+
+    @classmethod
+    def get_default(cls) -> "InitScriptCache":
+        """
+        Shared cache, on disk in the user cache directory when PYSYSLINK_TOOLKIT_INIT_SCRIPT_DISK_CACHE
+        is set (and PYSYSLINK_TOOLKIT_DISABLE_CACHE is not).
+        """
+        if cls._default_instance is None:
+            disk_cache_dir = None
+            if is_env_flag_set(DISK_CACHE_ENV_VAR) and not is_user_cache_disabled():
+                disk_cache_dir = get_user_cache_dir("init_scripts")
+            cls._default_instance = cls(disk_cache_dir)
+        return cls._default_instance
+
+    def get_or_run(self, script_path: str, run: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Namespace of the script at script_path, computed by run() if no valid entry exists.
+        """
+        path = os.path.abspath(script_path)
+        previous_module_names: Dict[str, str] = {}
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                changed = self._get_changed_dependencies(entry)
+                if not changed:
+                    self._entries.move_to_end(path)
+                    return entry.namespace
+                del self._entries[path]
+                self._forget_modules(entry)
+                previous_module_names = entry.module_names
+            elif self.disk_cache_dir is not None:
+                entry = self._read_disk_entry(path)
+                if entry is not None:
+                    self._store(path, entry)
+                    return entry.namespace
+
+            entry = self._run(path, run, previous_module_names)
+            self._store(path, entry)
+            if self.disk_cache_dir is not None:
+                self._write_disk_entry(path, entry)
+            return entry.namespace
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self.disk_cache_dir is not None:
+                try:
+                    names = os.listdir(self.disk_cache_dir)
+                except OSError:
+                    names = []
+                for name in names:
+                    if name.endswith(".pickle"):
+                        try:
+                            os.remove(os.path.join(self.disk_cache_dir, name))
+                        except OSError:
+                            pass
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ---------------------------------------------------------
+    # Running and validation
+    # ---------------------------------------------------------
+
+    def _run(self, path: str, run: Callable[[], Dict[str, Any]],
+             previous_module_names: Dict[str, str] | None = None) -> _InitScriptEntry:
+        """
+        Run the script, recording its dependencies. Modules of previous_module_names (those of the
+        entry it replaces) stay dependencies while the script still uses them, even if an
+        import of an earlier run left them in sys.modules.
+        """
+        if self._library_dirs is None:
+            self._library_dirs = _get_library_dirs()
+        _install_audit_hook()
+
+        recorder = _DependencyRecorder(self._library_dirs)
+        modules_before = set(sys.modules)
+        stack = getattr(_recorders, "stack", None)
+        if stack is None:
+            stack = _recorders.stack = []
+        stack.append(recorder)
+        try:
+            namespace = run()
+        finally:
+            stack.pop()
+
+        module_names: Dict[str, str] = {}
+        imported = (set(sys.modules) - modules_before) | self._get_static_imports(path)
+        imported.update((previous_module_names or {}).values())
+        for name in imported:
+            module_file = getattr(sys.modules.get(name), "__file__", None)
+            if module_file:
+                module_file = os.path.abspath(module_file)
+                if recorder.is_tracked(module_file):
+                    module_names[module_file] = name
+
+        dependency_paths = {path} | recorder.opened | set(module_names)
+        dependencies = {p: _file_state(p) for p in dependency_paths}
+        return _InitScriptEntry(namespace, dependencies, module_names)
+
+    @staticmethod
+    def _get_static_imports(path: str) -> Set[str]:
+        """
+        Modules named by the import statements of the script, imported already by an earlier run or not.
+        """
+        try:
+            with open(path, "rb") as f:
+                tree = ast.parse(f.read())
+        except (OSError, SyntaxError, ValueError):
+            return set()
+        names = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names.add(node.module)
+                names.update(f"{node.module}.{alias.name}" for alias in node.names)
+        return names
+
+    @staticmethod
+    def _get_changed_dependencies(entry: _InitScriptEntry) -> List[str]:
+        changed = []
+        for path, (mtime_ns, size, digest) in entry.dependencies.items():
+            try:
+                stat = os.stat(path)
+                fingerprint = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                fingerprint = (None, None)
+            if fingerprint == (mtime_ns, size):
+                continue
+            state = _file_state(path)
+            if state[2] != digest:
+                changed.append(path)
+            else:
+                # Touched but unchanged
+                entry.dependencies[path] = state
+        return changed
+
+    @staticmethod
+    def _forget_modules(entry: _InitScriptEntry) -> None:
+        # All of them, a module that did not change may hold values imported from one that did
+        for name in entry.module_names.values():
+            sys.modules.pop(name, None)
+
+    def _store(self, path: str, entry: _InitScriptEntry) -> None:
+        self._entries[path] = entry
+        self._entries.move_to_end(path)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # ---------------------------------------------------------
+    # Disk entries
+    # ---------------------------------------------------------
+
+    def _disk_entry_path(self, path: str) -> str:
+        return os.path.join(self.disk_cache_dir, hashlib.sha256(path.encode("utf-8")).hexdigest() + ".pickle")
+
+    def _read_disk_entry(self, path: str) -> _InitScriptEntry | None:
+        try:
+            with open(self._disk_entry_path(path), "rb") as f:
+                stored = pickle.load(f)
+            if stored.get("version") != CACHE_FORMAT_VERSION or stored.get("python") != sys.version or stored.get("script") != path:
+                return None
+            entry = _InitScriptEntry(None, stored["dependencies"], stored["module_names"])
+            if self._get_changed_dependencies(entry):
+                return None
+            entry.namespace = self._load_namespace(path, stored["namespace"], stored["doc"])
+        except Exception:
+            # Missing, stale or unreadable entries just run the script
+            return None
+        return entry
+
+    def _write_disk_entry(self, path: str, entry: _InitScriptEntry) -> None:
+        payload = self._dump_namespace(entry.namespace)
+        if payload is None:
+            return
+        stored = {
+            "version": CACHE_FORMAT_VERSION,
+            "python": sys.version,
+            "script": path,
+            "dependencies": entry.dependencies,
+            "module_names": entry.module_names,
+            "doc": entry.namespace.get("__doc__"),
+            "namespace": payload,
+        }
+        try:
+            os.makedirs(self.disk_cache_dir, exist_ok=True)
+            atomic_write(self._disk_entry_path(path), pickle.dumps(stored, protocol=pickle.HIGHEST_PROTOCOL))
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            pass
+
+    @staticmethod
+    def _dump_namespace(namespace: Dict[str, Any]) -> bytes | None:
+        values = {}
+        for name, value in namespace.items():
+            if name.startswith("__") and name.endswith("__"):
+                continue
+            values[name] = _ModuleReference(value.__name__) if isinstance(value, types.ModuleType) else value
+        try:
+            return pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _load_namespace(path: str, payload: bytes, doc: str | None) -> Dict[str, Any]:
+        # Same module globals as runpy.run_path leaves
+        namespace: Dict[str, Any] = {
+            "__name__": "<run_path>",
+            "__file__": path,
+            "__cached__": None,
+            "__doc__": doc,
+            "__loader__": None,
+            "__package__": "",
+            "__spec__": None,
+            "__builtins__": builtins.__dict__,
+        }
+        for name, value in pickle.loads(payload).items():
+            namespace[name] = importlib.import_module(value.name) if isinstance(value, _ModuleReference) else value
+        return namespace
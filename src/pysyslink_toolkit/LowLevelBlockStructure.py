@@ -1,13 +1,27 @@
+import sys
 from typing import Any, Dict, List, Tuple
 
 
+def _intern(value: Any) -> Any:
+    """
+    Ids are repeated across blocks and links, share one string object per id. Plugins may pass
+    ints or str subclasses, kept as they are.
+    """
+    return sys.intern(value) if type(value) is str else value
+
+
 class LowLevelBlock:
+    __slots__ = (
+        "id", "name", "block_type", "block_class", "input_port_number", "input_port_types",
+        "output_port_number", "output_port_types", "extra",
+    )
+
     def __init__(self, id: str, name: str, block_type: str, block_class: str,
                  input_port_number: int, input_port_types: List[str], output_port_number: int, output_port_types: List[str], **kwargs):
-        self.id = id
+        self.id = _intern(id)
         self.name = name
-        self.block_type = block_type
-        self.block_class = block_class
+        self.block_type = _intern(block_type)
+        self.block_class = _intern(block_class)
         self.input_port_number = input_port_number
         self.input_port_types: List[str] = input_port_types
         self.output_port_number = output_port_number
@@ -29,6 +43,10 @@ class LowLevelBlock:
         return d
 
 class LowLevelLink:
+    __slots__ = (
+        "id", "name", "source_block_id", "source_port_idx", "destination_block_id", "destination_port_idx",
+    )
+
     def __init__(
         self,
         id: str,
@@ -38,11 +56,11 @@ class LowLevelLink:
         destination_block_id: str,
         destination_port_idx: int,
     ):
-        self.id = id
+        self.id = _intern(id)
         self.name = name
-        self.source_block_id = source_block_id
+        self.source_block_id = _intern(source_block_id)
         self.source_port_idx = source_port_idx
-        self.destination_block_id = destination_block_id
+        self.destination_block_id = _intern(destination_block_id)
         self.destination_port_idx = destination_port_idx
 
     def to_dict(self) -> Dict[str, Any]:
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from enum import Enum, auto
-from typing import Literal
+from functools import cached_property
+import logging
+from typing import Literal, Tuple
+import weakref
+
+logger = logging.getLogger(__name__)
 
 class FullySupportedSignalValueType(Enum):
     Int = "int"
@@ -24,17 +29,88 @@ class PortCategory(Enum):
     inherited = "Inherited"
     unknown = "Unknown"
 
-@dataclass
+# Canonical instance of every port type in use, by fields, see PortType.interned. Weak, so that
+# port types no block uses any more are dropped
+_canonical_port_types: weakref.WeakValueDictionary[tuple, PortType] = weakref.WeakValueDictionary()
+
+@dataclass(frozen=True)
 class PortType:
+    """
+    Immutable, so that ports of the same type can share one instance. Resolving an inherited port
+    replaces its PortType rather than changing it.
+    """
     port_category: PortCategory = PortCategory.fully_supported_signal_value
     signal_value_type: FullySupportedSignalValueType | None = None
     enumeration_name: str | None = None
     structure_name: str | None = None
     pointing_object_class_name: str | None = None
     other_type_name: str | None = None
-    supported_port_types_for_inheritance: list[PortType | Literal["FullySupportedSignalValueType.Any"]] | None = None
+    supported_port_types_for_inheritance: Tuple[PortType | Literal["FullySupportedSignalValueType.Any"], ...] | None = None
     inheritance_group: int = 0 # Ports with the same inheritance group within a block inherit at the same time, their types are the same
 
+    def __post_init__(self):
+        supported = self.supported_port_types_for_inheritance
+        if supported is not None and type(supported) is not tuple:
+            object.__setattr__(self, "supported_port_types_for_inheritance", tuple(supported))
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if other.__class__ is not PortType:
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __hash__(self):
+        # Port types key the dicts of the propagation and of the compilation cache, computed once
+        try:
+            return self.__dict__["_hash"]
+        except KeyError:
+            value = hash(self._fields())
+            object.__setattr__(self, "_hash", value)
+            return value
+
+    def _fields(self):
+        return (
+            self.port_category, self.signal_value_type, self.enumeration_name, self.structure_name,
+            self.pointing_object_class_name, self.other_type_name, self.supported_port_types_for_inheritance,
+            self.inheritance_group,
+        )
+
+    def __reduce__(self):
+        # Unpickled port types are canonical too, and the cached value type is left out
+        return _interned_port_type, self._fields()
+
+    def interned(self) -> PortType:
+        """
+        The canonical instance equal to this port type, the same object for every equal port type.
+        """
+        if "_canonical" in self.__dict__:
+            # Stays canonical while alive, the weak entry is only dropped with it
+            return self
+        fields = self._fields()
+        canonical = _canonical_port_types.get(fields)
+        if canonical is None:
+            canonical = _canonical_port_types.setdefault(fields, self)
+        if canonical is self:
+            object.__setattr__(self, "_canonical", True)
+        return canonical
+
+    @cached_property
+    def value_type(self) -> PortType:
+        """
+        Canonical port type of the values, without inheritance constraints or group. Two port types
+        carry the same values if and only if their value types are the same object.
+        """
+        return replace(self, supported_port_types_for_inheritance=None, inheritance_group=0).interned()
+
+    def with_inheritance_group(self, inheritance_group: int) -> PortType:
+        """
+        Canonical port type equal to this one, in the given inheritance group.
+        """
+        if inheritance_group == self.inheritance_group:
+            return self.interned()
+        return replace(self, inheritance_group=inheritance_group).interned()
+
     def to_string(self):
         if self.port_category == PortCategory.fully_supported_signal_value:
             return f"FullySupportedSignalValue.{self.signal_value_type.value}" if self.signal_value_type else "FullySupportedSignalValueType.Any"
@@ -83,7 +159,7 @@ class PortType:
         elif self.port_category == PortCategory.inherited: 
             base["supported_port_types_for_inheritance"] = [x.to_dict() if isinstance(x, PortType) else x for x in self.supported_port_types_for_inheritance] if self.supported_port_types_for_inheritance else None
         
-        print(f"PortType to_dict output: {base}")
+        logger.debug("PortType to_dict output: %s", base)
         return base
     
     @classmethod
@@ -95,11 +171,14 @@ class PortType:
             structure_name=data.get("structure_name"),
             pointing_object_class_name=data.get("pointing_object_class_name"),
             other_type_name=data.get("other_type_name"),
-            supported_port_types_for_inheritance=[
+            supported_port_types_for_inheritance=tuple(
                 PortType.from_dict(sub_data) if isinstance(sub_data, dict) else sub_data for sub_data in data.get("supported_port_types_for_inheritance", [])
-            ] if data.get("supported_port_types_for_inheritance") else None,
+            ) if data.get("supported_port_types_for_inheritance") else None,
             inheritance_group=data.get("inheritance_group", 0)
-        )
+        ).interned()
+
+def _interned_port_type(*fields) -> PortType:
+    return PortType(*fields).interned()
 
 @dataclass
 class PortTypeConfig:
@@ -0,0 +1,324 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from pysyslink_toolkit.HighLevelBlock import HighLevelBlock
+from pysyslink_toolkit.HighLevelSystem import HighLevelSystem, LinkData
+from pysyslink_toolkit.PortType import PortType
+from pysyslink_toolkit.port_type_propagation import is_allowed_inheritance, is_inherited, is_known, same_type
+
+
+class PortRef(NamedTuple):
+    block_id: str
+    direction: str  # "input" or "output", as in the port maps of LowLevelBlockStructure
+    index: int
+
+    def __str__(self):
+        return f"{self.block_id}.{'in' if self.direction == 'input' else 'out'}[{self.index}]"
+
+
+_MISSING = object()
+
+
+class PortTypeEngine:
+    """
+    Port types of a flat system (see HighLevelSystem.flattened), kept up to date across block and
+    link edits.
+
+    The engine keeps the port connectivity between edits. An edit re-resolves only the inherited
+    ports connected to the ports it touches, through links and inheritance groups, and returns
+    the ports whose type changed. Resolved types are those of propagate_and_validate_port_types.
+    Errors do not raise, they are kept for the ports they concern, see errors.
+
+    The blocks given are not modified.
+    """
+
+    def __init__(self, blocks: Iterable[HighLevelBlock] = (), links: Iterable[LinkData] = ()):
+        # Declared port types of each block, (inputs, outputs)
+        self._declared: Dict[str, Tuple[List[PortType], List[PortType]]] = {}
+        # Block id -> inheritance group -> ports of the block in the group
+        self._groups: Dict[str, Dict[int, List[PortRef]]] = {}
+        # Link id -> (output port, input port) connections of the link
+        self._links: Dict[str, List[Tuple[PortRef, PortRef]]] = {}
+        # Port -> connected port -> number of connections, ports may be missing while their block is
+        self._connections: Dict[PortRef, Dict[PortRef, int]] = {}
+        # Port -> type, the resolved type of inherited ports reached by a known type, else the declared one
+        self._port_types: Dict[PortRef, PortType] = {}
+        # Errors of the class of inherited ports of each port, of the links to each input port and of
+        # the inheritance groups of each block
+        self._class_errors: Dict[PortRef, str] = {}
+        self._link_errors: Dict[PortRef, str] = {}
+        self._group_errors: Dict[str, List[str]] = {}
+        # Port -> type before the running edit, for the ports it may have changed
+        self._previous: Dict[PortRef, object] = {}
+
+        for block in blocks:
+            self._set_declared(block)
+        for link in links:
+            self._add_link(link)
+        self._resolve(self._port_types.keys(), check_links=True)
+        self._previous = {}
+
+    @classmethod
+    def from_system(cls, high_level_system: HighLevelSystem) -> "PortTypeEngine":
+        flat = high_level_system.flattened()
+        return cls(flat.blocks or (), flat.links or ())
+
+    # ---------------------------------------------------------
+    # Queries
+    # ---------------------------------------------------------
+
+    def port_type(self, port: PortRef) -> Optional[PortType]:
+        return self._port_types.get(port)
+
+    def block_port_types(self, block_id: str) -> Tuple[List[PortType], List[PortType]]:
+        """
+        (input port types, output port types) of a block, with its inherited ports resolved where possible.
+        """
+        inputs, outputs = self._declared[block_id]
+        return (
+            [self._port_types[PortRef(block_id, "input", i)] for i in range(len(inputs))],
+            [self._port_types[PortRef(block_id, "output", i)] for i in range(len(outputs))],
+        )
+
+    def unresolved_ports(self) -> List[PortRef]:
+        return [port for port, pt in self._port_types.items() if is_inherited(pt)]
+
+    def errors(self) -> List[str]:
+        messages = set(self._class_errors.values()) | set(self._link_errors.values())
+        for block_messages in self._group_errors.values():
+            messages.update(block_messages)
+        return sorted(messages)
+
+    # ---------------------------------------------------------
+    # Edits, each returns {port: new type} for the ports whose type changed, None for removed ports
+    # ---------------------------------------------------------
+
+    def set_block(self, block: HighLevelBlock) -> Dict[PortRef, Optional[PortType]]:
+        """
+        Add a block, or replace the block with the same id.
+        """
+        seeds = self._remove_declared(block.id) if block.id in self._declared else []
+        seeds.extend(self._set_declared(block))
+        return self._finish_edit(seeds)
+
+    def remove_block(self, block_id: str) -> Dict[PortRef, Optional[PortType]]:
+        return self._finish_edit(self._remove_declared(block_id))
+
+    def set_link(self, link: LinkData) -> Dict[PortRef, Optional[PortType]]:
+        """
+        Add a link, or replace the link with the same id.
+        """
+        seeds = self._remove_link(link.id)
+        seeds.extend(self._add_link(link))
+        return self._finish_edit(seeds)
+
+    def remove_link(self, link_id: str) -> Dict[PortRef, Optional[PortType]]:
+        return self._finish_edit(self._remove_link(link_id))
+
+    # ---------------------------------------------------------
+    # Structure
+    # ---------------------------------------------------------
+
+    def _block_ports(self, block_id: str) -> List[PortRef]:
+        inputs, outputs = self._declared[block_id]
+        return (
+            [PortRef(block_id, "input", i) for i in range(len(inputs))]
+            + [PortRef(block_id, "output", i) for i in range(len(outputs))]
+        )
+
+    def _declared_type(self, port: PortRef) -> Optional[PortType]:
+        declared = self._declared.get(port.block_id)
+        if declared is None:
+            return None
+        port_types = declared[0] if port.direction == "input" else declared[1]
+        return port_types[port.index] if port.index < len(port_types) else None
+
+    def _set_port_type(self, port: PortRef, pt: object) -> None:
+        old = self._port_types.get(port, _MISSING)
+        if old is pt:
+            return
+        self._previous.setdefault(port, old)
+        if pt is _MISSING:
+            del self._port_types[port]
+        else:
+            self._port_types[port] = pt
+
+    def _set_declared(self, block: HighLevelBlock) -> List[PortRef]:
+        self._declared[block.id] = (list(block.input_port_types), list(block.output_port_types))
+        ports = self._block_ports(block.id)
+        groups = self._groups[block.id] = {}
+        for port in ports:
+            declared = self._declared_type(port)
+            groups.setdefault(declared.inheritance_group, []).append(port)
+            self._set_port_type(port, declared)
+        self._check_groups(block.id)
+        return ports + [q for port in ports for q in self._connections.get(port, ())]
+
+    def _remove_declared(self, block_id: str) -> List[PortRef]:
+        ports = self._block_ports(block_id)
+        seeds = [q for port in ports for q in self._connections.get(port, ())]
+        for port in ports:
+            self._set_port_type(port, _MISSING)
+            self._class_errors.pop(port, None)
+            self._link_errors.pop(port, None)
+        self._group_errors.pop(block_id, None)
+        del self._declared[block_id]
+        del self._groups[block_id]
+        return seeds
+
+    def _add_link(self, link: LinkData) -> List[PortRef]:
+        source = PortRef(link.source_id, "output", link.source_port)
+        connections = [(source, PortRef(t.target_id, "input", t.port)) for t in link.target_nodes.values()]
+        self._links[link.id] = connections
+        for a, b in connections:
+            self._connect(a, b, 1)
+        return [port for connection in connections for port in connection]
+
+    def _remove_link(self, link_id: str) -> List[PortRef]:
+        connections = self._links.pop(link_id, [])
+        for a, b in connections:
+            self._connect(a, b, -1)
+        return [port for connection in connections for port in connection]
+
+    def _connect(self, a: PortRef, b: PortRef, count: int) -> None:
+        for port, other in ((a, b), (b, a)):
+            connected = self._connections.setdefault(port, {})
+            connected[other] = connected.get(other, 0) + count
+            if not connected[other]:
+                del connected[other]
+                if not connected:
+                    del self._connections[port]
+
+    def _neighbors(self, port: PortRef) -> List[Tuple[PortRef, PortType]]:
+        """
+        Existing ports connected to port by a link or sharing its inheritance group, with their declared types.
+        """
+        neighbors = []
+        for other in self._connections.get(port, ()):
+            declared = self._declared_type(other)
+            if declared is not None:
+                neighbors.append((other, declared))
+        group = self._declared_type(port).inheritance_group
+        for other in self._groups[port.block_id][group]:
+            if other != port:
+                neighbors.append((other, self._declared_type(other)))
+        return neighbors
+
+    # ---------------------------------------------------------
+    # Resolution
+    # ---------------------------------------------------------
+
+    def _finish_edit(self, seeds: List[PortRef]) -> Dict[PortRef, Optional[PortType]]:
+        self._resolve(seeds, check_links=True)
+        changes = {}
+        for port, old in self._previous.items():
+            new = self._port_types.get(port)
+            if new is not (None if old is _MISSING else old):
+                changes[port] = new
+        self._previous = {}
+        return changes
+
+    def _resolve(self, seeds: Iterable[PortRef], check_links: bool) -> None:
+        """
+        Resolve again the classes of inherited ports around seeds, ports joined by links or
+        inheritance groups, from the known types around each class.
+        """
+        visited: Set[PortRef] = set()
+        for seed in list(seeds):
+            declared = self._declared_type(seed)
+            if declared is None:
+                continue
+            if check_links:
+                self._check_links(seed, declared)
+            if is_known(declared):
+                # The classes around a known port may have gained or lost it
+                starts = [other for other, other_type in self._neighbors(seed) if is_inherited(other_type)]
+            else:
+                starts = [seed]
+            for start in starts:
+                if start not in visited:
+                    visited.add(start)
+                    self._resolve_class(start, visited)
+
+    def _resolve_class(self, start: PortRef, visited: Set[PortRef]) -> None:
+        members = []
+        known_types: List[Tuple[PortRef, PortType]] = []
+        stack = [start]
+        while stack:
+            port = stack.pop()
+            members.append(port)
+            for other, other_type in self._neighbors(port):
+                if is_known(other_type):
+                    known_types.append((other, other_type))
+                elif other not in visited:
+                    visited.add(other)
+                    stack.append(other)
+
+        class_type = None
+        error = None
+        for other, known_type in known_types:
+            if class_type is None:
+                class_type = known_type
+            elif not same_type(class_type, known_type):
+                error = (
+                    f"Incompatible port types {class_type.to_string()} vs {known_type.to_string()} "
+                    f"reaching inherited port {start} (from {other})"
+                )
+                break
+
+        if class_type is not None and error is None:
+            for port in members:
+                declared = self._declared_type(port)
+                if not is_allowed_inheritance(declared, class_type):
+                    error = (
+                        f"Incompatible inheritance: {class_type} not allowed for port constraints "
+                        f"{list(declared.supported_port_types_for_inheritance)} of {port}"
+                    )
+                    break
+
+        for port in members:
+            declared = self._declared_type(port)
+            if error is not None:
+                self._class_errors[port] = error
+            else:
+                self._class_errors.pop(port, None)
+            if class_type is None or error is not None:
+                self._set_port_type(port, declared)
+            else:
+                self._set_port_type(port, class_type.with_inheritance_group(declared.inheritance_group))
+
+    def _check_links(self, port: PortRef, declared: PortType) -> None:
+        """
+        Connections between two known ports must have the same type, the error is kept on the input port.
+        """
+        if port.direction == "output":
+            for other in self._connections.get(port, ()):
+                other_type = self._declared_type(other)
+                if other_type is not None:
+                    self._check_links_to(other, other_type)
+        else:
+            self._check_links_to(port, declared)
+
+    def _check_links_to(self, port: PortRef, declared: PortType) -> None:
+        self._link_errors.pop(port, None)
+        if is_inherited(declared):
+            return
+        for source in self._connections.get(port, ()):
+            source_type = self._declared_type(source)
+            if source_type is not None and is_known(source_type) and not same_type(source_type, declared):
+                self._link_errors[port] = (
+                    f"Incompatible port types {source_type} vs {declared}. Connection {source} -> {port}"
+                )
+                return
+
+    def _check_groups(self, block_id: str) -> None:
+        self._group_errors.pop(block_id, None)
+        known: Dict[int, PortType] = {}
+        for port in self._block_ports(block_id):
+            declared = self._declared_type(port)
+            if is_inherited(declared):
+                continue
+            group_type = known.setdefault(declared.inheritance_group, declared)
+            if not same_type(group_type, declared):
+                self._group_errors.setdefault(block_id, []).append(
+                    f"Conflicting inherited group {declared.inheritance_group} on block '{block_id}'"
+                )
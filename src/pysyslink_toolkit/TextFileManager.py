@@ -1,10 +1,13 @@
+import json
 import os
 from typing import Any, Dict, List
 import yaml
 
-from pysyslink_toolkit import HighLevelSystem
 from pysyslink_toolkit.HighLevelBlock import HighLevelBlock
 
+# libyaml based safe loader when PyYAML was built with it, several times faster than the pure Python one
+YAML_SAFE_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 def _resolve_single_path(p: str, config_dir: str) -> str:
     if p is None:
@@ -68,7 +71,7 @@ def _resolve_paths_recursive(obj: Any, config_dir: str) -> Any:
 
     return obj
 
-def load_yaml_file(yaml_file: str | None) -> Dict[str, Any]:
+def load_yaml_file(yaml_file: str | None, loader: type = yaml.SafeLoader) -> Dict[str, Any]:
     if yaml_file is None:
         return {}
     if not os.path.exists(yaml_file):
@@ -76,12 +79,63 @@ def load_yaml_file(yaml_file: str | None) -> Dict[str, Any]:
 
     try:
         with open(yaml_file, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f)
+            data = yaml.load(f, Loader=loader)
     except yaml.YAMLError as e:
         raise yaml.YAMLError(f"YAML parsing error in '{yaml_file}': {e}") from e
     except OSError as e:
         raise OSError(f"Could not open configuration file '{yaml_file}': {e}") from e
     
+    return _check_yaml_mapping(data, yaml_file)
+
+def load_yaml_content(content: str | bytes, yaml_file: str, loader: type = yaml.SafeLoader) -> Dict[str, Any]:
+    """
+    Same as load_yaml_file, for contents already read from yaml_file.
+    """
+    try:
+        data = yaml.load(content, Loader=loader)
+    except yaml.YAMLError as e:
+        raise yaml.YAMLError(f"YAML parsing error in '{yaml_file}': {e}") from e
+
+    return _check_yaml_mapping(data, yaml_file)
+
+def load_structured_file(file_path: str | None) -> Dict[str, Any]:
+    """
+    Mapping stored in a JSON or YAML file, such as a .pslk system, read once and parsed with the
+    fastest parser for its format.
+
+    Contents starting with '{' are parsed with json. If they are not valid JSON (a YAML flow
+    mapping for instance) and for every other file, YAML_SAFE_LOADER is used.
+    """
+    if file_path is None:
+        return {}
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Configuration file not found: '{file_path}'")
+
+    try:
+        with open(file_path, "rb") as f:
+            content = f.read()
+    except OSError as e:
+        raise OSError(f"Could not open configuration file '{file_path}': {e}") from e
+
+    if _looks_like_json(content):
+        try:
+            data = json.loads(content)
+        except ValueError:
+            pass
+        else:
+            return _check_yaml_mapping(data, file_path)
+
+    return load_yaml_content(content, file_path, loader=YAML_SAFE_LOADER)
+
+def _looks_like_json(content: bytes) -> bool:
+    start = 3 if content.startswith(b"\xef\xbb\xbf") else 0
+    for byte in content[start:start + 4096]:
+        if byte in b" \t\r\n":
+            continue
+        return byte == ord("{")
+    return False
+
+def _check_yaml_mapping(data: Any, yaml_file: str) -> Dict[str, Any]:
     if data is None:
         raise ValueError(f"Configuration file '{yaml_file}' is empty.")
     if not isinstance(data, dict):
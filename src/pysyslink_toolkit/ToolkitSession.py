@@ -0,0 +1,323 @@
+import glob
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+from pysyslink_toolkit.BlockCompilationCache import BlockCompilationCache
+from pysyslink_toolkit.BlockRenderInformation import BlockRenderInformation
+from pysyslink_toolkit.HighLevelBlock import HighLevelBlock
+from pysyslink_toolkit.HighLevelSystem import HighLevelSystem
+from pysyslink_toolkit.InitScriptCache import InitScriptCache
+from pysyslink_toolkit.SubsystemRenderInformation import SubsystemRenderInformation
+from pysyslink_toolkit.TextFileManager import load_structured_file
+from pysyslink_toolkit.block_libraries.BlockLibraryPlugin import BlockLibraryPlugin
+from pysyslink_toolkit.block_libraries.BlockLibraryPluginConfig import BlockLibraryConfig, BlockLibraryPluginType
+from pysyslink_toolkit.block_libraries.BlockTypeRegistry import BlockTypeRegistry
+from pysyslink_toolkit.block_libraries.ParseBlockLibraries import (
+    get_block_library_search_paths,
+    load_block_library_plugins_from_paths,
+    resolve_block_libraries,
+)
+from pysyslink_toolkit.compile_system import compile_high_level_system
+from pysyslink_toolkit.subsystems.SubsystemRenderInfoManager import _get_subsystem_render_information
+from pysyslink_toolkit.toolkit_config.ParseToolkitConfig import parse_toolkit_config
+from pysyslink_toolkit.toolkit_config.ToolkitConfig import ToolkitConfig
+
+logger = logging.getLogger(__name__)
+
+
+FileFingerprint = Tuple[int, int] | None
+
+
+def _file_fingerprint(path: str) -> FileFingerprint:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class _CachedFileValue:
+    """
+    A value computed from a set of files, valid while none of their fingerprints change.
+    """
+    def __init__(self, value: Any, fingerprints: Dict[str, FileFingerprint]):
+        self.value = value
+        self.fingerprints = fingerprints
+
+    def is_valid(self) -> bool:
+        return all(_file_fingerprint(path) == fingerprint for path, fingerprint in self.fingerprints.items())
+
+
+# Parsed .pslk files kept by load_system_json, least recently used evicted
+MAX_CACHED_SYSTEM_JSONS = 64
+
+_system_jsons: "OrderedDict[str, _CachedFileValue]" = OrderedDict()
+_system_jsons_lock = threading.Lock()
+
+
+def load_system_json(pslk_path: str) -> Dict[str, Any]:
+    """
+    Contents of a .pslk file, read and parsed again only when the file changes.
+
+    Shared by all the sessions, so that a file read before knowing its toolkit configuration
+    (by the CLI, to find it) is not read again by the session compiling it.
+    """
+    key = os.path.abspath(pslk_path)
+    with _system_jsons_lock:
+        cached = _system_jsons.get(key)
+        if cached is not None and cached.is_valid():
+            _system_jsons.move_to_end(key)
+            return cached.value
+        fingerprint = _file_fingerprint(key)
+        cached = _CachedFileValue(load_structured_file(pslk_path), {key: fingerprint})
+        _system_jsons[key] = cached
+        _system_jsons.move_to_end(key)
+        while len(_system_jsons) > MAX_CACHED_SYSTEM_JSONS:
+            _system_jsons.popitem(last=False)
+        return cached.value
+
+
+def clear_shared_caches() -> None:
+    """
+    Drop the caches shared by all the sessions: the parsed .pslk files, and the default
+    InitScriptCache and BlockCompilationCache.
+    """
+    with _system_jsons_lock:
+        _system_jsons.clear()
+    InitScriptCache.get_default().clear()
+    BlockCompilationCache.get_default().clear()
+
+
+class ToolkitSession:
+    """
+    Long-lived toolkit state for one toolkit configuration.
+
+    The toolkit config, the loaded block library plugins, the parsed .pslk files, the evaluated
+    initialization script namespaces and the systems built from them are kept between calls and
+    reloaded only when the files they come from change. Files are checked with a stat on every
+    call, except the plugin trees, which are rechecked at most once every plugin_check_interval
+    seconds. Compiled blocks are kept in the shared BlockCompilationCache, so compiling a system
+    again after an edit only compiles the blocks that changed.
+
+    The last MAX_HIGH_LEVEL_SYSTEMS systems built are kept, and the last MAX_CACHED_SYSTEM_JSONS
+    .pslk files parsed by all the sessions.
+    """
+
+    MAX_HIGH_LEVEL_SYSTEMS = 16
+
+    def __init__(self, toolkit_config_path: str | None, plugin_check_interval: float = 1.0):
+        # Absolute, so that the session reads the same file after the working directory changes
+        self.toolkit_config_path = os.path.abspath(toolkit_config_path) if toolkit_config_path is not None else None
+        self.plugin_check_interval = plugin_check_interval
+
+        self._lock = threading.RLock()
+        self._toolkit_config: _CachedFileValue | None = None
+        self._plugins: _CachedFileValue | None = None
+        self._block_type_registry: BlockTypeRegistry | None = None
+        self._plugin_config_files: set[str] = set()
+        self._plugins_checked_at = 0.0
+        # (pslk path, load_geometry) -> (system json, parameter namespace, system built from them)
+        self._high_level_systems: "OrderedDict[Tuple[str, bool], Tuple[Dict[str, Any], Dict[str, Any], HighLevelSystem]]" = OrderedDict()
+
+    def invalidate(self) -> None:
+        """
+        Drop everything cached by this session. The caches shared with the other sessions are
+        dropped by clear_shared_caches.
+        """
+        with self._lock:
+            self._toolkit_config = None
+            self._plugins = None
+            self._block_type_registry = None
+            self._high_level_systems.clear()
+
+    # ---------------------------------------------------------
+    # Cached inputs
+    # ---------------------------------------------------------
+
+    def get_toolkit_config(self) -> ToolkitConfig:
+        with self._lock:
+            if self._toolkit_config is None or not self._toolkit_config.is_valid():
+                fingerprints = {}
+                if self.toolkit_config_path is not None:
+                    fingerprints[self.toolkit_config_path] = _file_fingerprint(self.toolkit_config_path)
+                self._toolkit_config = _CachedFileValue(parse_toolkit_config(self.toolkit_config_path), fingerprints)
+                self._plugins = None
+            return self._toolkit_config.value
+
+    def get_block_library_plugins(self) -> List[BlockLibraryPlugin]:
+        with self._lock:
+            toolkit_config = self.get_toolkit_config()
+            search_paths = get_block_library_search_paths(toolkit_config.plugin_paths)
+
+            if self._plugins is not None:
+                now = time.monotonic()
+                if now - self._plugins_checked_at < self.plugin_check_interval:
+                    return self._plugins.value
+                self._plugins_checked_at = now
+                if self._plugins.is_valid() and set(self._find_plugin_config_files(search_paths)) == self._plugin_config_files:
+                    return self._plugins.value
+
+            plugin_config_files = self._find_plugin_config_files(search_paths)
+            fingerprints = {path: _file_fingerprint(path) for path in plugin_config_files}
+
+            plugins = load_block_library_plugins_from_paths(toolkit_config.plugin_paths)
+            for plugin in plugins:
+                python_path = self._get_plugin_python_file(plugin)
+                if python_path is not None:
+                    fingerprints[python_path] = _file_fingerprint(python_path)
+
+            self._plugins = _CachedFileValue(plugins, fingerprints)
+            self._block_type_registry = BlockTypeRegistry(plugins)
+            self._plugin_config_files = set(plugin_config_files)
+            self._plugins_checked_at = time.monotonic()
+            return plugins
+
+    def get_block_type_registry(self) -> BlockTypeRegistry:
+        """
+        Dispatch index of the current plugins, rebuilt together with them.
+        """
+        with self._lock:
+            self.get_block_library_plugins()
+            return self._block_type_registry
+
+    def get_system_json(self, pslk_path: str) -> Dict[str, Any]:
+        return load_system_json(pslk_path)
+
+    def get_parameter_environment(self, pslk_path: str) -> Dict[str, Any]:
+        """
+        Namespace of the initialization script of the system in pslk_path, run again only when the
+        script or a file it reads or imports changes.
+        """
+        system_json = self.get_system_json(pslk_path)
+        return HighLevelSystem.get_parameter_environment(pslk_path, system_json)
+
+    def load_high_level_system(self, pslk_path: str, load_geometry: bool = True) -> Tuple[HighLevelSystem, Dict[str, Any]]:
+        """
+        A new HighLevelSystem built from the cached .pslk contents and parameter namespace.
+        """
+        system_json = self.get_system_json(pslk_path)
+        parameter_environment = self.get_parameter_environment(pslk_path)
+        return HighLevelSystem.from_dict_file(pslk_path, system_json, parameter_environment, load_geometry=load_geometry)
+
+    def get_high_level_system(self, pslk_path: str, load_geometry: bool = True) -> HighLevelSystem:
+        """
+        The HighLevelSystem of pslk_path, built again only when its .pslk contents or parameter
+        namespace change. Shared between calls, it must not be changed: use flattened() rather
+        than flatten_subsystems().
+        """
+        system_json = self.get_system_json(pslk_path)
+        parameter_environment = self.get_parameter_environment(pslk_path)
+        key = (os.path.abspath(pslk_path), load_geometry)
+        with self._lock:
+            cached = self._high_level_systems.get(key)
+            if cached is not None and cached[0] is system_json and cached[1] is parameter_environment:
+                self._high_level_systems.move_to_end(key)
+                return cached[2]
+        high_level_system, _ = HighLevelSystem.from_dict_file(pslk_path, system_json, parameter_environment, load_geometry=load_geometry)
+        with self._lock:
+            self._high_level_systems[key] = (system_json, parameter_environment, high_level_system)
+            self._high_level_systems.move_to_end(key)
+            while len(self._high_level_systems) > self.MAX_HIGH_LEVEL_SYSTEMS:
+                self._high_level_systems.popitem(last=False)
+        return high_level_system
+
+    # ---------------------------------------------------------
+    # API operations
+    # ---------------------------------------------------------
+
+    def compile_system(self, pslk_path: str, output_yaml_path: str, jobs: int = 1, output_format: str = "yaml") -> None:
+        """
+        jobs: processes compiling the blocks, all the CPUs for jobs <= 0, see compile_high_level_system.
+        output_format: "yaml" or "json", see compile_high_level_system.
+        """
+        block_type_registry = self.get_block_type_registry()
+        high_level_system = self.get_high_level_system(pslk_path, load_geometry=False)
+        compile_high_level_system(
+            high_level_system, block_type_registry, output_yaml_path, BlockCompilationCache.get_default(),
+            jobs=jobs, plugin_paths=self.get_toolkit_config().plugin_paths, output_format=output_format,
+        )
+
+    def get_available_block_libraries(self) -> List[BlockLibraryConfig]:
+        libraries: list[BlockLibraryConfig] = []
+        for plugin in self.get_block_library_plugins():
+            libraries.extend(plugin.block_library_plugin_config.blockLibraries)
+        return resolve_block_libraries(libraries)
+
+    def get_block_render_information(self, block_data: Dict[str, Any], pslk_path: str) -> BlockRenderInformation:
+        block_type_registry = self.get_block_type_registry()
+        parameter_environment_dict = self.get_parameter_environment(pslk_path)
+
+        block = HighLevelBlock.from_dict(block_data, parameter_environment_dict)
+        logger.debug("Block data for render: %s", block_data)
+        logger.debug("Looking for render info on block: %s, %s, %s", block.block_library, block.block_type, block.label)
+        for plugin in block_type_registry.get_plugins(block.block_library, block.block_type):
+            try:
+                return plugin.get_block_render_information(block)
+            except NotImplementedError:
+                continue
+            except Exception as e:
+                raise RuntimeError(f"Exception while getting block render information: {e}")
+        raise RuntimeError(f"No plugin could provide render information for block: {block.block_type}")
+
+    def get_subsystem_render_information(self, subsystem_data: Dict[str, Any], pslk_path: str) -> SubsystemRenderInformation:
+        toolkit_config = self.get_toolkit_config()
+        parameter_environment_dict = self.get_parameter_environment(pslk_path)
+        return _get_subsystem_render_information(toolkit_config, parameter_environment_dict, subsystem_data, pslk_path)
+
+    def get_block_html(self, block_data: Dict[str, Any], pslk_path: str) -> str:
+        block_type_registry = self.get_block_type_registry()
+        parameter_environment_dict = self.get_parameter_environment(pslk_path)
+
+        block = HighLevelBlock.from_dict(block_data, parameter_environment_dict)
+        for plugin in block_type_registry.get_plugins(block.block_library, block.block_type):
+            try:
+                return plugin.get_block_html(block, pslk_path)
+            except NotImplementedError:
+                continue
+            except Exception as e:
+                raise RuntimeError(f"Exception while getting block html: {e}")
+        raise RuntimeError(f"No plugin could provide html for block: {block.block_type}")
+
+    # ---------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------
+
+    @staticmethod
+    def _find_plugin_config_files(search_paths: List[str]) -> List[str]:
+        files = []
+        for path in search_paths:
+            files.extend(glob.glob(os.path.join(path, "**", "*.pslkblp.yaml"), recursive=True))
+        return files
+
+    @staticmethod
+    def _get_plugin_python_file(plugin: BlockLibraryPlugin) -> str | None:
+        plugin_config = plugin.block_library_plugin_config
+        if plugin_config.yaml_filename is None:
+            return None
+        if plugin_config.pluginType not in (BlockLibraryPluginType.HighLevelBlockLibrary, BlockLibraryPluginType.SystemLibrary):
+            return None
+        python_filename = plugin_config.metadata.get("pythonFilename")
+        if not python_filename:
+            return None
+        return os.path.join(os.path.dirname(plugin_config.yaml_filename), python_filename)
+
+
+_default_sessions: Dict[str | None, ToolkitSession] = {}
+_default_sessions_lock = threading.Lock()
+
+
+def get_default_session(toolkit_config_path: str | None) -> ToolkitSession:
+    """
+    Process-wide session for toolkit_config_path, used by the module level functions of pysyslink_toolkit.api.
+    """
+    key = os.path.abspath(toolkit_config_path) if toolkit_config_path is not None else None
+    with _default_sessions_lock:
+        session = _default_sessions.get(key)
+        if session is None:
+            session = ToolkitSession(key)
+            _default_sessions[key] = session
+        return session
@@ -2,4 +2,10 @@ from .BlockRenderInformation import BlockRenderInformation
 from .HighLevelBlock import HighLevelBlock
 from .LowLevelBlockStructure import LowLevelBlockStructure
 from .block_libraries.BlockLibraryPlugin import BlockLibraryPlugin
-from .api import *
\ No newline at end of file
+from .api import *
+
+
+def __getattr__(name):
+    # Names that api loads on first use (ToolkitSession, simulate_system, ...)
+    from . import api
+    return getattr(api, name)
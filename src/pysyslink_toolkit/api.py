@@ -1,10 +1,7 @@
-import asyncio
-import json
+import importlib
+import logging
 import os
-import pathlib
-import runpy
 import traceback
-import yaml
 from typing import Any, Callable, Dict, List
 
 from pysyslink_toolkit.SubsystemRenderInformation import SubsystemRenderInformation
@@ -14,24 +11,70 @@ from pysyslink_toolkit.LowLevelBlockStructure import LowLevelBlockStructure
 from pysyslink_toolkit.BlockRenderInformation import BlockRenderInformation
 from pysyslink_toolkit.block_libraries.BlockLibraryPlugin import BlockLibraryPlugin
 from pysyslink_toolkit.block_libraries.BlockLibraryPluginConfig import BlockLibraryConfig
-from pysyslink_toolkit.block_libraries.ParseBlockLibraries import load_block_library_plugins_from_paths, resolve_block_libraries
-from pysyslink_toolkit.compile_system import compile_pslk_to_yaml
-from pysyslink_toolkit.simulate_system import simulate_system
-from pysyslink_toolkit.TextFileManager import load_yaml_file
-from pysyslink_toolkit.subsystems.SubsystemRenderInfoManager import _get_subsystem_render_information
-from pysyslink_toolkit.toolkit_config.ParseToolkitConfig import parse_toolkit_config
-
-def compile_system(toolkit_config_path: str, pslk_path: str, output_yaml_path: str) -> str:
+
+logger = logging.getLogger(__name__)
+
+# Heavy modules (yaml, dacite, the compile and simulate chains) are imported on first use,
+# importing pysyslink_toolkit only loads the light model classes above
+_LAZY_ATTRIBUTES = {
+    "PortTypeEngine": "pysyslink_toolkit.PortTypeEngine",
+    "ToolkitSession": "pysyslink_toolkit.ToolkitSession",
+    "get_default_session": "pysyslink_toolkit.ToolkitSession",
+    "clear_shared_caches": "pysyslink_toolkit.ToolkitSession",
+    "load_block_library_plugins_from_paths": "pysyslink_toolkit.block_libraries.ParseBlockLibraries",
+    "resolve_block_libraries": "pysyslink_toolkit.block_libraries.ParseBlockLibraries",
+    "compile_pslk_to_yaml": "pysyslink_toolkit.compile_system",
+    "simulate_system": "pysyslink_toolkit.simulate_system",
+    "load_yaml_file": "pysyslink_toolkit.TextFileManager",
+    "parse_toolkit_config": "pysyslink_toolkit.toolkit_config.ParseToolkitConfig",
+}
+
+__all__ = [
+    "compile_system",
+    "run_simulation",
+    "compile_and_run_simulation",
+    "get_available_block_libraries",
+    "get_block_render_information",
+    "get_subsystem_render_information",
+    "get_block_html",
+    "SubsystemRenderInformation",
+    "HighLevelBlock",
+    "HighLevelSystem",
+    "LowLevelBlockStructure",
+    "BlockRenderInformation",
+    "BlockLibraryPlugin",
+    "BlockLibraryConfig",
+]
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+def compile_system(toolkit_config_path: str, pslk_path: str, output_yaml_path: str, jobs: int = 1,
+                   output_format: str = "yaml") -> str:
     """
     Compile a high-level system (dict) to a low-level system (dict).
+
+    jobs: processes compiling the blocks in parallel, all the CPUs for jobs <= 0. The output does
+    not depend on it.
+    output_format: "yaml", or "json" to write compact JSON, which YAML loaders (and so the
+    simulator) read as the same system and which is much faster to write for large systems.
     """
 
+    from pysyslink_toolkit.ToolkitSession import get_default_session
+
     try:
-        compile_pslk_to_yaml(pslk_path, toolkit_config_path, output_yaml_path)
+        get_default_session(toolkit_config_path).compile_system(pslk_path, output_yaml_path, jobs=jobs, output_format=output_format)
         return 'success'
     except Exception as e:
-        print(f"Compilation failed: {e}")
-        print(traceback.format_exc())
+        logger.exception("Compilation failed: %s", e)
         return 'failure: {}'.format(traceback.format_exc())
 
 async def run_simulation(toolkit_config_path: str | None, low_level_system: str, sim_options: str, 
@@ -43,34 +86,39 @@ async def run_simulation(toolkit_config_path: str | None, low_level_system: str,
     # For now, just return a dummy result.
 
 
-    print("Calling simulation")
+    from pysyslink_toolkit.simulate_system import simulate_system
+
+    logger.info("Calling simulation")
     result = await simulate_system(
         system_yaml_path=low_level_system,
         sim_options_yaml_path=sim_options,
         display_callback=display_callback
     )
-    print("Simulation done")
+    logger.info("Simulation done")
 
 
     return result
 
-async def compile_and_run_simulation(toolkit_config_path: str, pslk_path: str, low_level_system_yaml_path: str, sim_config_path: str) -> dict:
-    print("pslkPath on run_simulation: {}".format(pslk_path))
+async def compile_and_run_simulation(toolkit_config_path: str, pslk_path: str, low_level_system_yaml_path: str, sim_config_path: str,
+                                     jobs: int = 1, output_format: str = "yaml") -> dict:
+    logger.debug("pslkPath on run_simulation: %s", pslk_path)
     pslk_base, pslk_ext = os.path.splitext(pslk_path)
     if pslk_ext.lower() == ".pslk":
         default_low_level = pslk_base + "_low_level_system.yaml"
     else:
         default_low_level = pslk_path + "_low_level_system.yaml"
 
-    print(f"Low-level system YAML path: {low_level_system_yaml_path}")
+    logger.debug("Low-level system YAML path: %s", low_level_system_yaml_path)
 
     # Compile high-level to low-level YAML
     result = compile_system(
         toolkit_config_path,
         pslk_path,
-        low_level_system_yaml_path
+        low_level_system_yaml_path,
+        jobs=jobs,
+        output_format=output_format,
     )
-    print(f"Compilation result: {result}")
+    logger.info("Compilation result: %s", result)
 
     if result != 'success':
         raise RuntimeError(f"Compilation failed with message: {result}")
@@ -87,67 +135,31 @@ def get_available_block_libraries(toolkit_config_path: str | None) -> List[Block
     """
     Return all available libraries and blocks from loaded plugins.
     """
-    toolkit_config = parse_toolkit_config(toolkit_config_path)
-    block_library_plugins = load_block_library_plugins_from_paths(toolkit_config.plugin_paths)
-    libraries: list[BlockLibraryConfig] = []
-    for plugin in block_library_plugins:
-        libraries.extend(plugin.block_library_plugin_config.blockLibraries)
-    return resolve_block_libraries(libraries)
+    from pysyslink_toolkit.ToolkitSession import get_default_session
+
+    return get_default_session(toolkit_config_path).get_available_block_libraries()
 
 def get_block_render_information(toolkit_config_path: str | None, block_data: Dict[str, Any], pslk_path: str) -> BlockRenderInformation:
     """
     Return render information for a block.
     """
-    toolkit_config = parse_toolkit_config(toolkit_config_path)
-    block_library_plugins = load_block_library_plugins_from_paths(toolkit_config.plugin_paths)
-    system_json = load_yaml_file(pslk_path)
+    from pysyslink_toolkit.ToolkitSession import get_default_session
 
-    high_level_system, parameter_environment_dict = HighLevelSystem.from_dict_file(pslk_path, system_json)
-    
-    block = HighLevelBlock.from_dict(block_data, parameter_environment_dict)
-    print(f"Block data for render: {block_data}")
-    print(f"Looking for render info on block: {block.block_library}, {block.block_type}, {block.label}")
-    for plugin in block_library_plugins:
-        try:
-            print(f"Testing plugin {plugin.block_library_plugin_config.pluginName}")
-            return plugin.get_block_render_information(block)
-        except NotImplementedError as e:
-            print(f"Not implemented error happened: {e}")
-            continue
-        except Exception as e:
-            raise RuntimeError(f"Exception while getting block render information: {e}")
-    raise RuntimeError(f"No plugin could provide render information for block: {block.block_type}")
+    return get_default_session(toolkit_config_path).get_block_render_information(block_data, pslk_path)
 
 def get_subsystem_render_information(toolkit_config_path: str | None, subsystem_data: Dict[str, Any], pslk_path: str) -> SubsystemRenderInformation:
     """
     Return render information for a subsystem.
     """
-    toolkit_config = parse_toolkit_config(toolkit_config_path)
-    system_json = load_yaml_file(pslk_path)
+    from pysyslink_toolkit.ToolkitSession import get_default_session
 
-    high_level_system, parameter_environment_dict = HighLevelSystem.from_dict_file(pslk_path, system_json)
-    
-    subsystem_render_info = _get_subsystem_render_information(toolkit_config, parameter_environment_dict, subsystem_data, pslk_path)
-    return subsystem_render_info
+    return get_default_session(toolkit_config_path).get_subsystem_render_information(subsystem_data, pslk_path)
     
 
 def get_block_html(toolkit_config_path: str | None, block_data: Dict[str, Any], pslk_path: str) -> str:
-    toolkit_config = parse_toolkit_config(toolkit_config_path)
-    block_library_plugins = load_block_library_plugins_from_paths(toolkit_config.plugin_paths)
+    from pysyslink_toolkit.ToolkitSession import get_default_session
 
-    system_json = load_yaml_file(pslk_path)
-
-    high_level_system, parameter_environment_dict = HighLevelSystem.from_dict_file(pslk_path, system_json)
-    
-    block = HighLevelBlock.from_dict(block_data, parameter_environment_dict)    
-    for plugin in block_library_plugins:
-        try:
-            return plugin.get_block_html(block, pslk_path)
-        except NotImplementedError:
-            continue
-        except Exception as e:
-            raise RuntimeError(f"Exception while getting block html: {e}")
-    raise RuntimeError(f"No plugin could provide html for block: {block.block_type}")
+    return get_default_session(toolkit_config_path).get_block_html(block_data, pslk_path)
 
 if __name__ == "__main__":
     test_dir = os.path.join(os.path.dirname(__file__), "..", "..", "tests", "data")
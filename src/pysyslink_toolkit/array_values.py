@@ -0,0 +1,70 @@
+import sys
+from typing import Any, List
+
+
+def is_numpy_array(value: Any) -> bool:
+    """
+    Whether value is a numpy.ndarray, without importing numpy: an array comes from code that
+    already imported it (usually an init script).
+    """
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(value, numpy.ndarray)
+
+
+def _vector_items(value: Any) -> Any:
+    if value.ndim != 1:
+        raise ValueError(f"Expected a one-dimensional array, got an array of shape {value.shape}")
+    return value
+
+
+def to_float_list(value: Any) -> List[float]:
+    """
+    value (a list or a one-dimensional array) as a list of Python floats. Arrays of numbers are
+    converted by numpy, without rounding float64 values.
+    """
+    if not is_numpy_array(value):
+        return [float(v) for v in value]
+    value = _vector_items(value)
+    if value.dtype.kind in "fiub":
+        return value.astype(float, copy=False).tolist()
+    return [float(v) for v in value.tolist()]
+
+
+def to_int_list(value: Any) -> List[int]:
+    """
+    value (a list or a one-dimensional array) as a list of Python ints, truncating floats as int() does.
+    """
+    if not is_numpy_array(value):
+        return [int(v) for v in value]
+    value = _vector_items(value)
+    if value.dtype.kind in "iu":
+        return value.tolist()
+    if value.dtype.kind == "b":
+        return value.astype(int).tolist()
+    return [int(v) for v in value.tolist()]
+
+
+def to_python_list(value: Any) -> List[Any]:
+    """
+    value (a list or a one-dimensional array) as a list of Python values.
+    """
+    if not is_numpy_array(value):
+        return value
+    return _vector_items(value).tolist()
+
+
+def to_matrix_string(value: Any) -> str:
+    """
+    value (nested lists or an array) as the string of nested lists, so that arrays are written
+    like lists: in full, with the repr of each value, rather than in the summarized str of numpy.
+    """
+    if is_numpy_array(value):
+        return str(value.tolist())
+    return str(value)
+
+
+def format_float_list(value: Any) -> List[str]:
+    """
+    repr of each value of to_float_list(value), the shortest string read back as the same float.
+    """
+    return list(map(float.__repr__, to_float_list(value)))
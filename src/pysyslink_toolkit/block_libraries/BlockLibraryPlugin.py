@@ -1,30 +1,45 @@
 
 
 import abc
-from typing import Optional
+import logging
+from typing import Dict, Optional
 
 from pysyslink_toolkit.BlockRenderInformation import BlockRenderInformation
 from pysyslink_toolkit.HighLevelBlock import HighLevelBlock
 from pysyslink_toolkit.LowLevelBlockStructure import LowLevelBlockStructure
 from pysyslink_toolkit.block_libraries.BlockLibraryPluginConfig import BlockLibraryPluginConfig, BlockTypeConfig
 
+logger = logging.getLogger(__name__)
+
 
 class BlockLibraryPlugin(abc.ABC):
     def __init__(self, block_library_plugin_config: BlockLibraryPluginConfig):
         self.block_library_plugin_config = block_library_plugin_config
+        self._block_type_index: Dict[str, Dict[str, BlockTypeConfig]] | None = None
         
 
     def get_block_type_config(self, block_library_name: str, block_type_name: str) -> Optional[BlockTypeConfig]:
-        block_library = next(filter(lambda lib: lib.name == block_library_name, self.block_library_plugin_config.blockLibraries), None)
-        if block_library == None:
-            print(f"Block libraries available: {self.block_library_plugin_config.blockLibraries}")
+        if getattr(self, "_block_type_index", None) is None:
+            # Built on first use, subclasses may rename libraries in their constructor
+            self._block_type_index = {}
+            for lib in self.block_library_plugin_config.blockLibraries:
+                library_index = self._block_type_index.setdefault(lib.name, {})
+                for block_type in lib.blockTypes:
+                    library_index.setdefault(block_type.name, block_type)
+
+        block_library = self._block_type_index.get(block_library_name)
+        if block_library is None:
             raise NotImplementedError(f"Block library {block_library_name} not in plugin {self.block_library_plugin_config.pluginName}")
-        block_type = next(filter(lambda block_type: block_type.name == block_type_name, block_library.blockTypes))
-        if block_type == None:
-            raise NotImplementedError(f"Block type {block_type_name} not found on library {block_library.name} in plugin {self.block_library_plugin_config.pluginName}")
+        block_type = block_library.get(block_type_name)
+        if block_type is None:
+            raise NotImplementedError(f"Block type {block_type_name} not found on library {block_library_name} in plugin {self.block_library_plugin_config.pluginName}")
         return block_type
 
     def compile_block(self, high_level_block: HighLevelBlock) -> LowLevelBlockStructure:
+        """
+        Raises NotImplementedError for blocks the plugin does not compile, including blocks of a type
+        it registers: the next plugin registering the type is tried then.
+        """
         self.get_block_type_config(high_level_block.block_library, high_level_block.block_type)
         return self._compile_block(high_level_block)
 
@@ -68,8 +83,11 @@ class BlockLibraryPlugin(abc.ABC):
             render_information.output_port_labels,
         ) = block_type_config.get_port_labels(configuration_values)
 
-        print(f"Render info for block: {high_level_block.id}, input_port_labels: {render_information.input_port_labels}, output_port_labels: {render_information.output_port_labels}")
-        print(f"Block type config: {block_type_config}")
+        logger.debug(
+            "Render info for block: %s, input_port_labels: %s, output_port_labels: %s",
+            high_level_block.id, render_information.input_port_labels, render_information.output_port_labels,
+        )
+        logger.debug("Block type config: %s", block_type_config)
         return render_information
 
     def get_block_html(self, high_level_block: HighLevelBlock, pslk_path: str) -> str:
@@ -1,8 +1,8 @@
 import ast
 import enum
+import logging
 import re
 from typing import Any, Dict, Tuple
-import yaml
 
 
 from pysyslink_toolkit.HighLevelBlock import HighLevelBlock
@@ -16,6 +16,8 @@ from typing import List, Optional, Union
 from pysyslink_toolkit.PortType import FullySupportedSignalValueType, PortCategory, PortType, PortTypeConfig
 from pysyslink_toolkit.block_libraries.SafeEvaluator import SafeEvaluator
 
+logger = logging.getLogger(__name__)
+
 @dataclass
 class ConfigurationValue:
     name: str
@@ -170,7 +172,7 @@ class BlockTypeConfig:
                 f"Missing port type definitions for ports: {unresolved}"
             )
 
-        print(f"Resolved port types for configs {configs}: {result}")
+        logger.debug("Resolved port types for configs %s: %s", configs, result)
         return result
 
     def _resolve_port_type(self, cfg: PortTypeConfig, configuration_values: Dict[str, Any]) -> PortType:
@@ -179,7 +181,7 @@ class BlockTypeConfig:
         """
 
         category = PortCategory(self._resolve_string(cfg.port_category, configuration_values))
-        print(f"Supported port types for inheritance config: {cfg.supported_port_types_for_inheritance}")
+        logger.debug("Supported port types for inheritance config: %s", cfg.supported_port_types_for_inheritance)
 
         return PortType(
             port_category=category,
@@ -199,15 +201,15 @@ class BlockTypeConfig:
                 cfg.other_type_name, configuration_values
             ),
             supported_port_types_for_inheritance=
-                [
+                tuple(
                     self._resolve_port_type(x, configuration_values) if isinstance(x, PortTypeConfig) else x
                     for x in (cfg.supported_port_types_for_inheritance or [])
-                ]
+                )
                 if cfg.supported_port_types_for_inheritance
                 else None
             ,
             inheritance_group=cfg.inheritance_group
-        )
+        ).interned()
 
     def _resolve_signal_value_type(self, value: str | None, configuration_values: Dict[str, Any]) -> FullySupportedSignalValueType | None:
         if value is None:
@@ -257,7 +259,7 @@ class BlockTypeConfig:
         )
 
     def _resolve_labels(self, cfg: PortLabelConfig, expected_count, configuration_values):
-        print(f"Calling resolve labels with config {cfg}, configuration values {configuration_values}")
+        logger.debug("Calling resolve labels with config %s, configuration values %s", cfg, configuration_values)
         variables = dict(configuration_values)
         variables["PortCount"] = expected_count
 
@@ -300,7 +302,7 @@ class BlockTypeConfig:
                     f"Label {i} must be a string or None, got {type(x).__name__}."
                 )
 
-        print(f"Result of resolve labels is: {result}")
+        logger.debug("Result of resolve labels is: %s", result)
         return result
 
 @dataclass
@@ -0,0 +1,67 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pysyslink_toolkit.block_libraries.BlockLibraryPlugin import BlockLibraryPlugin
+from pysyslink_toolkit.block_libraries.BlockLibraryPluginConfig import BlockTypeConfig
+
+logger = logging.getLogger(__name__)
+
+
+class BlockTypeRegistry:
+    """
+    Index from (block_library, block_type) to the plugin providing the block type and its BlockTypeConfig.
+
+    Built once from the loaded plugins, so dispatching a block to its plugin is a dict lookup. When
+    several plugins register the same block type, they are kept in the order the plugins were
+    registered (the order in which plugins used to be probed): the first one is tried first and the
+    others are fallbacks for the blocks it raises NotImplementedError on. Collisions are recorded
+    in duplicates.
+    """
+
+    def __init__(self, plugins: Iterable[BlockLibraryPlugin] = ()):
+        self._entries: Dict[Tuple[str, str], Tuple[Tuple[BlockLibraryPlugin, BlockTypeConfig], ...]] = {}
+        self.duplicates: List[Tuple[str, str, BlockLibraryPlugin, BlockLibraryPlugin]] = []
+        for plugin in plugins:
+            self.register_plugin(plugin)
+
+    def register_plugin(self, plugin: BlockLibraryPlugin) -> None:
+        plugin_config = plugin.block_library_plugin_config
+        for block_library in plugin_config.blockLibraries:
+            for block_type in block_library.blockTypes:
+                key = (block_library.name, block_type.name)
+                existing = self._entries.get(key, ())
+                if existing:
+                    first = existing[0][0]
+                    self.duplicates.append((block_library.name, block_type.name, first, plugin))
+                    logger.warning(
+                        "Block type %s of library %s is registered by plugin %s and %s, trying %s first",
+                        block_type.name, block_library.name, first.block_library_plugin_config.pluginName,
+                        plugin_config.pluginName, first.block_library_plugin_config.pluginName,
+                    )
+                self._entries[key] = existing + ((plugin, block_type),)
+
+    def lookup(self, block_library: str, block_type: str) -> Optional[Tuple[BlockLibraryPlugin, BlockTypeConfig]]:
+        """
+        (plugin, block type config) of the first plugin registering the block type, or None.
+        """
+        entries = self._entries.get((block_library, block_type))
+        return entries[0] if entries else None
+
+    def lookup_all(self, block_library: str, block_type: str) -> Tuple[Tuple[BlockLibraryPlugin, BlockTypeConfig], ...]:
+        """
+        (plugin, block type config) of every plugin registering the block type, in registration order.
+        """
+        return self._entries.get((block_library, block_type), ())
+
+    def get_plugin(self, block_library: str, block_type: str) -> Optional[BlockLibraryPlugin]:
+        entry = self.lookup(block_library, block_type)
+        return entry[0] if entry is not None else None
+
+    def get_plugins(self, block_library: str, block_type: str) -> List[BlockLibraryPlugin]:
+        return [plugin for plugin, _ in self.lookup_all(block_library, block_type)]
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,13 +1,15 @@
+import logging
 from typing import Any, Dict
 
-import numpy as np
-
 from pysyslink_toolkit.BlockRenderInformation import BlockRenderInformation
 from pysyslink_toolkit.HighLevelBlock import HighLevelBlock
+from pysyslink_toolkit.array_values import is_numpy_array, to_float_list, to_int_list, to_matrix_string, to_python_list
 from pysyslink_toolkit.LowLevelBlockStructure import LowLevelBlock, LowLevelBlockStructure
 from pysyslink_toolkit.block_libraries.BlockLibraryPlugin import BlockLibraryPlugin
 from pysyslink_toolkit.block_libraries.BlockLibraryPluginConfig import BlockLibraryPluginConfig
 
+logger = logging.getLogger(__name__)
+
 
 
 class CoreBlockLibraryPlugin(BlockLibraryPlugin):
@@ -22,8 +24,8 @@ class CoreBlockLibraryPlugin(BlockLibraryPlugin):
 
         parameter_types = block_type.get_parameter_types({param_name: prop["value"] for param_name, prop in properties.items()})
 
-        print(f"block_type: {block_type}")
-        print(f"parameter_types: {parameter_types}")
+        logger.debug("block_type: %s", block_type)
+        logger.debug("parameter_types: %s", parameter_types)
 
         converted = {}
         for key, prop in properties.items():
@@ -33,7 +35,7 @@ class CoreBlockLibraryPlugin(BlockLibraryPlugin):
                 raise ValueError(f"Property {key} not defined in block type {block_type_name} of library {block_library_name}")
             
             # Convert based on expected_type
-            print(f"Converting property {key} with value {value} of type {type(value)} to expected type {parameter_type}")
+            logger.debug("Converting property %s with value %s of type %s to expected type %s", key, value, type(value), parameter_type)
             try:
                 if parameter_type == "double":
                     converted[key + "[double]"] = float(value)
@@ -46,42 +48,43 @@ class CoreBlockLibraryPlugin(BlockLibraryPlugin):
                 elif parameter_type == "complex_double":
                     converted[key + "[complex_double]"] = str(complex(value))
                 elif parameter_type == "matrix<int>":
-                    converted[key + "[matrix<int>]"] = str(value)
+                    converted[key + "[matrix<int>]"] = to_matrix_string(value)
 
                 elif parameter_type == "matrix<double>":
-                    converted[key + "[matrix<double>]"] = str(value)
+                    converted[key + "[matrix<double>]"] = to_matrix_string(value)
 
                 elif parameter_type == "matrix<bool>":
-                    converted[key + "[matrix<bool>]"] = str(value)
+                    converted[key + "[matrix<bool>]"] = to_matrix_string(value)
 
                 elif parameter_type == "matrix<complex_double>":
-                    converted[key + "[matrix<complex_double>]"] = str(value)
+                    converted[key + "[matrix<complex_double>]"] = to_matrix_string(value)
 
-                elif parameter_type.endswith("[]") and isinstance(value, list):
+                # numpy arrays (from init scripts) are converted as a whole
+                elif parameter_type.endswith("[]") and (isinstance(value, list) or is_numpy_array(value)):
                     base_type = parameter_type[:-2]
                     if base_type == "double":
-                        converted[key + "[vector<double>]"] = [float(v) for v in value]
+                        converted[key + "[vector<double>]"] = to_float_list(value)
                     elif base_type == "int":
-                        converted[key + "[vector<int>]"] = [int(v) for v in value]
+                        converted[key + "[vector<int>]"] = to_int_list(value)
                     elif base_type == "string":
-                        converted[key + "[vector<string>]"] = [str(v) for v in value]
+                        converted[key + "[vector<string>]"] = [str(v) for v in to_python_list(value)]
                     elif base_type == "complex_double":
-                        converted[key + "[vector<complex_double>]"] = [str(complex(v)) for v in value]
+                        converted[key + "[vector<complex_double>]"] = [str(complex(v)) for v in to_python_list(value)]
 
                     elif base_type == "matrix<int>":
-                        converted[key + "[vector<matrix<int>>]"] = [str(v) for v in value]
+                        converted[key + "[vector<matrix<int>>]"] = [to_matrix_string(v) for v in value]
 
                     elif base_type == "matrix<double>":
-                        converted[key + "[vector<matrix<double>>]"] = [str(v) for v in value]
+                        converted[key + "[vector<matrix<double>>]"] = [to_matrix_string(v) for v in value]
 
                     elif base_type == "matrix<bool>":
-                        converted[key + "[vector<matrix<bool>>]"] = [str(v) for v in value]
+                        converted[key + "[vector<matrix<bool>>]"] = [to_matrix_string(v) for v in value]
 
                     elif base_type == "matrix<complex_double>":
-                        converted[key + "[vector<matrix<complex_double>>]"] = [str(v) for v in value]
+                        converted[key + "[vector<matrix<complex_double>>]"] = [to_matrix_string(v) for v in value]
 
                     else:
-                        converted[key + "[vector<string>]"] = [str(v) for v in value]
+                        converted[key + "[vector<string>]"] = [str(v) for v in to_python_list(value)]
 
                 else:
                     converted[key + "[string]"] = value
@@ -102,8 +105,12 @@ class CoreBlockLibraryPlugin(BlockLibraryPlugin):
         )
         # Create a LowLevelBlock with the same attributes as the high-level block
 
-        print(f"Compiling block {high_level_block.id} of type {high_level_block.block_type}")
-        print(f"Output port types: {high_level_block.output_port_types}, to string: {[output_port_type.to_string() for output_port_type in high_level_block.output_port_types]}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Compiling block %s of type %s", high_level_block.id, high_level_block.block_type)
+            logger.debug(
+                "Output port types: %s, to string: %s", high_level_block.output_port_types,
+                [output_port_type.to_string() for output_port_type in high_level_block.output_port_types],
+            )
 
         low_level_block = LowLevelBlock(
             id=high_level_block.id,
@@ -0,0 +1,75 @@
+import importlib.util
+import inspect
+import pathlib
+import threading
+
+from pysyslink_toolkit.BlockRenderInformation import BlockRenderInformation
+from pysyslink_toolkit.HighLevelBlock import HighLevelBlock
+from pysyslink_toolkit.LowLevelBlockStructure import LowLevelBlockStructure
+from pysyslink_toolkit.block_libraries.BlockLibraryPlugin import BlockLibraryPlugin
+from pysyslink_toolkit.block_libraries.BlockLibraryPluginConfig import BlockLibraryPluginConfig
+
+
+def load_high_level_plugin_from_file(path: pathlib.Path, module_name: str, plugin_config: BlockLibraryPluginConfig) -> BlockLibraryPlugin:
+
+    spec = importlib.util.spec_from_file_location(module_name, str(path))
+    if not spec or not spec.loader:
+        raise ImportError(f"Cannot load module from {path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    # Find a subclass of Plugin in the module
+    for name, obj in inspect.getmembers(module, inspect.isclass):
+        if issubclass(obj, BlockLibraryPlugin) and obj is not BlockLibraryPlugin:
+            return obj(plugin_config)  # Instantiate and return the plugin
+
+    raise ImportError(f"No subclass of Plugin found in {path}")
+
+
+class LazyBlockLibraryPlugin(BlockLibraryPlugin):
+    """
+    High-level plugin registered from its YAML metadata alone.
+
+    Block type lookups are answered from the plugin config. The Python module of the plugin is
+    imported, and the actual plugin instantiated, the first time one of its block types is
+    compiled, rendered or asked for html; every call is then delegated to it.
+    """
+
+    def __init__(self, block_library_plugin_config: BlockLibraryPluginConfig, python_path: pathlib.Path, module_name: str):
+        super().__init__(block_library_plugin_config)
+        self.python_path = python_path
+        self.module_name = module_name
+        self._plugin: BlockLibraryPlugin | None = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._plugin is not None
+
+    def load(self) -> BlockLibraryPlugin:
+        """
+        Import the plugin module if not done yet and return the actual plugin.
+        """
+        if self._plugin is None:
+            with self._load_lock:
+                if self._plugin is None:
+                    self._plugin = load_high_level_plugin_from_file(self.python_path, self.module_name, self.block_library_plugin_config)
+        return self._plugin
+
+    def compile_block(self, high_level_block: HighLevelBlock) -> LowLevelBlockStructure:
+        return self.load().compile_block(high_level_block)
+
+    def _compile_block(self, high_level_block: HighLevelBlock) -> LowLevelBlockStructure:
+        return self.load()._compile_block(high_level_block)
+
+    def get_block_render_information(self, high_level_block: HighLevelBlock) -> BlockRenderInformation:
+        return self.load().get_block_render_information(high_level_block)
+
+    def _get_block_render_information(self, high_level_block: HighLevelBlock) -> BlockRenderInformation:
+        return self.load()._get_block_render_information(high_level_block)
+
+    def get_block_html(self, high_level_block: HighLevelBlock, pslk_path: str) -> str:
+        return self.load().get_block_html(high_level_block, pslk_path)
+
+    def _get_block_html(self, high_level_block: HighLevelBlock, pslk_path: str) -> str | None:
+        return self.load()._get_block_html(high_level_block, pslk_path)
@@ -1,18 +1,15 @@
 from ast import Dict
-from copy import deepcopy
 import importlib
 from importlib import resources
 import inspect
+import logging
 import pathlib
 from typing import Any, List
 import os
 import glob
 import yaml
 
-from dacite import from_dict, Config
-
-from pysyslink_toolkit.PortType import PortType
-from pysyslink_toolkit.TextFileManager import load_yaml_file
+from pysyslink_toolkit.TextFileManager import YAML_SAFE_LOADER, load_yaml_content, load_yaml_file
 from pysyslink_toolkit.block_libraries.BlockLibraryPlugin import BlockLibraryPlugin
 from pysyslink_toolkit.block_libraries.BlockLibraryPluginConfig import (
     BlockLibraryPluginConfig,
@@ -21,10 +18,14 @@ from pysyslink_toolkit.block_libraries.BlockLibraryPluginConfig import (
     BlockTypeConfig,
     ConfigurationValue
 )
-from pysyslink_toolkit.BlockRenderInformation import BlockShape
 from pysyslink_toolkit.block_libraries.CoreBlockLibraryPlugin import CoreBlockLibraryPlugin
+from pysyslink_toolkit.block_libraries.LazyBlockLibraryPlugin import LazyBlockLibraryPlugin, load_high_level_plugin_from_file
+from pysyslink_toolkit.block_libraries.PluginConfigCache import PluginConfigCache
+from pysyslink_toolkit.block_libraries.PluginConfigFromDict import plugin_config_from_dict
 from pysyslink_toolkit.toolkit_config.ParseToolkitConfig import parse_toolkit_config
 
+logger = logging.getLogger(__name__)
+
 
 def _normalize_block_type(block_type_dict: dict) -> dict:
     """Prepare block type dict so it matches BlockTypeConfig."""
@@ -47,7 +48,7 @@ def _normalize_block_type(block_type_dict: dict) -> dict:
 
 
 def _normalize_plugin_dict(data: dict) -> dict:
-    """Normalize YAML structure before dacite deserialization."""
+    """Normalize YAML structure before building the BlockLibraryPluginConfig."""
     plugin_type = data.get("pluginType")
 
     for i, common_block_type in enumerate(data.get("commonBlocks", [])):
@@ -77,6 +78,10 @@ def _solve_block_library_config_common_blocks(plugin: BlockLibraryPluginConfig)
     - metadata is merged (child overrides parent keys)
     - Missing scalar properties are inherited
     - Port type dictionaries are merged (child overrides same keys)
+
+    The resolved config shares data with the parsed one and resolved blocks share the entries
+    (and, when a side is empty, the whole dicts) of their common block, nothing is copied. Resolved
+    configs are read only: they are shared by all the plugins and sessions loading them.
     """
 
     # ---------------------------------------------------------
@@ -105,7 +110,7 @@ def _solve_block_library_config_common_blocks(plugin: BlockLibraryPluginConfig)
                 name=library.name,
                 pluginType=plugin.pluginType,
                 blockTypes=solved_blocks,
-                metadata=deepcopy(library.metadata),
+                metadata=library.metadata,
             )
         )
 
@@ -114,12 +119,23 @@ def _solve_block_library_config_common_blocks(plugin: BlockLibraryPluginConfig)
         pluginType=plugin.pluginType,
         blockType=plugin.blockType,
         yaml_filename=plugin.yaml_filename,
-        commonBlocks=deepcopy(plugin.commonBlocks),
+        commonBlocks=plugin.commonBlocks,
         blockLibraries=solved_libraries,
-        metadata=deepcopy(plugin.metadata),
+        metadata=plugin.metadata,
     )
 
 
+def _merge_shared(base: dict, child: dict) -> dict:
+    """
+    base updated with child, without copying when one of them is empty.
+    """
+    if not child:
+        return base
+    if not base:
+        return child
+    return {**base, **child}
+
+
 def _solve_single_block_with_common(block: BlockTypeConfig, common_map: dict[str, BlockTypeConfig]) -> BlockTypeConfig:
     """
     Resolve one block against its commonBlock base.
@@ -128,7 +144,7 @@ def _solve_single_block_with_common(block: BlockTypeConfig, common_map: dict[str
     common_name = block.commonBlock
 
     if not common_name:
-        return deepcopy(block)
+        return block
 
     if common_name not in common_map:
         raise ValueError(
@@ -139,30 +155,13 @@ def _solve_single_block_with_common(block: BlockTypeConfig, common_map: dict[str
     base = common_map[common_name]
 
     # ---------------------------------------------------------
-    # Merge configuration values
-    # ---------------------------------------------------------
-    merged_config = deepcopy(base.configurationValues)
-    merged_config.update(deepcopy(block.configurationValues))
-
-    # ---------------------------------------------------------
-    # Merge metadata
-    # ---------------------------------------------------------
-    merged_metadata = deepcopy(base.metadata)
-    merged_metadata.update(deepcopy(block.metadata))
-
-    # ---------------------------------------------------------
-    # Merge port type definitions
+    # Merge configuration values, metadata and port type definitions
     # ---------------------------------------------------------
-    merged_input_types = deepcopy(base.inputPortTypes)
-    merged_input_types.update(deepcopy(block.inputPortTypes))
-
-    merged_output_types = deepcopy(base.outputPortTypes)
-    merged_output_types.update(deepcopy(block.outputPortTypes))
-
-    merged_input_labels = deepcopy(block.inputPortLabels)
+    merged_config = _merge_shared(base.configurationValues, block.configurationValues)
+    merged_metadata = _merge_shared(base.metadata, block.metadata)
+    merged_input_types = _merge_shared(base.inputPortTypes, block.inputPortTypes)
+    merged_output_types = _merge_shared(base.outputPortTypes, block.outputPortTypes)
 
-    merged_output_labels = deepcopy(block.outputPortLabels)
-    
     # ---------------------------------------------------------
     # Child overrides parent when explicitly set
     # ---------------------------------------------------------
@@ -176,8 +175,8 @@ def _solve_single_block_with_common(block: BlockTypeConfig, common_map: dict[str
         inputPortTypes=merged_input_types,
         outputPortTypes=merged_output_types,
 
-        inputPortLabels=merged_input_labels,
-        outputPortLabels=merged_output_labels,
+        inputPortLabels=block.inputPortLabels,
+        outputPortLabels=block.outputPortLabels,
 
         configurationValues=merged_config,
 
@@ -193,43 +192,119 @@ def _solve_single_block_with_common(block: BlockTypeConfig, common_map: dict[str
     return solved
 
 
-def _parse_block_library_configs_from_paths(paths: List[str]) -> List[BlockLibraryPluginConfig]:
+def _read_normalized_plugin_dict(file_path: str, content: bytes | None = None) -> dict:
+    """
+    Parse and normalize one plugin config file. content, if given, are the bytes already read from file_path.
+    """
+    if content is None:
+        data = load_yaml_file(file_path, loader=YAML_SAFE_LOADER)
+    else:
+        data = load_yaml_content(content, file_path, loader=YAML_SAFE_LOADER)
+
+    return _normalize_plugin_dict(data)
+
+def _build_block_library_config(file_path: str, data: dict) -> BlockLibraryPluginConfig:
+    """
+    Build and resolve the config of the normalized dict data, read from file_path.
+    """
+    try:
+        plugin = plugin_config_from_dict(data)
+        plugin.yaml_filename = file_path
+    except Exception as e:
+        raise RuntimeError(f"Invalid plugin config in file {file_path}: {e}") from e
+    
+    return _solve_block_library_config_common_blocks(plugin)
+
+def _parse_block_library_config_file(file_path: str, content: bytes | None = None) -> BlockLibraryPluginConfig:
+    """
+    Parse, normalize and resolve one plugin config file. content, if given, are the bytes already read from file_path.
+    """
+    return _build_block_library_config(file_path, _read_normalized_plugin_dict(file_path, content))
+
+def _load_block_library_config_file(file_path: str, plugin_config_cache: PluginConfigCache | None) -> BlockLibraryPluginConfig:
+    if plugin_config_cache is None:
+        return _parse_block_library_config_file(file_path)
+
+    plugin_config = plugin_config_cache.get_or_create(file_path, _parse_block_library_config_file)
+    plugin_config.yaml_filename = file_path
+    return plugin_config
+
+# Below this number of files to parse, starting the worker processes costs more than it saves
+_PROCESS_POOL_MIN_FILES = 128
+
+# Tasks per worker process, so that workers given large files do not hold up the others
+_TASKS_PER_JOB = 4
+
+def _parse_block_library_config_files_in_pool(yaml_files: List[str], plugin_config_cache: PluginConfigCache | None,
+                                              jobs: int) -> List[BlockLibraryPluginConfig]:
+    cached = [None if plugin_config_cache is None else plugin_config_cache.get(file_path) for file_path in yaml_files]
+    pending = [file_path for file_path, plugin_config in zip(yaml_files, cached) if plugin_config is None]
+    jobs = min(jobs, len(pending))
+    if jobs <= 1 or len(pending) < _PROCESS_POOL_MIN_FILES:
+        return [
+            plugin_config if plugin_config is not None else _load_block_library_config_file(file_path, plugin_config_cache)
+            for file_path, plugin_config in zip(yaml_files, cached)
+        ]
+
+    contents = []
+    for file_path in pending:
+        with open(file_path, "rb") as f:
+            contents.append(f.read())
 
     plugin_configs: List[BlockLibraryPluginConfig] = []
+    logger.debug("Parsing %d plugin config files on %d processes", len(pending), jobs)
+    # Imports multiprocessing, only needed here
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # Workers return the normalized dicts, which pickle much faster than the resolved configs
+        normalized = zip(contents, executor.map(_read_normalized_plugin_dict, pending, contents,
+                                                chunksize=-(-len(pending) // (jobs * _TASKS_PER_JOB))))
+        for file_path, plugin_config in zip(yaml_files, cached):
+            if plugin_config is None:
+                parsed_content, data = next(normalized)
+
+                def build(file_path: str, content: bytes | None = None) -> BlockLibraryPluginConfig:
+                    if content is not None and content != parsed_content:
+                        # Changed since it was read
+                        return _parse_block_library_config_file(file_path, content)
+                    return _build_block_library_config(file_path, data)
+
+                if plugin_config_cache is None:
+                    plugin_config = build(file_path)
+                else:
+                    plugin_config = plugin_config_cache.get_or_create(file_path, build)
+                    plugin_config.yaml_filename = file_path
+            plugin_configs.append(plugin_config)
+    return plugin_configs
+
+def _parse_block_library_configs_from_paths(paths: List[str], plugin_config_cache: PluginConfigCache | None = None,
+                                            jobs: int = 0) -> List[BlockLibraryPluginConfig]:
+    """
+    Parse every plugin config file found under paths, in glob order.
 
+    When at least _PROCESS_POOL_MIN_FILES files are not found in plugin_config_cache, they are
+    read and normalized by a pool of jobs processes (all the CPUs for jobs <= 0, 1 parses every
+    file in this process). The configs are built from the normalized dicts in glob order, so the
+    configs (and the first error raised) are those of a serial parse.
+    """
     yaml_files: List[str] = []
 
     for path in paths:
-        print("GLOBBING PATH:", path, flush=True)
+        logger.debug("Globbing path: %s", path)
         yaml_files.extend(
             glob.glob(os.path.join(path, "**", "*.pslkblp.yaml"), recursive=True)
         )
-    
-    dacite_config = Config(
-        cast=[BlockLibraryPluginType, BlockShape],
-        type_hooks={
-            PortType: PortType.from_dict
-        }
-    )
-
-    for file_path in yaml_files:
-        data = load_yaml_file(file_path)
 
-        data = _normalize_plugin_dict(data)
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
 
-        try:
-            plugin = from_dict(
-                data_class=BlockLibraryPluginConfig,
-                data=data,
-                config=dacite_config
-            )
-            plugin.yaml_filename = file_path
-        except Exception as e:
-            raise RuntimeError(f"Error wile loading plugin config from file: {file_path}. Error from dacite: {e}")
-        
-        solved_plugin = _solve_block_library_config_common_blocks(plugin)
+    if jobs <= 1 or len(yaml_files) < _PROCESS_POOL_MIN_FILES:
+        plugin_configs = [_load_block_library_config_file(file_path, plugin_config_cache) for file_path in yaml_files]
+    else:
+        plugin_configs = _parse_block_library_config_files_in_pool(yaml_files, plugin_config_cache, jobs)
 
-        plugin_configs.append(solved_plugin)
+    if plugin_config_cache is not None:
+        plugin_config_cache.flush()
 
     return plugin_configs
 
@@ -243,13 +318,31 @@ def _get_default_dir_from_package() -> str | None:
     except Exception:
         return None
 
-def load_block_library_plugins_from_paths(paths: List[str]) -> list[BlockLibraryPlugin]:
+def get_block_library_search_paths(paths: List[str]) -> List[str]:
+    """
+    Plugin search paths: the system plugins shipped with the toolkit followed by paths.
+    """
     default_path = _get_default_dir_from_package()
     all_paths = list(paths)
     if default_path:
         all_paths.insert(0, default_path)
+    return all_paths
+
+def load_block_library_plugins_from_paths(paths: List[str], plugin_config_cache: PluginConfigCache | None | bool = True) -> list[BlockLibraryPlugin]:
+    """
+    Load all plugins found under paths, plus the system plugins shipped with the toolkit.
+
+    plugin_config_cache: True (default) uses the shared on-disk cache of the user (unless
+    PYSYSLINK_TOOLKIT_DISABLE_CACHE is set), False or None parses every file, or an explicit cache.
+    """
+    all_paths = get_block_library_search_paths(paths)
 
-    plugin_configs = _parse_block_library_configs_from_paths(all_paths)
+    if plugin_config_cache is True:
+        plugin_config_cache = PluginConfigCache.get_default()
+    elif plugin_config_cache is False:
+        plugin_config_cache = None
+
+    plugin_configs = _parse_block_library_configs_from_paths(all_paths, plugin_config_cache)
     
     plugins: list[BlockLibraryPlugin] = []
     
@@ -258,10 +351,11 @@ def load_block_library_plugins_from_paths(paths: List[str]) -> list[BlockLibrary
             python_filename = plugin_config.metadata["pythonFilename"]
             py_path = pathlib.Path(plugin_config.yaml_filename).parent / python_filename
             module_name = py_path.stem # py_path.stem is correct, it returns the module name
-            try: 
-                plugins.append(load_high_level_plugin_from_file(py_path, module_name, plugin_config))
-            except ImportError as e:
-                print("Error loading plugin: {}".format(e.msg))
+            if not py_path.is_file():
+                logger.error("Error loading plugin: Cannot load module from %s", py_path)
+                continue
+            # The module is imported the first time one of its block types is used
+            plugins.append(LazyBlockLibraryPlugin(plugin_config, py_path, module_name))
         elif plugin_config.pluginType == BlockLibraryPluginType.CoreBlockLibrary:
             plugins.append(CoreBlockLibraryPlugin(plugin_config))
 
@@ -324,18 +418,3 @@ def resolve_block_libraries(libraries: List[BlockLibraryConfig]) -> List[BlockLi
         resolved_libraries.append(resolved_lib)
 
     return resolved_libraries
-
-def load_high_level_plugin_from_file(path: pathlib.Path, module_name: str, plugin_config: BlockLibraryPluginConfig) -> BlockLibraryPlugin:
-
-    spec = importlib.util.spec_from_file_location(module_name, str(path))
-    if not spec or not spec.loader:
-        raise ImportError(f"Cannot load module from {path}")
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-
-    # Find a subclass of Plugin in the module
-    for name, obj in inspect.getmembers(module, inspect.isclass):
-        if issubclass(obj, BlockLibraryPlugin) and obj is not BlockLibraryPlugin:
-            return obj(plugin_config)  # Instantiate and return the plugin
-
-    raise ImportError(f"No subclass of Plugin found in {path}")
\ No newline at end of file
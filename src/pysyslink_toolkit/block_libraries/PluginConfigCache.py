@@ -0,0 +1,247 @@
+import dataclasses
+import hashlib
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from pysyslink_toolkit.PortType import PortType, PortTypeConfig
+from pysyslink_toolkit.block_libraries.BlockLibraryPluginConfig import (
+    BlockLibraryConfig,
+    BlockLibraryPluginConfig,
+    BlockTypeConfig,
+    ConfigurationValue,
+    PortLabelConfig,
+)
+from pysyslink_toolkit.user_cache import atomic_write, get_user_cache_dir, is_user_cache_disabled
+
+
+# Bump when the pickled layout of the cached configs changes in a way neither the package version
+# nor _get_schema_fingerprint capture, such as how a class pickles or which objects are shared.
+# 2: common block data shared between block types, immutable PortType pickled as its canonical instance
+CACHE_FORMAT_VERSION = 2
+
+# Classes pickled in the cached configs
+_CACHED_CLASSES = (
+    BlockLibraryPluginConfig, BlockLibraryConfig, BlockTypeConfig, ConfigurationValue, PortLabelConfig,
+    PortType, PortTypeConfig,
+)
+
+
+def _get_toolkit_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version("pysyslink_toolkit")
+    except Exception:
+        return "unknown"
+
+
+def _get_schema_fingerprint() -> str:
+    """
+    Hash of the fields of the cached classes, so that adding, removing or retyping a field
+    invalidates the entries pickled with the previous fields.
+    """
+    schema = [
+        (cls.__qualname__, [(f.name, str(f.type)) for f in dataclasses.fields(cls)])
+        for cls in _CACHED_CLASSES
+    ]
+    return hashlib.sha256(repr(schema).encode("utf-8")).hexdigest()[:16]
+
+
+class PluginConfigCache:
+    """
+    Persistent cache of resolved BlockLibraryPluginConfig objects.
+
+    Entries are content addressed: each resolved config is pickled under the hash of the plugin
+    file path and contents and of the layout of the cached classes. An index maps every plugin
+    file path to its last seen mtime, size and content hash, so a warm load only needs a stat per
+    file. Files whose mtime or size changed are
+    re-hashed, and their stale entry is dropped when the contents differ. The number of stored
+    entries is capped, evicting the least recently used ones.
+    """
+
+    INDEX_FILENAME = "index.json"
+    ENTRIES_DIRNAME = "entries"
+
+    # Do not rewrite the index only to refresh the LRU timestamp of an entry more often than this
+    LAST_USED_RESOLUTION_S = 60.0
+
+    _default_instance: Optional["PluginConfigCache"] = None
+
+    def __init__(self, cache_dir: str | None = None, max_entries: int = 1024):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.cache_dir = cache_dir if cache_dir is not None else get_user_cache_dir("plugin_configs")
+        self.max_entries = max_entries
+
+        self._key_prefix = (
+            f"{CACHE_FORMAT_VERSION}:{_get_schema_fingerprint()}:{_get_toolkit_version()}:{sys.version}:".encode("utf-8")
+        )
+        # Stored with every index entry, entries indexed by another layout are not read
+        self._layout = hashlib.sha256(self._key_prefix).hexdigest()[:16]
+        self._index: Dict[str, Dict[str, Any]] | None = None
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    @classmethod
+    def get_default(cls) -> Optional["PluginConfigCache"]:
+        """
+        Shared cache in the user cache directory, or None if PYSYSLINK_TOOLKIT_DISABLE_CACHE is set.
+        """
+        if is_user_cache_disabled():
+            return None
+        if cls._default_instance is None:
+            cls._default_instance = cls()
+        return cls._default_instance
+
+    def get(self, file_path: str) -> BlockLibraryPluginConfig | None:
+        """
+        The cached config for file_path if the file is unchanged since it was stored, else None.
+        """
+        path = os.path.abspath(file_path)
+        return self._get_unchanged(path, os.stat(path))
+
+    def get_or_create(self, file_path: str, create: Callable[[str, bytes], BlockLibraryPluginConfig]) -> BlockLibraryPluginConfig:
+        """
+        Return the cached config for file_path, or build it with create(file_path, content) and store it.
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        plugin_config = self._get_unchanged(path, stat)
+        if plugin_config is not None:
+            return plugin_config
+        with self._lock:
+            entry = self._get_index().get(path)
+
+        with open(path, "rb") as f:
+            content = f.read()
+        key = self._make_key(path, content)
+
+        plugin_config = None
+        if entry is not None:
+            if entry["key"] == key:
+                # Touched but unchanged, refresh the fingerprint only
+                plugin_config = self._read_entry(key)
+            else:
+                self._remove_entry_file(entry["key"])
+
+        if plugin_config is None:
+            plugin_config = create(file_path, content)
+            self._write_entry(key, plugin_config)
+
+        with self._lock:
+            self._get_index()[path] = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "key": key,
+                "layout": self._layout,
+                "last_used": time.time(),
+            }
+            self._dirty = True
+        return plugin_config
+
+    def _get_unchanged(self, path: str, stat: os.stat_result) -> BlockLibraryPluginConfig | None:
+        with self._lock:
+            entry = self._get_index().get(path)
+        if (entry is None or entry.get("layout") != self._layout
+                or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size):
+            return None
+        plugin_config = self._read_entry(entry["key"])
+        if plugin_config is not None:
+            with self._lock:
+                self._touch(entry)
+        return plugin_config
+
+    def flush(self) -> None:
+        """
+        Evict least recently used entries above max_entries and persist the index.
+        """
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._dirty or self._index is None:
+            return
+
+        if len(self._index) > self.max_entries:
+            by_age = sorted(self._index.items(), key=lambda item: item[1]["last_used"])
+            for path, entry in by_age[:len(self._index) - self.max_entries]:
+                self._remove_entry_file(entry["key"])
+                del self._index[path]
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            atomic_write(
+                os.path.join(self.cache_dir, self.INDEX_FILENAME),
+                json.dumps(self._index).encode("utf-8")
+            )
+        except OSError:
+            # The cache is best effort, a read-only cache directory must not break plugin loading
+            return
+        self._dirty = False
+
+    def clear(self) -> None:
+        with self._lock:
+            for entry in self._get_index().values():
+                self._remove_entry_file(entry["key"])
+            self._index = {}
+            self._dirty = True
+            self._flush()
+
+    def __len__(self) -> int:
+        return len(self._get_index())
+
+    def _make_key(self, path: str, content: bytes) -> str:
+        digest = hashlib.sha256(self._key_prefix)
+        digest.update(path.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(content)
+        return digest.hexdigest()
+
+    def _touch(self, entry: Dict[str, Any]) -> None:
+        now = time.time()
+        if now - entry["last_used"] > self.LAST_USED_RESOLUTION_S:
+            entry["last_used"] = now
+            self._dirty = True
+
+    def _get_index(self) -> Dict[str, Dict[str, Any]]:
+        if self._index is None:
+            index_path = os.path.join(self.cache_dir, self.INDEX_FILENAME)
+            try:
+                with open(index_path, "rb") as f:
+                    index = json.loads(f.read())
+                if not isinstance(index, dict):
+                    index = {}
+            except (OSError, ValueError):
+                index = {}
+            self._index = index
+        return self._index
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, self.ENTRIES_DIRNAME, key + ".pickle")
+
+    def _read_entry(self, key: str) -> BlockLibraryPluginConfig | None:
+        try:
+            with open(self._entry_path(key), "rb") as f:
+                plugin_config = pickle.load(f)
+        except Exception:
+            return None
+        if not isinstance(plugin_config, BlockLibraryPluginConfig):
+            return None
+        return plugin_config
+
+    def _write_entry(self, key: str, plugin_config: BlockLibraryPluginConfig) -> None:
+        try:
+            os.makedirs(os.path.join(self.cache_dir, self.ENTRIES_DIRNAME), exist_ok=True)
+            atomic_write(self._entry_path(key), pickle.dumps(plugin_config, protocol=pickle.HIGHEST_PROTOCOL))
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            pass
+
+    def _remove_entry_file(self, key: str) -> None:
+        try:
+            os.remove(self._entry_path(key))
+        except OSError:
+            pass
@@ -0,0 +1,258 @@
+from typing import Any, Dict, List
+
+from pysyslink_toolkit.BlockRenderInformation import BlockShape
+from pysyslink_toolkit.PortType import PortType, PortTypeConfig
+from pysyslink_toolkit.block_libraries.BlockLibraryPluginConfig import (
+    BlockLibraryConfig,
+    BlockLibraryPluginConfig,
+    BlockLibraryPluginType,
+    BlockTypeConfig,
+    ConfigurationValue,
+    PortLabelConfig,
+)
+
+
+class _NotSpecialized(Exception):
+    """
+    Raised by the specialized constructors on anything but well formed data.
+    """
+
+
+_ANY_SUPPORTED_PORT_TYPE = "FullySupportedSignalValueType.Any"
+
+_NUMBER_TYPES = (int, float, complex)
+
+_dacite_config = None
+
+
+def plugin_config_from_dict(data: Dict[str, Any]) -> BlockLibraryPluginConfig:
+    """
+    Build a BlockLibraryPluginConfig from a normalized plugin dict.
+
+    Equivalent to dacite.from_dict(BlockLibraryPluginConfig, data, config=<cast enums, PortType hook>),
+    without reflecting over the type hints of every nested dataclass. The constructors below accept
+    exactly what dacite accepts for well formed data and build the same objects. On anything else
+    (wrong types, missing fields, unknown enum values) dacite itself is run on the data, so errors
+    are raised by dacite with its messages.
+    """
+    try:
+        return _plugin_config(data)
+    except _NotSpecialized:
+        return _dacite_from_dict(data)
+
+
+def _dacite_from_dict(data: Dict[str, Any]) -> BlockLibraryPluginConfig:
+    global _dacite_config
+    from dacite import Config, from_dict
+
+    if _dacite_config is None:
+        _dacite_config = Config(
+            cast=[BlockLibraryPluginType, BlockShape],
+            type_hooks={
+                PortType: PortType.from_dict
+            }
+        )
+    return from_dict(data_class=BlockLibraryPluginConfig, data=data, config=_dacite_config)
+
+
+def _check(condition: bool) -> None:
+    if not condition:
+        raise _NotSpecialized()
+
+
+def _required(data: Dict[str, Any], key: str) -> Any:
+    _check(key in data)
+    return data[key]
+
+
+def _str(data: Dict[str, Any], key: str, default: Any) -> Any:
+    value = data.get(key, default)
+    _check(isinstance(value, str))
+    return value
+
+
+def _optional_str(data: Dict[str, Any], key: str) -> str | None:
+    value = data.get(key)
+    _check(value is None or isinstance(value, str))
+    return value
+
+
+def _metadata(data: Dict[str, Any]) -> dict:
+    # Not a generic type for dacite, the mapping is kept as is
+    if "metadata" not in data:
+        return {}
+    value = data["metadata"]
+    _check(isinstance(value, dict))
+    return value
+
+
+def _dict_list(data: Dict[str, Any], key: str) -> List[Dict[str, Any]]:
+    if key not in data:
+        return []
+    value = data[key]
+    _check(type(value) is list and all(isinstance(item, dict) for item in value))
+    return value
+
+
+def _plugin_config(data: Dict[str, Any]) -> BlockLibraryPluginConfig:
+    _check(isinstance(data, dict))
+    plugin_name = _required(data, "pluginName")
+    _check(isinstance(plugin_name, str))
+    plugin_type = _required(data, "pluginType")
+    _check(isinstance(plugin_type, (str, BlockLibraryPluginType)))
+    try:
+        plugin_type = BlockLibraryPluginType(plugin_type)
+    except ValueError:
+        raise _NotSpecialized()
+    block_type = _required(data, "blockType")
+    _check(isinstance(block_type, str))
+
+    return BlockLibraryPluginConfig(
+        pluginName=plugin_name,
+        pluginType=plugin_type,
+        blockType=block_type,
+        yaml_filename=_optional_str(data, "yaml_filename"),
+        commonBlocks=[_block_type_config(item) for item in _dict_list(data, "commonBlocks")],
+        blockLibraries=[_block_library_config(item) for item in _dict_list(data, "blockLibraries")],
+        metadata=_metadata(data),
+    )
+
+
+def _block_library_config(data: Dict[str, Any]) -> BlockLibraryConfig:
+    name = _required(data, "name")
+    _check(isinstance(name, str))
+    plugin_type = _required(data, "pluginType")
+    _check(isinstance(plugin_type, str))
+
+    return BlockLibraryConfig(
+        name=name,
+        pluginType=plugin_type,
+        blockTypes=[_block_type_config(item) for item in _dict_list(data, "blockTypes")],
+        metadata=_metadata(data),
+    )
+
+
+def _block_type_config(data: Dict[str, Any]) -> BlockTypeConfig:
+    name = _required(data, "name")
+    _check(isinstance(name, str))
+
+    input_port_number = data.get("inputPortNumber", "NullForCommonBlock")
+    output_port_number = data.get("outputPortNumber", "NullForCommonBlock")
+    _check(isinstance(input_port_number, (int, str)) and isinstance(output_port_number, (int, str)))
+
+    configuration_values = data.get("configurationValues", {})
+    _check(type(configuration_values) is dict)
+    configuration_values_out: Dict[str, ConfigurationValue] = {}
+    for key, value in configuration_values.items():
+        _check(isinstance(key, str) and isinstance(value, dict))
+        configuration_values_out[key] = _configuration_value(value)
+
+    block_shape = data.get("blockShape", BlockShape.square)
+    _check(isinstance(block_shape, (str, BlockShape)))
+    try:
+        block_shape = BlockShape(block_shape)
+    except ValueError:
+        raise _NotSpecialized()
+
+    return BlockTypeConfig(
+        name=name,
+        inputPortNumber=input_port_number,
+        outputPortNumber=output_port_number,
+        inputPortTypes=_port_type_configs(data, "inputPortTypes"),
+        outputPortTypes=_port_type_configs(data, "outputPortTypes"),
+        inputPortLabels=_port_label_config(data, "inputPortLabels"),
+        outputPortLabels=_port_label_config(data, "outputPortLabels"),
+        commonBlock=_optional_str(data, "commonBlock"),
+        configurationValues=configuration_values_out,
+        blockShape=block_shape,
+        metadata=_metadata(data),
+    )
+
+
+def _port_type_configs(data: Dict[str, Any], key: str) -> Dict[str | int, PortTypeConfig]:
+    value = data.get(key, {})
+    _check(type(value) is dict)
+    result: Dict[str | int, PortTypeConfig] = {}
+    for port_key, port_type in value.items():
+        _check(isinstance(port_key, (str, int)) and isinstance(port_type, dict))
+        result[port_key] = _port_type_config(port_type)
+    return result
+
+
+def _port_type_config(data: Dict[str, Any]) -> PortTypeConfig:
+    supported_types = data.get("supported_port_types_for_inheritance")
+    if supported_types is not None:
+        _check(type(supported_types) is list)
+        supported_types_out = []
+        for item in supported_types:
+            if isinstance(item, dict):
+                supported_types_out.append(_port_type_config(item))
+            else:
+                _check(isinstance(item, str) and item == _ANY_SUPPORTED_PORT_TYPE)
+                supported_types_out.append(item)
+        supported_types = supported_types_out
+
+    inheritance_group = data.get("inheritance_group", 0)
+    _check(isinstance(inheritance_group, int))
+
+    return PortTypeConfig(
+        port_category=_str(data, "port_category", "FullySupportedSignalValue"),
+        signal_value_type=_optional_str(data, "signal_value_type"),
+        enumeration_name=_optional_str(data, "enumeration_name"),
+        structure_name=_optional_str(data, "structure_name"),
+        pointing_object_class_name=_optional_str(data, "pointing_object_class_name"),
+        other_type_name=_optional_str(data, "other_type_name"),
+        supported_port_types_for_inheritance=supported_types,
+        inheritance_group=inheritance_group,
+    )
+
+
+def _port_label_config(data: Dict[str, Any], key: str) -> PortLabelConfig:
+    if key not in data:
+        return PortLabelConfig()
+    value = data[key]
+    _check(isinstance(value, dict))
+
+    labels = value.get("labels")
+    if labels is not None:
+        _check(type(labels) is list and all(isinstance(label, str) for label in labels))
+        labels = list(labels)
+
+    return PortLabelConfig(labels=labels, generator=_optional_str(value, "generator"))
+
+
+def _configuration_value(data: Dict[str, Any]) -> ConfigurationValue:
+    name = _required(data, "name")
+    _check(isinstance(name, str))
+    type_ = _required(data, "type")
+    _check(isinstance(type_, str))
+
+    return ConfigurationValue(
+        name=name,
+        defaultValue=_default_value(data.get("defaultValue")),
+        type=type_,
+        metadata=_metadata(data),
+    )
+
+
+def _is_scalar_list(value: list) -> bool:
+    return all(isinstance(item, _NUMBER_TYPES) for item in value) or all(isinstance(item, str) for item in value)
+
+
+def _default_value(value: Any) -> Any:
+    """
+    Scalars, lists and lists of lists of numbers or strings. Lists are copied, as dacite rebuilds them.
+    """
+    if value is None or isinstance(value, (str, int, float, complex)):
+        return value
+
+    _check(type(value) is list)
+    if _is_scalar_list(value):
+        return list(value)
+
+    _check(all(type(item) is list for item in value))
+    _check(
+        all(isinstance(x, _NUMBER_TYPES) for item in value for x in item)
+        or all(isinstance(x, str) for item in value for x in item)
+    )
+    return [list(item) for item in value]
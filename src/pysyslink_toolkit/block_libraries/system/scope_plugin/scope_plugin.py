@@ -1,14 +1,11 @@
 import json
 import os
 
-from matplotlib import pyplot as plt
 import yaml
 import pysyslink_toolkit
 from pysyslink_toolkit.LowLevelBlockStructure import LowLevelBlock, LowLevelLink, LowLevelBlockStructure
 from pysyslink_toolkit.HighLevelBlock import HighLevelBlock
 
-import mpld3
-
 
 class ScopePlugin(pysyslink_toolkit.BlockLibraryPlugin):   
     def _compile_block(self, high_level_block: HighLevelBlock) -> LowLevelBlockStructure:
@@ -29,6 +26,10 @@ class ScopePlugin(pysyslink_toolkit.BlockLibraryPlugin):
         return LowLevelBlockStructure([block], [], port_map)
 
     def _get_block_html(self, high_level_block, pslk_path):
+        # Plotting libraries are only needed for html, keep them out of compilation
+        from matplotlib import pyplot as plt
+        import mpld3
+
         with open(pslk_path, "r") as f:
             system_json = json.load(f)
 
@@ -1,16 +1,8 @@
 import argparse
-import asyncio
-import json
+import logging
 import os
 
-import yaml
-from pysyslink_toolkit.api import (
-    compile_system,
-    compile_and_run_simulation
-)
-
-
-import os
+logger = logging.getLogger(__name__)
 
 def resolve_absolute_path(path: str, base_dir: str | None = None) -> str:
     """
@@ -33,11 +25,12 @@ def get_simulation_configuration_path(pslkPath: str):
     """
     Load the simulation configuration from the given PSLK path.
     """
-    with open(pslkPath, "r") as f:
-        system_json = json.load(f)
+    from pysyslink_toolkit.ToolkitSession import load_system_json
+
+    system_json = load_system_json(pslkPath)
 
     sim_config_path = system_json.get("simulation_configuration", [])
-    print(f"Simulation configuration path: {sim_config_path}")
+    logger.debug("Simulation configuration path: %s", sim_config_path)
 
     pslk_dir = os.path.dirname(pslkPath)
     
@@ -50,13 +43,16 @@ def get_toolkit_config_path(pslkPath: str) -> str:
     """
     Get the toolkit configuration path from the PSLK file.
     """
-    with open(pslkPath, "r") as f:
-        try:
-            system_json = json.load(f)
-        except json.JSONDecodeError as e:
-            print(f"Invalid PSLK file format: {e}")
-            return None
-        
+    import yaml
+    from pysyslink_toolkit.ToolkitSession import load_system_json
+
+    # Read once for the whole command, the session compiling the file reuses the parsed contents
+    try:
+        system_json = load_system_json(pslkPath)
+    except (yaml.YAMLError, ValueError) as e:
+        logger.error("Invalid PSLK file format: %s", e)
+        return None
+
     toolkit_config_path = system_json.get("toolkit_configuration_path", None)
 
     if toolkit_config_path is None or toolkit_config_path == "":
@@ -82,6 +78,12 @@ def get_output_yaml_path(pslk_path: str) -> str:
 
 def main():
     parser = argparse.ArgumentParser(prog="pysyslink")
+    parser.add_argument(
+        "--log-level",
+        default="WARNING",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Level of the diagnostics written to stderr",
+    )
     subparsers = parser.add_subparsers(
         dest="command",
         required=True
@@ -93,8 +95,27 @@ def main():
     run_parser = subparsers.add_parser("run")
     run_parser.add_argument("pslk")
 
+    for command_parser in (compile_parser, run_parser):
+        command_parser.add_argument(
+            "-j", "--jobs",
+            type=int,
+            default=1,
+            help="Processes compiling the blocks, 0 for one per CPU (default: 1)",
+        )
+        command_parser.add_argument(
+            "--output-format",
+            default="yaml",
+            choices=["yaml", "json"],
+            help="Format of the low-level system, JSON is faster to write and read as YAML (default: yaml)",
+        )
+
     args = parser.parse_args()
 
+    logging.basicConfig(level=args.log_level, format="%(levelname)s %(name)s: %(message)s")
+
+    # Imported after argument parsing so that --help and usage errors stay fast
+    from pysyslink_toolkit.api import compile_system, compile_and_run_simulation
+
     pslk_path = resolve_absolute_path(args.pslk)
 
     toolkit_path = get_toolkit_config_path(pslk_path)
@@ -104,11 +125,15 @@ def main():
         result = compile_system(
             toolkit_path,
             pslk_path,
-            output_yaml
+            output_yaml,
+            jobs=args.jobs,
+            output_format=args.output_format,
         )
         print(result)
 
     elif args.command == "run":
+        import asyncio
+
         sim_config = get_simulation_configuration_path(
             pslk_path
         )
@@ -118,7 +143,9 @@ def main():
                 toolkit_path,
                 pslk_path,
                 output_yaml,
-                sim_config
+                sim_config,
+                jobs=args.jobs,
+                output_format=args.output_format,
             )
         )
 
@@ -1,40 +1,130 @@
+import itertools
 import json
+import logging
 import os
 import runpy
-import yaml
 import pathlib
-from typing import Dict, Any, List
-from pysyslink_toolkit.block_libraries.BlockLibraryPluginConfig import BlockLibraryPluginConfig
+from typing import Dict, Any, Iterator, List, Tuple
+from pysyslink_toolkit.BlockCompilationCache import BlockCompilationCache
+from pysyslink_toolkit.array_values import format_float_list, to_int_list
+from pysyslink_toolkit.block_libraries.BlockTypeRegistry import BlockTypeRegistry
 from pysyslink_toolkit.HighLevelBlock import HighLevelBlock
 from pysyslink_toolkit.LowLevelBlockStructure import LowLevelBlock, LowLevelLink, LowLevelBlockStructure
 from pysyslink_toolkit.block_libraries.ParseBlockLibraries import load_block_library_plugins_from_paths
-from pysyslink_toolkit.TextFileManager import _load_toolkit_config, load_yaml_file
+from pysyslink_toolkit.TextFileManager import _load_toolkit_config, load_structured_file
 from pysyslink_toolkit.HighLevelSystem import HighLevelSystem
+from pysyslink_toolkit.low_level_yaml_writer import check_output_format, write_low_level_system
 from pysyslink_toolkit.toolkit_config.ParseToolkitConfig import parse_toolkit_config
 
+logger = logging.getLogger(__name__)
 
-def compile_high_level_block(block: HighLevelBlock, plugins: list[BlockLibraryPluginConfig]) -> LowLevelBlockStructure:
-    for plugin in plugins:
+
+def compile_high_level_block(block: HighLevelBlock, block_type_registry: BlockTypeRegistry,
+                             compilation_cache: BlockCompilationCache | None = None) -> LowLevelBlockStructure:
+    """
+    Structure of block, compiled by the first plugin registering its type that does not raise
+    NotImplementedError for it.
+    """
+    for plugin, block_type_config in block_type_registry.lookup_all(block.block_library, block.block_type):
         try:
-            return plugin.compile_block(block)
+            if compilation_cache is None:
+                return plugin.compile_block(block)
+            return compilation_cache.get_or_compile(block, plugin, block_type_config, lambda: plugin.compile_block(block))
         except NotImplementedError:
             continue
     raise RuntimeError(f"No plugin could compile block: {block.block_type}")
 
+# Tasks per worker of a parallel compilation, so that workers given slow blocks do not hold up the others
+_TASKS_PER_JOB = 4
+
+# Plugins of a compilation worker process, loaded once by _init_compile_worker
+_worker_block_type_registry: BlockTypeRegistry | None = None
+
+
+def _init_compile_worker(plugin_paths: List[str]) -> None:
+    global _worker_block_type_registry
+    _worker_block_type_registry = BlockTypeRegistry(load_block_library_plugins_from_paths(plugin_paths))
+
+
+def _compile_blocks_in_worker(blocks: List[HighLevelBlock]) -> List[LowLevelBlockStructure]:
+    return [compile_high_level_block(block, _worker_block_type_registry) for block in blocks]
+
+
+def resolve_jobs(jobs: int) -> int:
+    """
+    Number of processes compiling blocks, all the CPUs for jobs <= 0.
+    """
+    return jobs if jobs > 0 else (os.cpu_count() or 1)
+
+
+def compile_high_level_blocks(blocks: List[HighLevelBlock], block_type_registry: BlockTypeRegistry,
+                              compilation_cache: BlockCompilationCache | None = None, jobs: int = 1,
+                              plugin_paths: List[str] | None = None) -> List[LowLevelBlockStructure]:
+    """
+    Structures of blocks, in the same order.
+
+    With jobs > 1, the blocks not found in compilation_cache are compiled by a pool of jobs
+    processes, each loading the plugins of plugin_paths once. Each process compiles contiguous
+    runs of blocks and the results are put back in block order, so the structures (and the first
+    error raised) are those of a serial compilation. Blocks and structures are pickled to and from
+    the workers.
+    """
+    jobs = resolve_jobs(jobs)
+    if jobs == 1:
+        return [compile_high_level_block(block, block_type_registry, compilation_cache) for block in blocks]
+    if plugin_paths is None:
+        raise ValueError("plugin_paths are needed to compile blocks with several jobs")
+
+    structs: List[LowLevelBlockStructure | None] = [None] * len(blocks)
+    # (index, cache key) of the blocks left to compile
+    pending: List[Tuple[int, str | None]] = []
+    for i, block in enumerate(blocks):
+        entries = block_type_registry.lookup_all(block.block_library, block.block_type)
+        if compilation_cache is None or len(entries) != 1:
+            # Blocks without a plugin fail in the worker, in order with the errors of the blocks before them.
+            # Blocks of a type registered by several plugins are not cached, the worker may fall back to
+            # another plugin than the one the cache key is computed for
+            pending.append((i, None))
+            continue
+        key, struct = compilation_cache.lookup(block, *entries[0])
+        if struct is None:
+            pending.append((i, key))
+        else:
+            structs[i] = struct
+
+    jobs = min(jobs, len(pending))
+    if jobs <= 1:
+        compiled = [compile_high_level_block(blocks[i], block_type_registry) for i, _ in pending]
+    else:
+        task_size = -(-len(pending) // (jobs * _TASKS_PER_JOB))
+        tasks = [
+            [blocks[i] for i, _ in pending[start:start + task_size]] for start in range(0, len(pending), task_size)
+        ]
+        logger.debug("Compiling %d blocks in %d tasks on %d processes", len(pending), len(tasks), jobs)
+        # Imports multiprocessing, only needed here
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_compile_worker, initargs=(list(plugin_paths),)) as executor:
+            compiled = []
+            for task_structs in executor.map(_compile_blocks_in_worker, tasks):
+                compiled.extend(task_structs)
+
+    for (i, key), struct in zip(pending, compiled):
+        structs[i] = struct
+        if key is not None:
+            compilation_cache.store(key, struct)
+    return structs
+
 def format_property_value(prop_type, value):
     try:
         if prop_type == "int":
             return str(int(value))
-        elif prop_type == "float":
-            return f"{float(value):.1f}"
-        elif prop_type == "double":
-            return f"{float(value):.1f}"
-        elif prop_type == "float[]":
-            return [f"{float(v):.1f}" for v in value]
-        elif prop_type == "double[]":
-            return [f"{float(v):.1f}" for v in value]
+        elif prop_type in ("float", "double"):
+            # repr keeps every digit, 1 is still written 1.0
+            return repr(float(value))
+        elif prop_type in ("float[]", "double[]"):
+            return format_float_list(value)
         elif prop_type == "int[]":
-            return [str(int(v)) for v in value]
+            return list(map(str, to_int_list(value)))
         else:
             return value
     except Exception as e:
@@ -43,42 +133,84 @@ def format_property_value(prop_type, value):
 def serialize_block(block: LowLevelBlock) -> dict:
     d = block.to_dict()
     if "properties" in d:
+        # New dicts, the block (possibly cached) keeps its values
+        properties = {}
         for k, v in d["properties"].items():
             if isinstance(v, dict) and "type" in v and "value" in v:
-                d["properties"][k]["value"] = format_property_value(v["type"], v["value"])
+                v = dict(v, value=format_property_value(v["type"], v["value"]))
+            properties[k] = v
+        d["properties"] = properties
     return d
 
-def compile_pslk_to_yaml(pslk_path: str, toolkit_config_path: str, output_yaml_path: str):
+def compile_pslk_to_yaml(pslk_path: str, toolkit_config_path: str, output_yaml_path: str, jobs: int = 1,
+                         output_format: str = "yaml"):
     # Load the .pslk file (JSON)
-    system_json = load_yaml_file(pslk_path)
+    system_json = load_structured_file(pslk_path)
 
     # Load plugins
     toolkit_config = parse_toolkit_config(toolkit_config_path)
     block_library_plugins = load_block_library_plugins_from_paths(toolkit_config.plugin_paths)
 
-    high_level_system, parameter_environment_namespace = HighLevelSystem.from_dict_file(pslk_path, system_json)
-    high_level_system.flatten_subsystems()
+    high_level_system, parameter_environment_namespace = HighLevelSystem.from_dict_file(pslk_path, system_json, load_geometry=False)
+    compile_high_level_system(
+        high_level_system, BlockTypeRegistry(block_library_plugins), output_yaml_path, BlockCompilationCache.get_default(),
+        jobs=jobs, plugin_paths=toolkit_config.plugin_paths, output_format=output_format,
+    )
+
+def compile_high_level_system(high_level_system: HighLevelSystem, block_type_registry: BlockTypeRegistry, output_yaml_path: str,
+                              compilation_cache: BlockCompilationCache | None = None, jobs: int = 1,
+                              plugin_paths: List[str] | None = None, output_format: str = "yaml"):
+    """
+    Compile an already loaded high-level system with the plugins of block_type_registry. The system
+    is left unchanged, so that it can be compiled again.
+
+    With a compilation_cache, blocks compiled before with the same properties, port types and
+    plugin are not compiled again. With jobs > 1 (or <= 0 for all the CPUs), blocks are compiled
+    in parallel by processes loading the plugins of plugin_paths, see compile_high_level_blocks.
+    The output is the same as with a single job.
+
+    output_format is "yaml", or "json" for compact JSON read by YAML loaders as the same system,
+    written much faster for large systems (see write_low_level_system_json).
+    """
+    check_output_format(output_format)
+    high_level_system = high_level_system.flattened()
     high_level_system.propagate_and_validate_port_types()
 
     # Compile each high-level block
+    if compilation_cache is not None:
+        stats_before = compilation_cache.stats()
+    compiled = compile_high_level_blocks(high_level_system.blocks, block_type_registry, compilation_cache, jobs, plugin_paths)
     block_structs: Dict[str, LowLevelBlockStructure] = {}
-    for block in high_level_system.blocks:
-        ll_struct = compile_high_level_block(block, block_library_plugins)
+    for block, ll_struct in zip(high_level_system.blocks, compiled):
         block_structs[block.id] = ll_struct
 
-    print("High level blocks compiled")
-
-    # Collect all low-level blocks and links
-    all_blocks: List[LowLevelBlock] = []
-    all_links: List[LowLevelLink] = []
-    port_maps: Dict[str, Dict[str, Any]] = {}
-
-    for block_id, struct in block_structs.items():
-        all_blocks.extend(struct.blocks)
-        all_links.extend(struct.links)
-        port_maps[block_id] = struct.port_map
-
-    # Now resolve high-level links to low-level links using port maps
+    if compilation_cache is not None:
+        stats = {name: count - stats_before[name] for name, count in compilation_cache.stats().items()}
+        logger.info(
+            "High level blocks compiled: %d cache hits (%d from disk), %d compiled, %d not cacheable",
+            stats["hits"] + stats["disk_hits"], stats["disk_hits"], stats["misses"], stats["uncacheable"],
+        )
+    else:
+        logger.debug("High level blocks compiled")
+
+    # Blocks and links are generated while the file is written, links of the high-level links last
+    structs = list(block_structs.values())
+    port_maps = {block_id: struct.port_map for block_id, struct in block_structs.items()}
+    blocks = (serialize_block(block) for struct in structs for block in struct.blocks)
+    links = (
+        link.to_dict()
+        for link in itertools.chain(
+            (link for struct in structs for link in struct.links),
+            _resolve_high_level_links(high_level_system, port_maps),
+        )
+    )
+    write_low_level_system(output_yaml_path, blocks, links, output_format)
+
+
+def _resolve_high_level_links(high_level_system: HighLevelSystem, port_maps: Dict[str, Dict[Any, Any]]) -> Iterator[LowLevelLink]:
+    """
+    Low-level links of the high-level links, resolved with the port maps of the compiled blocks.
+    """
     for link in high_level_system.links:
         src_id = link.source_id
         src_port = link.source_port
@@ -105,7 +237,7 @@ def compile_pslk_to_yaml(pslk_path: str, toolkit_config_path: str, output_yaml_p
 
             tgt_block_id, tgt_port_idx = tgt_ll
 
-            ll_link = LowLevelLink(
+            yield LowLevelLink(
                 id=f"{link.id}_{segment_id}",  # ensure uniqueness
                 name=f"{link.id}_{segment_id}",
                 source_block_id=src_block_id,
@@ -113,16 +245,6 @@ def compile_pslk_to_yaml(pslk_path: str, toolkit_config_path: str, output_yaml_p
                 destination_block_id=tgt_block_id,
                 destination_port_idx=tgt_port_idx,
             )
-            all_links.append(ll_link)
-
-    # Prepare YAML output with formatted properties
-    output = {
-        "Blocks": [serialize_block(block) for block in all_blocks],
-        "Links": [link.to_dict() for link in all_links],
-    }
-
-    with open(output_yaml_path, "w") as f:
-        yaml.dump(output, f, sort_keys=False)
 
 # Example usage:
 # compile_pslk_to_yaml("test_json.pslk", "toolkit_config.yaml", "output_system.yaml")
\ No newline at end of file
@@ -0,0 +1,111 @@
+import ast
+import functools
+from typing import Any, Dict, Tuple
+
+# Expressions whose value can be computed once: literals and operators, no names
+_CONSTANT_NODES = (
+    ast.Expression, ast.Constant, ast.Tuple, ast.List, ast.Set, ast.Dict,
+    ast.UnaryOp, ast.BinOp, ast.BoolOp, ast.Compare, ast.Load,
+    ast.unaryop, ast.operator, ast.boolop, ast.cmpop,
+)
+# Expressions depending only on parameter values: same as above plus names, no calls or attributes
+_PARAMETER_NODES = _CONSTANT_NODES + (ast.Name,)
+
+_IMMUTABLE_TYPES = (int, float, complex, bool, str, bytes, type(None))
+
+MAX_COMPILED_EXPRESSIONS = 4096
+
+_NOT_FOUND = object()
+
+
+class _CompiledExpression:
+    """
+    Code of an expression, with what is known about its value without running it.
+    """
+    __slots__ = ("code", "names", "is_bare_name", "has_constant", "constant")
+
+    def __init__(self, code, names: Tuple[str, ...] | None, is_bare_name: bool):
+        self.code = code
+        # Names the value depends on, None if it may depend on anything else (calls, attributes, ...)
+        self.names = names
+        self.is_bare_name = is_bare_name
+        self.has_constant = False
+        self.constant = None
+
+
+def _is_immutable(value: Any) -> bool:
+    if isinstance(value, _IMMUTABLE_TYPES):
+        return True
+    if type(value) is tuple:
+        return all(_is_immutable(item) for item in value)
+    return False
+
+
+@functools.lru_cache(maxsize=MAX_COMPILED_EXPRESSIONS)
+def compile_expression(source: str) -> _CompiledExpression:
+    """
+    Compiled form of a property expression, as eval(source) would compile it.
+    """
+    # eval strips leading spaces and tabs, compile does not
+    source = source.lstrip(" \t")
+    code = compile(source, "<string>", "eval")
+    tree = ast.parse(source, mode="eval")
+
+    nodes = list(ast.walk(tree))
+    names = None
+    if all(isinstance(node, _PARAMETER_NODES) for node in nodes):
+        names = tuple(sorted({node.id for node in nodes if isinstance(node, ast.Name)}))
+    compiled = _CompiledExpression(code, names, isinstance(tree.body, ast.Name))
+
+    if names == ():
+        try:
+            constant = eval(code, {"__builtins__": {}})
+        except Exception:
+            # Raised again with the namespace of the block, e.g. 1/0
+            return compiled
+        # A new mutable value must be built for every block, as eval would
+        if _is_immutable(constant):
+            compiled.has_constant = True
+            compiled.constant = constant
+    return compiled
+
+
+# source -> (values of the names used, result), for one namespace
+ExpressionResults = Dict[str, Tuple[Tuple[Any, ...], Any]]
+
+
+def evaluate_expression(source: str, namespace: Dict[str, Any], results: ExpressionResults | None = None) -> Any:
+    """
+    eval(source, namespace, namespace), reusing previous work where it cannot change the result.
+
+    Sources are compiled once (bounded LRU). Literal expressions are folded at compile time. With
+    results, a dict kept by the caller while it evaluates expressions in namespace (the blocks of
+    one system), an expression of parameters only (names, literals and operators) is evaluated
+    once and reused until one of the parameters it uses is rebound. Results are only reused when
+    the expression is a bare name (eval returns the bound object itself) or when both the result
+    and the parameters are immutable, so sharing them between blocks cannot be told apart from
+    evaluating again.
+    """
+    compiled = compile_expression(source)
+    if compiled.has_constant:
+        return compiled.constant
+    if not compiled.names or results is None:
+        return eval(compiled.code, namespace, namespace)
+
+    values = tuple(namespace.get(name, _NOT_FOUND) for name in compiled.names)
+    if any(value is _NOT_FOUND for value in values):
+        # Builtins or an undefined name, let eval resolve or raise
+        return eval(compiled.code, namespace, namespace)
+
+    entry = results.get(source)
+    if entry is not None and all(a is b for a, b in zip(entry[0], values)):
+        return entry[1]
+
+    result = eval(compiled.code, namespace, namespace)
+    if compiled.is_bare_name or (_is_immutable(result) and all(_is_immutable(value) for value in values)):
+        results[source] = (values, result)
+    return result
+
+
+def clear_expression_caches() -> None:
+    compile_expression.cache_clear()
@@ -0,0 +1,245 @@
+import json
+import os
+import re
+from typing import Any, Callable, Dict, Iterable, List
+
+import yaml
+
+# libyaml emitter, for the entries the writer below does not format itself
+YAML_DUMPER = getattr(yaml, "CDumper", yaml.Dumper)
+
+# Strings PyYAML writes as plain scalars in block context, unless they read as another type
+_PLAIN_STRING = re.compile(r"[A-Za-z0-9_./][A-Za-z0-9_./<>\[\]()+\-, ]*\Z")
+
+# PyYAML wraps plain scalars at spaces past this column
+_BEST_WIDTH = 80
+
+# Keys longer than this are written as complex keys
+_MAX_SIMPLE_KEY_LENGTH = 128
+
+# Output formats of write_low_level_system
+OUTPUT_FORMATS = ("yaml", "json")
+
+# Items of _format_float_items whose repr differs from the YAML spelling: 1e+16 (1.0e+16 in YAML),
+# inf and nan. Every item follows a space
+_NON_YAML_FLOAT_ITEM = re.compile(r" (-?)(?:(\d+)e|inf|nan)")
+# Numbers of JSON text spelled differently in YAML, with non-finite floats written Infinity and NaN
+_NON_YAML_JSON_NUMBER = re.compile(r"[,\[:]-?(?:\d+e|Infinity)|NaN")
+
+_resolver = yaml.resolver.Resolver()
+_STR_TAG = "tag:yaml.org,2002:str"
+
+
+class _NotPlain(Exception):
+    """
+    An entry value the writer does not format, dumped with YAML_DUMPER instead.
+    """
+
+
+def _format_string(value: str) -> str:
+    if (
+        not _PLAIN_STRING.match(value)
+        or value[-1] == " "
+        or value.startswith("...")
+        # Strings like yes, null, 1.0 or .inf are quoted
+        or (value[0] in _resolver.yaml_implicit_resolvers
+            and _resolver.resolve(yaml.ScalarNode, value, (True, False)) != _STR_TAG)
+    ):
+        raise _NotPlain
+    return value
+
+
+def _format_float(value: float) -> str:
+    # As yaml.representer.SafeRepresenter.represent_float
+    if value != value:
+        return ".nan"
+    if value == float("inf"):
+        return ".inf"
+    if value == float("-inf"):
+        return "-.inf"
+    text = repr(value).lower()
+    if "." not in text and "e" in text:
+        text = text.replace("e", ".0e", 1)
+    return text
+
+
+def _to_yaml_float(match: "re.Match[str]") -> str:
+    sign, digits = match.groups()
+    if digits is not None:
+        return f" {sign}{digits}.0e"
+    if match.group(0).endswith("nan"):
+        return " .nan"
+    return f" {sign}.inf"
+
+
+def _format_float_items(values: List[float]) -> str:
+    """
+    Block sequence items of values, floats only, as _format_float writes them.
+    """
+    return _NON_YAML_FLOAT_ITEM.sub(_to_yaml_float, "  - " + "\n  - ".join(map(float.__repr__, values)))
+
+
+def _format_scalar(value: Any) -> str:
+    value_type = type(value)
+    if value_type is str:
+        return _format_string(value)
+    if value_type is int:
+        return str(value)
+    if value_type is float:
+        return _format_float(value)
+    if value_type is bool:
+        return "true" if value else "false"
+    if value is None:
+        return "null"
+    raise _NotPlain
+
+
+def _format_entry(entry: Dict[str, Any]) -> str:
+    """
+    entry as an item of a block sequence, as yaml.dump writes it: keys and scalars, or lists of
+    scalars, in the default block style.
+    """
+    lines: List[str] = []
+    prefix = "- "
+    for key, value in entry.items():
+        if type(key) is not str or len(key) >= _MAX_SIMPLE_KEY_LENGTH:
+            raise _NotPlain
+        key = _format_string(key)
+        if type(value) is list:
+            if not value:
+                lines.append(f"{prefix}{key}: []")
+            elif set(map(type, value)) == {float}:
+                # Long vectors, from lookup tables or init scripts
+                lines.append(f"{prefix}{key}:")
+                lines.append(_format_float_items(value))
+            else:
+                lines.append(f"{prefix}{key}:")
+                for item in value:
+                    item = _format_scalar(item)
+                    if " " in item and len(item) + 4 > _BEST_WIDTH:
+                        raise _NotPlain
+                    lines.append(f"  - {item}")
+        else:
+            line = f"{prefix}{key}: {_format_scalar(value)}"
+            if len(line) > _BEST_WIDTH and " " in line[len(prefix) + len(key) + 2:]:
+                raise _NotPlain
+            lines.append(line)
+        prefix = "  "
+    if not lines:
+        return "- {}\n"
+    lines.append("")
+    return "\n".join(lines)
+
+
+def _write_sequence(write: Callable[[str], Any], name: str, entries: Iterable[Dict[str, Any]]) -> None:
+    first = True
+    for entry in entries:
+        if first:
+            write(f"{name}:\n")
+            first = False
+        try:
+            write(_format_entry(entry))
+        except _NotPlain:
+            write(yaml.dump([entry], Dumper=YAML_DUMPER, sort_keys=False))
+    if first:
+        write(f"{name}: []\n")
+
+
+def _format_json_value(value: Any) -> str:
+    """
+    value as compact JSON, with floats spelled as YAML does, so that 1e+20 is written 1.0e+20
+    and nan, inf and -inf .nan, .inf and -.inf.
+    """
+    value_type = type(value)
+    if value_type is float:
+        return _format_float(value)
+    if value_type is list:
+        return "[" + ",".join(_format_json_value(item) for item in value) + "]"
+    if value_type is dict:
+        return "{" + ",".join(
+            f"{json.dumps(key)}:{_format_json_value(item)}" for key, item in value.items()
+        ) + "}"
+    return json.dumps(value)
+
+
+def _write_json_sequence(write: Callable[[str], Any], entries: Iterable[Dict[str, Any]]) -> None:
+    encode = json.JSONEncoder(separators=(",", ":")).encode
+    separator = "\n"
+    for entry in entries:
+        write(separator)
+        separator = ",\n"
+        text = encode(entry)
+        # Or strings that look like such numbers
+        if _NON_YAML_JSON_NUMBER.search(text):
+            text = _format_json_value(entry)
+        write(text)
+
+
+def _write_atomically(output_path: str, write_contents: Callable[[Callable[[str], Any]], None]) -> None:
+    """
+    Write the file next to output_path and move it there once complete, so that an error raised
+    while writing leaves any previous output in place.
+    """
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            write_contents(f.write)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_low_level_system_yaml(output_yaml_path: str, blocks: Iterable[Dict[str, Any]], links: Iterable[Dict[str, Any]]) -> None:
+    """
+    Write {"Blocks": blocks, "Links": links} as yaml.dump(..., sort_keys=False) does, one entry at
+    a time, so blocks and links can be generated while writing.
+
+    Entries with only string, number, bool and null values or lists of them are formatted
+    directly; other entries are dumped with YAML_DUMPER. An error raised by the iterables leaves
+    any previous output in place.
+    """
+    def write_contents(write: Callable[[str], Any]) -> None:
+        _write_sequence(write, "Blocks", blocks)
+        _write_sequence(write, "Links", links)
+
+    _write_atomically(output_yaml_path, write_contents)
+
+
+def write_low_level_system_json(output_path: str, blocks: Iterable[Dict[str, Any]], links: Iterable[Dict[str, Any]]) -> None:
+    """
+    Write {"Blocks": blocks, "Links": links} as compact JSON, one entry per line, which YAML
+    loaders read as the same system as write_low_level_system_yaml writes, and much faster.
+
+    Floats are spelled as in YAML (1.0e+20 rather than 1e+20, which YAML 1.1 reads as a string).
+    Non-finite floats have no JSON spelling and are written .nan, .inf and -.inf, making the file
+    YAML only. An error raised by the iterables leaves any previous output in place.
+    """
+    def write_contents(write: Callable[[str], Any]) -> None:
+        write('{"Blocks":[')
+        _write_json_sequence(write, blocks)
+        write('],"Links":[')
+        _write_json_sequence(write, links)
+        write("]}\n")
+
+    _write_atomically(output_path, write_contents)
+
+
+def write_low_level_system(output_path: str, blocks: Iterable[Dict[str, Any]], links: Iterable[Dict[str, Any]],
+                           output_format: str = "yaml") -> None:
+    """
+    Write the low-level system in output_format, one of OUTPUT_FORMATS.
+    """
+    check_output_format(output_format)
+    if output_format == "json":
+        write_low_level_system_json(output_path, blocks, links)
+    else:
+        write_low_level_system_yaml(output_path, blocks, links)
+
+
+def check_output_format(output_format: str) -> None:
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown low-level system output format '{output_format}', expected one of {OUTPUT_FORMATS}")
@@ -0,0 +1,354 @@
+import logging
+from typing import Dict, Iterator, List, Tuple
+
+from pysyslink_toolkit.HighLevelBlock import HighLevelBlock
+from pysyslink_toolkit.PortType import PortCategory, PortType
+
+logger = logging.getLogger(__name__)
+
+
+def is_inherited(pt: PortType) -> bool:
+    return pt.port_category is PortCategory.inherited
+
+
+def is_known(pt: PortType) -> bool:
+    return not is_inherited(pt)
+
+
+def same_type(a: PortType, b: PortType) -> bool:
+    return a.value_type is b.value_type
+
+
+def is_allowed_inheritance(dst: PortType, src: PortType) -> bool:
+    """
+    Can dst inherit src?
+    """
+
+    # no restriction → always allowed
+    if not dst.supported_port_types_for_inheritance:
+        return True
+
+    # must match at least one allowed template
+    for allowed in dst.supported_port_types_for_inheritance:
+        logger.debug("Checking if %s can be inherited for %s against allowed template %s", src, dst, allowed)
+        if allowed == "FullySupportedSignalValueType.Any":
+            if src.port_category == PortCategory.fully_supported_signal_value:
+                return True
+        else:
+            if same_type(allowed, src):
+                return True
+
+    return False
+
+
+class _Ports:
+    """
+    Port types of the blocks in one list, numbered block after block, inputs then outputs. Ports
+    are resolved in this list and written back to the blocks at the end.
+    """
+    __slots__ = ("blocks", "links", "block_map", "first", "types")
+
+    def __init__(self, blocks: List[HighLevelBlock], links):
+        self.blocks = blocks
+        self.links = links
+        self.block_map = {b.id: b for b in blocks}
+        # Block id -> number of its first port, the last block wins on duplicate ids as in block_map
+        self.first: Dict[str, int] = {}
+        self.types: List[PortType] = []
+        for block in blocks:
+            self.first[block.id] = len(self.types)
+            self.types.extend(block.input_port_types)
+            self.types.extend(block.output_port_types)
+
+    def _block_ranges(self) -> Iterator[Tuple[HighLevelBlock, int, int, int]]:
+        """
+        (block, first port, first output port, end) of each block.
+        """
+        start = 0
+        for block in self.blocks:
+            outputs = start + len(block.input_port_types)
+            end = outputs + len(block.output_port_types)
+            yield block, start, outputs, end
+            start = end
+
+    def write_back(self) -> None:
+        """
+        Give the blocks with a resolved port new port type lists.
+        """
+        types = self.types
+        for block, start, outputs, end in self._block_ranges():
+            if any(a is not b for a, b in zip(types[start:outputs], block.input_port_types)):
+                block.input_port_types = types[start:outputs]
+            if any(a is not b for a, b in zip(types[outputs:end], block.output_port_types)):
+                block.output_port_types = types[outputs:end]
+
+    def inheritance_groups(self) -> Iterator[Tuple[HighLevelBlock, Dict[int, List[int]]]]:
+        """
+        Port numbers of each block by inheritance group.
+        """
+        types = self.types
+        for block, start, _, end in self._block_ranges():
+            groups = {}
+            for port in range(start, end):
+                groups.setdefault(types[port].inheritance_group, []).append(port)
+            yield block, groups
+
+    def source_port(self, link) -> int:
+        if link.source_id not in self.block_map:
+            raise ValueError(
+                f"Link source block '{link.source_id}' not found"
+            )
+
+        src_block = self.block_map[link.source_id]
+
+        if link.source_port >= len(src_block.output_port_types):
+            raise ValueError(
+                f"Invalid source port {link.source_port} "
+                f"on block '{src_block.id}'"
+            )
+
+        return self.first[src_block.id] + len(src_block.input_port_types) + link.source_port
+
+    def target_ports(self, link) -> Iterator[Tuple[int, str, int]]:
+        """
+        (port number, block id, input index) of the targets of a link, raising on a missing block
+        or port when reached.
+        """
+        for target in link.target_nodes.values():
+            if target.target_id not in self.block_map:
+                raise ValueError(
+                    f"Link target block '{target.target_id}' not found"
+                )
+
+            tgt_block = self.block_map[target.target_id]
+
+            if target.port >= len(tgt_block.input_port_types):
+                raise ValueError(
+                    f"Invalid target port {target.port} "
+                    f"on block '{tgt_block.id}'"
+                )
+
+            yield self.first[tgt_block.id] + target.port, tgt_block.id, target.port
+
+
+def _find(parent: List[int], port: int) -> int:
+    while parent[port] != port:
+        parent[port] = parent[parent[port]]
+        port = parent[port]
+    return port
+
+
+def _solve(ports: _Ports) -> bool:
+    """
+    Resolve every inherited port reachable from a known one in ports.types. Returns False, leaving
+    ports.types unchanged, if the system has an error somewhere.
+
+    Inherited ports joined by links or inheritance groups end up with the same type, so each
+    connected class of them (union-find over port numbers) is resolved once, from the known ports
+    around it.
+    """
+    types = ports.types
+    parent = list(range(len(types)))
+    # (inherited port, known type) next to each other
+    boundary: List[Tuple[int, PortType]] = []
+
+    def connect(a: int, b: int) -> bool:
+        type_a = types[a]
+        type_b = types[b]
+        if is_known(type_a) and is_known(type_b):
+            return same_type(type_a, type_b)
+        if is_inherited(type_a) and is_inherited(type_b):
+            root_a = _find(parent, a)
+            root_b = _find(parent, b)
+            if root_a != root_b:
+                parent[root_b] = root_a
+        elif is_inherited(type_a):
+            boundary.append((a, type_b))
+        else:
+            boundary.append((b, type_a))
+        return True
+
+    for link in ports.links:
+        try:
+            src = ports.source_port(link)
+            for tgt, _, _ in ports.target_ports(link):
+                if not connect(src, tgt):
+                    return False
+        except ValueError:
+            return False
+
+    for _, groups in ports.inheritance_groups():
+        for group in groups.values():
+            known = [port for port in group if is_known(types[port])]
+            if any(not same_type(types[known[0]], types[port]) for port in known[1:]):
+                return False
+            inherited = [port for port in group if is_inherited(types[port])]
+            for port in inherited[1:]:
+                connect(inherited[0], port)
+            if known and inherited:
+                connect(inherited[0], known[0])
+
+    class_types: Dict[int, PortType] = {}
+    for port, known_type in boundary:
+        class_type = class_types.setdefault(_find(parent, port), known_type)
+        if not same_type(class_type, known_type):
+            return False
+
+    resolved = {}
+    # (class, group) -> canonical type, most ports of a class share their group
+    resolved_types: Dict[Tuple[int, int], PortType] = {}
+    for port, pt in enumerate(types):
+        if not is_inherited(pt):
+            continue
+        root = _find(parent, port)
+        class_type = class_types.get(root)
+        if class_type is None:
+            continue
+        if not is_allowed_inheritance(pt, class_type):
+            return False
+        key = (root, pt.inheritance_group)
+        resolved_type = resolved_types.get(key)
+        if resolved_type is None:
+            resolved_type = resolved_types[key] = class_type.with_inheritance_group(pt.inheritance_group)
+        resolved[port] = resolved_type
+
+    for port, pt in resolved.items():
+        types[port] = pt
+    return True
+
+
+def _propagate_to_fixed_point(ports: _Ports) -> None:
+    """
+    Propagate known types over links and inheritance groups pass after pass until nothing changes.
+
+    Costs a pass over every link and block per step of the longest inheritance chain. Only used
+    to report errors, whose message depends on the order in which types reach the ports.
+    """
+    types = ports.types
+
+    def assign(dst, src):
+        """
+        Give inherited port dst the concrete type of port src.
+        Returns True if changed.
+        """
+        dst_type = types[dst]
+        src_type = types[src]
+        if is_known(dst_type):
+            return False
+
+        if is_inherited(src_type):
+            return False
+
+        if not is_allowed_inheritance(dst_type, src_type):
+            raise ValueError(
+                f"Incompatible inheritance: {src_type} not allowed for port constraints "
+                f"{list(dst_type.supported_port_types_for_inheritance)}"
+            )
+
+        types[dst] = src_type.with_inheritance_group(dst_type.inheritance_group)
+        return True
+
+    def unify(a, b, context=""):
+        """
+        Make ports a and b compatible.
+        Returns True if something changed.
+        """
+        type_a = types[a]
+        type_b = types[b]
+        # both known
+        if is_known(type_a) and is_known(type_b):
+            if not same_type(type_a, type_b):
+                raise ValueError(
+                    f"Incompatible port types {type_a} vs {type_b}. {context}"
+                )
+            return False
+
+        # a known, b inherited
+        if is_known(type_a) and is_inherited(type_b):
+            return assign(b, a)
+
+        # b known, a inherited
+        if is_known(type_b) and is_inherited(type_a):
+            return assign(a, b)
+
+        # both inherited
+        return False
+
+    changed = True
+
+    while changed:
+        changed = False
+
+        # Pass A: propagate through links
+        for link in ports.links:
+            src = ports.source_port(link)
+            for tgt, tgt_block_id, tgt_port in ports.target_ports(link):
+                changed |= unify(
+                    src,
+                    tgt,
+                    context=(
+                        f"Connection "
+                        f"{link.source_id}.out[{link.source_port}] -> "
+                        f"{tgt_block_id}.in[{tgt_port}]"
+                    ),
+                )
+
+        # Pass B: propagate inside each block by inheritance group
+        for block, groups in ports.inheritance_groups():
+            for group_id, group in groups.items():
+                known = None
+
+                for port in group:
+                    if is_known(types[port]):
+                        if known is None:
+                            known = port
+                        else:
+                            if not same_type(types[known], types[port]):
+                                raise ValueError(
+                                    f"Conflicting inherited group "
+                                    f"{group_id} on block '{block.id}'"
+                                )
+
+                if known is not None:
+                    for port in group:
+                        changed |= unify(
+                            known,
+                            port,
+                            context=(
+                                f"Block '{block.id}' "
+                                f"group {group_id}"
+                            ),
+                        )
+
+
+def propagate_and_validate_port_types(blocks: List[HighLevelBlock], links) -> None:
+    """
+    Resolve inherited port types, see HighLevelSystem.propagate_and_validate_port_types. The port
+    type lists of the blocks are replaced, resolved ports getting the canonical PortType of their
+    type, the PortType objects themselves are immutable.
+
+    Runs in time linear in the number of ports and links. On an error the propagation is run
+    again pass by pass, so that the error raised is the one the pass-by-pass propagation meets
+    first.
+    """
+    ports = _Ports(blocks, links)
+    if not _solve(ports):
+        _propagate_to_fixed_point(ports)
+    ports.write_back()
+
+    # Final unresolved check
+    for block in blocks:
+
+        for i, pt in enumerate(block.input_port_types):
+            if is_inherited(pt):
+                raise ValueError(
+                    f"Could not resolve input port type "
+                    f"{block.id}.in[{i}]"
+                )
+
+        for i, pt in enumerate(block.output_port_types):
+            if is_inherited(pt):
+                raise ValueError(
+                    f"Could not resolve output port type "
+                    f"{block.id}.out[{i}]"
+                )
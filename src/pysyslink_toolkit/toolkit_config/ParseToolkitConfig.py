@@ -1,5 +1,3 @@
-import yaml
-
 from dacite import from_dict, Config
 from pysyslink_toolkit.TextFileManager import load_yaml_file
 from pysyslink_toolkit.toolkit_config.ToolkitConfig import ToolkitConfig
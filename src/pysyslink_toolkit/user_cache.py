@@ -0,0 +1,54 @@
+import os
+import sys
+import tempfile
+
+
+CACHE_DIR_ENV_VAR = "PYSYSLINK_TOOLKIT_CACHE_DIR"
+DISABLE_CACHE_ENV_VAR = "PYSYSLINK_TOOLKIT_DISABLE_CACHE"
+
+
+def is_env_flag_set(env_var: str) -> bool:
+    return os.environ.get(env_var, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def is_user_cache_disabled() -> bool:
+    """
+    True when persistent caches were disabled through PYSYSLINK_TOOLKIT_DISABLE_CACHE.
+    """
+    return is_env_flag_set(DISABLE_CACHE_ENV_VAR)
+
+
+def get_user_cache_dir(*subdirs: str) -> str:
+    """
+    Return the per-user cache directory of the toolkit (optionally a subdirectory of it).
+    PYSYSLINK_TOOLKIT_CACHE_DIR overrides the platform default. The directory is not created.
+    """
+    base_dir = os.environ.get(CACHE_DIR_ENV_VAR)
+
+    if not base_dir:
+        if sys.platform.startswith("win"):
+            root = os.environ.get("LOCALAPPDATA") or os.path.expanduser(os.path.join("~", "AppData", "Local"))
+        elif sys.platform == "darwin":
+            root = os.path.expanduser(os.path.join("~", "Library", "Caches"))
+        else:
+            root = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser(os.path.join("~", ".cache"))
+        base_dir = os.path.join(root, "pysyslink_toolkit")
+
+    return os.path.join(base_dir, *subdirs)
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """
+    Write data to path through a temporary file in the same directory, so readers never see a partial file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
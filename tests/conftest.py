@@ -0,0 +1,222 @@
+import json
+import os
+import time
+
+import pytest
+
+
+CORE_PLUGIN_YAML = """\
+pluginName: basic_blocks_plugin
+pluginType: coreBlockLibrary
+blockType: BasicCpp
+commonBlocks:
+  - name: double_block
+    inputPortTypes:
+      all:
+        port_category: FullySupportedSignalValue
+        signal_value_type: double
+    outputPortTypes:
+      all:
+        port_category: FullySupportedSignalValue
+        signal_value_type: double
+blockLibraries:
+  - name: BasicBlocks
+    blockTypes:
+      - name: Constant
+        commonBlock: double_block
+        inputPortNumber: 0
+        outputPortNumber: 1
+        configurationValues:
+          - name: Value
+            defaultValue: 1.0
+            type: double
+      - name: Gain
+        commonBlock: double_block
+        inputPortNumber: 1
+        outputPortNumber: 1
+        configurationValues:
+          - name: Gain
+            defaultValue: 1.0
+            type: double
+      - name: Adder
+        commonBlock: double_block
+        inputPortNumber: len(Gains)
+        outputPortNumber: 1
+        configurationValues:
+          - name: Gains
+            defaultValue:
+              - 1.0
+              - 1.0
+            type: double[]
+        renderInformation:
+          blockShape: circle
+      - name: Display
+        commonBlock: double_block
+        inputPortNumber: 1
+        outputPortNumber: 0
+"""
+
+
+def pytest_addoption(parser):
+    parser.addoption("--benchmarks", action="store_true", help="run the wall-clock timing comparisons marked benchmark")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: wall-clock timing comparison, skipped unless --benchmarks is given")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmarks"):
+        return
+    skip = pytest.mark.skip(reason="timing comparison, run with --benchmarks")
+    for item in items:
+        if item.get_closest_marker("benchmark") is not None:
+            item.add_marker(skip)
+
+
+def best_time(function, repeat=5):
+    """
+    Shortest wall-clock time of repeat calls of function(), in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@pytest.fixture(autouse=True)
+def isolated_user_cache(tmp_path, monkeypatch):
+    """
+    Keep the persistent caches of the toolkit out of the user cache directory during tests.
+    """
+    from pysyslink_toolkit.BlockCompilationCache import BlockCompilationCache
+    from pysyslink_toolkit.InitScriptCache import InitScriptCache
+    from pysyslink_toolkit.block_libraries.PluginConfigCache import PluginConfigCache
+
+    monkeypatch.setenv("PYSYSLINK_TOOLKIT_CACHE_DIR", str(tmp_path / "user_cache"))
+    monkeypatch.delenv("PYSYSLINK_TOOLKIT_INIT_SCRIPT_DISK_CACHE", raising=False)
+    monkeypatch.delenv("PYSYSLINK_TOOLKIT_BLOCK_COMPILATION_DISK_CACHE", raising=False)
+    monkeypatch.setattr(PluginConfigCache, "_default_instance", None)
+    monkeypatch.setattr(InitScriptCache, "_default_instance", None)
+    monkeypatch.setattr(BlockCompilationCache, "_default_instance", None)
+
+
+@pytest.fixture
+def core_plugin_dir(tmp_path):
+    """
+    Directory with a core block library plugin defining BasicBlocks/Constant, Gain, Adder and Display.
+    """
+    plugin_dir = tmp_path / "plugins" / "basic_blocks"
+    plugin_dir.mkdir(parents=True)
+    (plugin_dir / "basic_blocks.pslkblp.yaml").write_text(CORE_PLUGIN_YAML)
+    return str(tmp_path / "plugins")
+
+
+@pytest.fixture
+def test_plugins_dir():
+    return os.path.join(os.path.dirname(__file__), "plugins")
+
+
+DOUBLE_PORT_TYPE = {"port_category": "FullySupportedSignalValue", "signal_value_type": "double"}
+INHERITED_PORT_TYPE = {
+    "port_category": "Inherited",
+    "supported_port_types_for_inheritance": ["FullySupportedSignalValueType.Any"],
+}
+
+
+class SystemBuilder:
+    """
+    Writes .pslk systems in the editor format, together with their toolkit config and initialization script.
+    """
+
+    def __init__(self, directory, plugin_paths):
+        self.directory = directory
+        self.plugin_paths = list(plugin_paths)
+        self.toolkit_config_path = str(directory / "toolkit_config.yaml")
+        with open(self.toolkit_config_path, "w") as f:
+            f.write("plugin_paths:\n" + "".join(f"  - {p}\n" for p in self.plugin_paths))
+
+    @staticmethod
+    def block(block_id, block_type, properties=None, inputs=0, outputs=0,
+              block_library="core_BasicBlocks", input_type=DOUBLE_PORT_TYPE, output_type=DOUBLE_PORT_TYPE):
+        return {
+            "id": block_id,
+            "label": block_type,
+            "blockLibrary": block_library,
+            "blockType": block_type,
+            "inputPorts": inputs,
+            "outputPorts": outputs,
+            "inputPortTypes": [dict(input_type) for _ in range(inputs)],
+            "outputPortTypes": [dict(output_type) for _ in range(outputs)],
+            "properties": properties or {},
+        }
+
+    @staticmethod
+    def link(link_id, source_id, source_port, targets):
+        """
+        targets: list of (target_id, target_port)
+        """
+        return {
+            "id": link_id,
+            "sourceId": source_id,
+            "sourcePort": source_port,
+            "sourceX": 0.0,
+            "sourceY": 0.0,
+            "segmentNode": {
+                "id": f"{link_id}_root",
+                "orientation": "Horizontal",
+                "xOrY": 0.0,
+                "children": [
+                    {"id": f"{link_id}_seg{i}", "orientation": "Vertical", "xOrY": float(i), "children": []}
+                    for i in range(len(targets))
+                ],
+            },
+            "targetNodes": {
+                f"{link_id}_seg{i}": {"targetId": target_id, "port": port, "x": 10.0, "y": float(i)}
+                for i, (target_id, port) in enumerate(targets)
+            },
+        }
+
+    @staticmethod
+    def subsystem(subsystem_id, blocks, links, subsystems=None, inputs=0, outputs=0):
+        return {
+            "id": subsystem_id,
+            "label": subsystem_id,
+            "inputPorts": inputs,
+            "outputPorts": outputs,
+            "inputPortTypes": [dict(INHERITED_PORT_TYPE) for _ in range(inputs)],
+            "outputPortTypes": [dict(INHERITED_PORT_TYPE) for _ in range(outputs)],
+            "jsonData": SystemBuilder.system_json(blocks, links, subsystems),
+        }
+
+    @staticmethod
+    def system_json(blocks, links, subsystems=None, init_script="initScript.py"):
+        return {
+            "blocks": blocks,
+            "links": links,
+            "subsystems": subsystems or [],
+            "simulation_configuration": "sim_options.yaml",
+            "initialization_python_script_path": init_script,
+            "toolkit_configuration_path": "toolkit_config.yaml",
+        }
+
+    def write(self, blocks, links, subsystems=None, init_script="a = 1\n", name="system.pslk"):
+        """
+        Write the system and its initialization script, return the .pslk path.
+        """
+        script_name = os.path.splitext(name)[0] + "_init.py"
+        with open(self.directory / script_name, "w") as f:
+            f.write(init_script)
+        pslk_path = str(self.directory / name)
+        with open(pslk_path, "w") as f:
+            json.dump(self.system_json(blocks, links, subsystems, init_script=script_name), f, indent=2)
+        return pslk_path
+
+
+@pytest.fixture
+def system_builder(tmp_path, core_plugin_dir, test_plugins_dir):
+    system_dir = tmp_path / "system"
+    system_dir.mkdir()
+    return SystemBuilder(system_dir, [core_plugin_dir, test_plugins_dir])
@@ -0,0 +1,109 @@
+import pytest
+import yaml
+
+from pysyslink_toolkit.LowLevelBlockStructure import LowLevelBlock
+from pysyslink_toolkit.array_values import format_float_list, to_float_list
+from pysyslink_toolkit.block_libraries.ParseBlockLibraries import load_block_library_plugins_from_paths
+from pysyslink_toolkit.compile_system import format_property_value, serialize_block
+from pysyslink_toolkit.low_level_yaml_writer import write_low_level_system_yaml
+from conftest import best_time
+
+numpy = pytest.importorskip("numpy")
+
+
+TABLE_PLUGIN_YAML = """\
+pluginName: table_plugin
+pluginType: coreBlockLibrary
+blockType: BasicCpp
+blockLibraries:
+  - name: Tables
+    blockTypes:
+      - name: Table
+        inputPortNumber: 1
+        outputPortNumber: 1
+        configurationValues:
+          - name: Values
+            defaultValue: [0.0]
+            type: double[]
+          - name: Steps
+            defaultValue: [0]
+            type: int[]
+          - name: Names
+            defaultValue: [a]
+            type: string[]
+          - name: Matrix
+            defaultValue: [[0.0]]
+            type: matrix<double>
+          - name: Matrices
+            defaultValue: []
+            type: matrix<int>[]
+"""
+
+
+@pytest.fixture
+def table_plugin(tmp_path):
+    plugin_dir = tmp_path / "plugins" / "table_plugin"
+    plugin_dir.mkdir(parents=True)
+    (plugin_dir / "table_plugin.pslkblp.yaml").write_text(TABLE_PLUGIN_YAML)
+    plugins = load_block_library_plugins_from_paths([str(tmp_path / "plugins")])
+    return next(p for p in plugins if p.block_library_plugin_config.pluginName == "table_plugin")
+
+
+def _convert(plugin, **values):
+    return plugin._convert_property_types("core_Tables", "Table", {name: {"value": value} for name, value in values.items()})
+
+
+def test_arrays_are_converted_like_lists(table_plugin):
+    values = [0.1 + 0.2, 1e-7, 3.0]
+    steps = [1, 2, 3]
+    matrix = [[0.1 * i + j for j in range(3)] for i in range(2000)]
+    matrices = [[[1, 2], [3, 4]], [[5, 6], [7, 8]]]
+
+    from_lists = _convert(table_plugin, Values=values, Steps=steps, Names=["a", "b"], Matrix=matrix, Matrices=matrices)
+    from_arrays = _convert(
+        table_plugin, Values=numpy.array(values), Steps=numpy.array(steps), Names=numpy.array(["a", "b"]),
+        Matrix=numpy.array(matrix), Matrices=numpy.array(matrices),
+    )
+
+    assert from_arrays == from_lists
+    assert all(type(v) is float for v in from_arrays["Values[vector<double>]"])
+    assert all(type(v) is int for v in from_arrays["Steps[vector<int>]"])
+    # In full, numpy summarizes large arrays with "..."
+    assert "..." not in from_arrays["Matrix[matrix<double>]"]
+    assert eval(from_arrays["Matrix[matrix<double>]"]) == matrix
+
+
+def test_array_conversion_keeps_precision(table_plugin, tmp_path):
+    values = numpy.random.default_rng(0).random(1000)
+    converted = _convert(table_plugin, Values=values, Steps=numpy.array([1.9, -1.9], dtype=numpy.float32))
+    assert converted["Values[vector<double>]"] == [float(v) for v in values]
+    assert converted["Steps[vector<int>]"] == [1, -1]
+
+    block = LowLevelBlock("table", "table", "BasicCpp", "Tables/Table", 1, ["double"], 1, ["double"], **converted)
+    write_low_level_system_yaml(str(tmp_path / "out.yaml"), [serialize_block(block)], [])
+    with open(tmp_path / "out.yaml") as f:
+        assert yaml.safe_load(f)["Blocks"][0]["Values[vector<double>]"] == values.tolist()
+
+    assert format_property_value("double", 0.1 + 0.2) == "0.30000000000000004"
+    assert format_property_value("double[]", numpy.array([1, 2.5], dtype=numpy.float32)) == ["1.0", "2.5"]
+    assert format_property_value("int[]", numpy.array([True, False])) == ["1", "0"]
+
+
+def test_vector_properties_must_be_one_dimensional(table_plugin):
+    with pytest.raises(ValueError):
+        _convert(table_plugin, Values=numpy.zeros((2, 2)))
+
+
+def test_format_float_list_is_repr_of_each_value():
+    values = numpy.random.default_rng(0).random(3)
+    assert format_float_list(values) == [repr(float(v)) for v in values]
+
+
+@pytest.mark.benchmark
+def test_array_conversion_is_faster_than_element_by_element():
+    values = numpy.random.default_rng(0).random(1_000_000)
+
+    element_by_element = best_time(lambda: [float(v) for v in values], repeat=3)
+    vectorized = best_time(lambda: to_float_list(values), repeat=3)
+
+    assert vectorized < element_by_element, (element_by_element, vectorized)
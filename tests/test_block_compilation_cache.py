@@ -0,0 +1,157 @@
+import json
+import pathlib
+
+import pytest
+import yaml
+
+from pysyslink_toolkit.BlockCompilationCache import BlockCompilationCache
+from pysyslink_toolkit.HighLevelBlock import HighLevelBlock
+from pysyslink_toolkit.LowLevelBlockStructure import LowLevelBlock
+from pysyslink_toolkit.PortType import PortType
+from pysyslink_toolkit.ToolkitSession import ToolkitSession
+from pysyslink_toolkit.block_libraries.BlockTypeRegistry import BlockTypeRegistry
+from pysyslink_toolkit.block_libraries.ParseBlockLibraries import load_block_library_plugins_from_paths
+from pysyslink_toolkit.compile_system import compile_high_level_block, serialize_block
+from conftest import best_time
+
+
+def _gain_chain(system_builder, n_gains, gain_values=None):
+    gain_values = gain_values or {}
+    blocks = [system_builder.block("const", "Constant", {"Value": {"type": "double", "value": 1.0}}, outputs=1)]
+    blocks += [
+        system_builder.block(f"gain{i}", "Gain", {"Gain": {"type": "double", "value": gain_values.get(i, 2.0)}},
+                             inputs=1, outputs=1)
+        for i in range(n_gains)
+    ]
+    blocks.append(system_builder.block("display", "Display", inputs=1))
+    links = [
+        system_builder.link(f"l{i}", a["id"], 0, [(b["id"], 0)]) for i, (a, b) in enumerate(zip(blocks, blocks[1:]))
+    ]
+    return system_builder.write(blocks, links)
+
+
+def _gain_block(block_id, value):
+    port_type = PortType()
+    return HighLevelBlock(block_id, block_id, 1, [port_type], 1, [port_type], "core_BasicBlocks", "Gain",
+                          {"Gain": {"type": "double", "value": value}})
+
+
+def _registry(core_plugin_dir):
+    return BlockTypeRegistry(load_block_library_plugins_from_paths([core_plugin_dir]))
+
+
+def test_recompiling_after_an_edit_only_compiles_the_changed_block(system_builder, tmp_path):
+    session = ToolkitSession(system_builder.toolkit_config_path)
+    cache = BlockCompilationCache.get_default()
+    output_path = str(tmp_path / "out.yaml")
+
+    pslk_path = _gain_chain(system_builder, 20)
+    session.compile_system(pslk_path, output_path)
+    assert cache.stats() == {"hits": 0, "disk_hits": 0, "misses": 22, "uncacheable": 0}
+
+    cache.reset_stats()
+    _gain_chain(system_builder, 20, {7: 5.0})
+    session.compile_system(pslk_path, output_path)
+    assert cache.stats() == {"hits": 21, "disk_hits": 0, "misses": 1, "uncacheable": 0}
+
+    with open(output_path) as f:
+        blocks = {block["Id[string]"]: block for block in yaml.safe_load(f)["Blocks"]}
+    assert blocks["gain7"]["Gain[double]"] == 5.0
+    assert blocks["gain6"]["Gain[double]"] == 2.0
+
+
+def test_output_does_not_depend_on_the_cache(system_builder, tmp_path):
+    pslk_path = _gain_chain(system_builder, 5)
+    session = ToolkitSession(system_builder.toolkit_config_path)
+    session.compile_system(pslk_path, str(tmp_path / "cold.yaml"))
+    session.compile_system(pslk_path, str(tmp_path / "warm.yaml"))
+
+    with open(tmp_path / "cold.yaml") as cold, open(tmp_path / "warm.yaml") as warm:
+        assert cold.read() == warm.read()
+
+
+def test_plugin_changes_invalidate_entries(core_plugin_dir):
+    cache = BlockCompilationCache()
+    block = _gain_block("gain", 2.0)
+    compile_high_level_block(block, _registry(core_plugin_dir), cache)
+
+    compile_high_level_block(block, _registry(core_plugin_dir), cache)
+    assert cache.hits == 1
+
+    plugin_file = next(pathlib.Path(core_plugin_dir).rglob("*.pslkblp.yaml"))
+    plugin_file.write_text(plugin_file.read_text() + "\n# edited\n")
+    compile_high_level_block(block, _registry(core_plugin_dir), cache)
+    assert cache.misses == 2
+
+
+def test_disk_entries_are_shared_between_caches(core_plugin_dir, tmp_path):
+    block = _gain_block("gain", 2.0)
+    first = BlockCompilationCache(str(tmp_path / "block_cache"))
+    compiled = compile_high_level_block(block, _registry(core_plugin_dir), first)
+
+    second = BlockCompilationCache(str(tmp_path / "block_cache"))
+    cached = compile_high_level_block(_gain_block("gain", 2.0), _registry(core_plugin_dir), second)
+
+    assert second.stats() == {"hits": 0, "disk_hits": 1, "misses": 0, "uncacheable": 0}
+    assert cached.blocks[0].to_dict() == compiled.blocks[0].to_dict()
+    assert cached.port_map == compiled.port_map
+
+
+def test_unpicklable_properties_are_compiled_every_time(core_plugin_dir):
+    cache = BlockCompilationCache()
+    registry = _registry(core_plugin_dir)
+    block = _gain_block("gain", 2.0)
+    block.properties["Gain"]["unused"] = lambda: None
+
+    compile_high_level_block(block, registry, cache)
+    compile_high_level_block(block, registry, cache)
+
+    assert cache.stats() == {"hits": 0, "disk_hits": 0, "misses": 0, "uncacheable": 2}
+    assert len(cache) == 0
+
+
+def test_port_type_reprs_are_bounded(core_plugin_dir, monkeypatch):
+    monkeypatch.setattr(BlockCompilationCache, "MAX_PORT_TYPE_REPRS", 4)
+    registry = _registry(core_plugin_dir)
+    cache = BlockCompilationCache()
+
+    for i in range(10):
+        port_type = PortType(other_type_name=f"Type{i}").interned()
+        block = HighLevelBlock(f"gain{i}", "gain", 1, [port_type], 1, [port_type], "core_BasicBlocks", "Gain",
+                               {"Gain": {"type": "double", "value": 2.0}})
+        compile_high_level_block(block, registry, cache)
+        assert len(cache._port_type_reprs) <= 4
+
+    compile_high_level_block(block, registry, cache)
+    assert cache.stats()["hits"] == 1
+
+
+def test_serialize_block_leaves_the_block_unchanged():
+    properties = {"Gains": {"type": "double[]", "value": [1, 2]}}
+    block = LowLevelBlock("b", "b", "BasicCpp", "BasicBlocks/Adder", 2, [], 1, [], properties=properties)
+
+    assert serialize_block(block)["properties"]["Gains"]["value"] == ["1.0", "2.0"]
+    assert json.dumps(block.extra) == json.dumps({"properties": {"Gains": {"type": "double[]", "value": [1, 2]}}})
+
+
+@pytest.mark.benchmark
+def test_warm_block_compilation_is_faster(core_plugin_dir):
+    registry = _registry(core_plugin_dir)
+    port_type = PortType().interned()
+    blocks = [
+        HighLevelBlock(f"adder{i}", f"adder{i}", 8, [port_type] * 8, 1, [port_type], "core_BasicBlocks", "Adder",
+                       {"Gains": {"type": "double[]", "value": [float(i)] * 8}})
+        for i in range(5000)
+    ]
+    cache = BlockCompilationCache()
+    for block in blocks:
+        compile_high_level_block(block, registry, cache)
+
+    def compile_all(compilation_cache):
+        for block in blocks:
+            compile_high_level_block(block, registry, compilation_cache)
+
+    uncached = best_time(lambda: compile_all(None), repeat=3)
+    warm = best_time(lambda: compile_all(cache), repeat=3)
+
+    assert warm < uncached, (uncached, warm)
@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+from pysyslink_toolkit.BlockCompilationCache import BlockCompilationCache
+from pysyslink_toolkit.block_libraries.BlockTypeRegistry import BlockTypeRegistry
+from pysyslink_toolkit.block_libraries.ParseBlockLibraries import load_block_library_plugins_from_paths
+from pysyslink_toolkit.compile_system import compile_high_level_block
+from pysyslink_toolkit.HighLevelBlock import HighLevelBlock
+
+
+def _gain_block():
+    return HighLevelBlock.from_dict({
+        "id": "gain1",
+        "label": "Gain",
+        "inputPorts": 1,
+        "outputPorts": 1,
+        "inputPortTypes": [{"port_category": "FullySupportedSignalValue", "signal_value_type": "double"}],
+        "outputPortTypes": [{"port_category": "FullySupportedSignalValue", "signal_value_type": "double"}],
+        "blockLibrary": "core_BasicBlocks",
+        "blockType": "Gain",
+        "properties": {"Gain": {"type": "float", "value": 2}},
+    }, {})
+
+
+@pytest.fixture
+def plugins(core_plugin_dir, test_plugins_dir):
+    return load_block_library_plugins_from_paths([core_plugin_dir, test_plugins_dir])
+
+
+def test_lookup_returns_owning_plugin_and_config(plugins):
+    registry = BlockTypeRegistry(plugins)
+
+    plugin, block_type_config = registry.lookup("core_BasicBlocks", "Adder")
+    assert plugin.block_library_plugin_config.pluginName == "basic_blocks_plugin"
+    assert block_type_config.name == "Adder"
+
+    assert registry.get_plugin("neuron_library", "neuron").block_library_plugin_config.pluginName == "neuron_plugin"
+    assert registry.lookup("core_BasicBlocks", "Unknown") is None
+    assert ("scope_library", "scope") in registry
+
+
+@pytest.fixture
+def duplicate_plugin(core_plugin_dir, tmp_path):
+    duplicate_dir = tmp_path / "duplicate"
+    duplicate_dir.mkdir()
+    with open(os.path.join(core_plugin_dir, "basic_blocks", "basic_blocks.pslkblp.yaml")) as f:
+        content = f.read()
+    (duplicate_dir / "duplicate.pslkblp.yaml").write_text(content.replace("basic_blocks_plugin", "duplicate_plugin"))
+    duplicate_plugins = load_block_library_plugins_from_paths([str(duplicate_dir)])
+    return next(p for p in duplicate_plugins if p.block_library_plugin_config.pluginName == "duplicate_plugin")
+
+
+def test_duplicate_registration_is_reported_and_first_plugin_wins(plugins, duplicate_plugin):
+    registry = BlockTypeRegistry(plugins + [duplicate_plugin])
+
+    assert len(registry.duplicates) == 4
+    assert registry.get_plugin("core_BasicBlocks", "Gain").block_library_plugin_config.pluginName == "basic_blocks_plugin"
+    assert [p.block_library_plugin_config.pluginName for p in registry.get_plugins("core_BasicBlocks", "Gain")] == [
+        "basic_blocks_plugin", "duplicate_plugin",
+    ]
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_compile_falls_back_to_the_next_plugin_registering_the_type(plugins, duplicate_plugin, monkeypatch, cached):
+    registry = BlockTypeRegistry(plugins + [duplicate_plugin])
+    first = registry.get_plugin("core_BasicBlocks", "Gain")
+
+    def hand_off(block):
+        raise NotImplementedError("handled by another plugin")
+
+    monkeypatch.setattr(first, "compile_block", hand_off)
+    compiled_by = []
+    compile_block = duplicate_plugin.compile_block
+    monkeypatch.setattr(duplicate_plugin, "compile_block", lambda block: compiled_by.append(block.id) or compile_block(block))
+
+    struct = compile_high_level_block(_gain_block(), registry, BlockCompilationCache() if cached else None)
+
+    assert compiled_by == ["gain1"]
+    assert struct.blocks[0].extra == {"Gain[double]": 2.0}
+    monkeypatch.setattr(duplicate_plugin, "compile_block", hand_off)
+    with pytest.raises(RuntimeError, match="No plugin could compile block"):
+        compile_high_level_block(_gain_block(), registry)
+
+
+def test_compile_dispatches_only_to_owning_plugin(plugins, monkeypatch):
+    registry = BlockTypeRegistry(plugins)
+    for plugin in plugins:
+        if plugin.block_library_plugin_config.pluginName != "basic_blocks_plugin":
+            monkeypatch.setattr(plugin, "compile_block", lambda block: pytest.fail("probed a plugin not owning the block"))
+
+    struct = compile_high_level_block(_gain_block(), registry)
+
+    assert struct.blocks[0].extra == {"Gain[double]": 2.0}
+
+
+def test_unknown_block_type_raises(plugins):
+    block = HighLevelBlock("b", "b", 0, [], 0, [], "nowhere_library", "nothing", {})
+    with pytest.raises(RuntimeError, match="No plugin could compile block"):
+        compile_high_level_block(block, BlockTypeRegistry(plugins))
@@ -0,0 +1,70 @@
+import copy
+import tracemalloc
+
+from pysyslink_toolkit.block_libraries.ParseBlockLibraries import _normalize_plugin_dict, _solve_block_library_config_common_blocks
+from pysyslink_toolkit.block_libraries.PluginConfigFromDict import plugin_config_from_dict
+
+N_BLOCKS = 2000
+
+
+def _large_plugin_config(n_blocks=N_BLOCKS, n_values=20):
+    double_port = {"port_category": "FullySupportedSignalValue", "signal_value_type": "double"}
+    common_block = {
+        "name": "base",
+        "configurationValues": [
+            {"name": f"P{i}", "defaultValue": [1.0] * 8, "type": "double[]", "metadata": {"doc": "x" * 64}}
+            for i in range(n_values)
+        ],
+        "metadata": {f"key{i}": "v" * 32 for i in range(n_values)},
+        "inputPortTypes": {"all": double_port},
+        "outputPortTypes": {"all": double_port},
+    }
+    block_types = [
+        {
+            "name": f"Block{i}",
+            "commonBlock": "base",
+            "inputPortNumber": 1,
+            "outputPortNumber": 1,
+            "configurationValues": [{"name": "Own", "defaultValue": 1.0, "type": "double"}],
+        }
+        for i in range(n_blocks)
+    ]
+    return plugin_config_from_dict(_normalize_plugin_dict({
+        "pluginName": "large_plugin",
+        "pluginType": "coreBlockLibrary",
+        "blockType": "BasicCpp",
+        "commonBlocks": [common_block],
+        "blockLibraries": [{"name": "Large", "blockTypes": block_types}],
+    }))
+
+
+def _allocated_bytes(function, *args):
+    tracemalloc.start()
+    try:
+        result = function(*args)
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, allocated
+
+
+def test_resolved_blocks_share_common_block_data():
+    resolved = _solve_block_library_config_common_blocks(_large_plugin_config(n_blocks=3))
+    base = resolved.commonBlocks[0]
+    first, second = resolved.blockLibraries[0].blockTypes[:2]
+
+    assert first.configurationValues["P0"] is base.configurationValues["P0"]
+    assert first.configurationValues.keys() == set(base.configurationValues) | {"Own"}
+    assert first.metadata is base.metadata
+    assert first.inputPortTypes is second.inputPortTypes
+    assert first.get_port_types({})[0][0].signal_value_type.value == "double"
+
+
+def test_memory_does_not_grow_with_blocks_times_base_size():
+    plugin_config = _large_plugin_config()
+    _, base_size = _allocated_bytes(copy.deepcopy, plugin_config.commonBlocks[0])
+
+    resolved, allocated = _allocated_bytes(_solve_block_library_config_common_blocks, plugin_config)
+
+    assert len(resolved.blockLibraries[0].blockTypes) == N_BLOCKS
+    assert allocated < N_BLOCKS * base_size / 5
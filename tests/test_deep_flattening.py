@@ -0,0 +1,66 @@
+import inspect
+import sys
+
+import pytest
+
+from conftest import SystemBuilder, best_time
+
+from pysyslink_toolkit.HighLevelSystem import HighLevelSystem
+
+
+def _port_block(block_id, block_type, index):
+    return SystemBuilder.block(
+        block_id, block_type, {"PortIndex": {"type": "int", "value": index}},
+        inputs=int(block_type == "output_port"), outputs=int(block_type == "input_port"),
+        block_library="subsystems_library",
+    )
+
+
+def _nested_system(depth, blocks_per_level):
+    """
+    depth subsystems nested in each other, each one a chain of gains around the next one.
+    """
+    inner = None
+    for level in reversed(range(depth)):
+        blocks = [_port_block("in", "input_port", 0), _port_block("out", "output_port", 0)]
+        blocks += [SystemBuilder.block(f"g{i}", "Gain", inputs=1, outputs=1) for i in range(blocks_per_level)]
+        chain = ["in"] + [f"g{i}" for i in range(blocks_per_level)] + (["sub"] if inner else []) + ["out"]
+        links = [SystemBuilder.link(f"l{i}", a, 0, [(b, 0)]) for i, (a, b) in enumerate(zip(chain, chain[1:]))]
+        inner = SystemBuilder.subsystem("sub", blocks, links, [inner] if inner else [], inputs=1, outputs=1)
+
+    return SystemBuilder.system_json(
+        [SystemBuilder.block("const", "Constant", outputs=1), SystemBuilder.block("display", "Display", inputs=1)],
+        [SystemBuilder.link("top0", "const", 0, [("sub", 0)]), SystemBuilder.link("top1", "sub", 0, [("display", 0)])],
+        [inner],
+    )
+
+
+def test_deep_hierarchy_is_flattened_without_recursion():
+    # Parsing still recurses, only flattening is run with a few dozen frames to spare
+    system = HighLevelSystem.from_dict(_nested_system(150, 2), {}, load_geometry=False)
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(len(inspect.stack(0)) + 50)
+    try:
+        flat = system.flattened()
+    finally:
+        sys.setrecursionlimit(limit)
+
+    deepest = "_".join(["sub"] * 150)
+    assert len(flat.blocks) == 2 + 150 * 2
+    assert flat.blocks[-1].id == f"{deepest}_g1"
+    sources = {l.source_id: [t.target_id for t in l.target_nodes.values()] for l in flat.links}
+    assert sources["const"] == ["sub_g0"]
+    assert sources[f"{deepest}_g1"] == ["display"]
+    assert sources[f"{deepest}_g0"] == [f"{deepest}_g1"]
+    assert list(flat.links[-1].target_nodes) == [f"{deepest}_l1_seg0"]
+
+
+@pytest.mark.benchmark
+def test_depth_does_not_add_to_flattening_time():
+    times = {}
+    for depth, blocks_per_level in ((50, 200), (200, 50)):
+        system = HighLevelSystem.from_dict(_nested_system(depth, blocks_per_level), {}, load_geometry=False)
+        times[depth] = best_time(system.flattened)
+
+    # Same blocks and links, 4x the depth: about the same time, rescanning every level would be 4x
+    assert times[200] < 2.5 * times[50], times
@@ -0,0 +1,102 @@
+import gc
+import weakref
+
+import pytest
+
+from pysyslink_toolkit.HighLevelBlock import HighLevelBlock
+from pysyslink_toolkit.expression_evaluation import compile_expression, evaluate_expression
+from conftest import best_time
+
+
+@pytest.fixture
+def namespace():
+    return {"Kp": 2.5, "a": 1, "b": 2, "c": 3, "gains": [1.0, 2.0]}
+
+
+@pytest.mark.parametrize("source", ["Kp", "[a, b, c]", "Kp * 2 + a", "  (1, 2.5, -3)", "[1, 2]", "gains", "max(a, b)"])
+def test_same_result_as_eval(source, namespace):
+    results = {}
+    for _ in range(2):
+        assert evaluate_expression(source, namespace, results) == eval(source, dict(namespace), dict(namespace))
+
+
+def test_mutable_results_are_not_shared(namespace):
+    results = {}
+    first = evaluate_expression("[a, b, c]", namespace, results)
+    second = evaluate_expression("[a, b, c]", namespace, results)
+    literal = evaluate_expression("[1, 2]", namespace, results)
+
+    assert first == second and first is not second
+    assert literal is not evaluate_expression("[1, 2]", namespace, results)
+    assert evaluate_expression("gains", namespace, results) is namespace["gains"]
+
+
+def test_rebound_parameter_is_seen(namespace):
+    results = {}
+    assert evaluate_expression("Kp * 2", namespace, results) == 5.0
+    namespace["Kp"] = 4.0
+    assert evaluate_expression("Kp * 2", namespace, results) == 8.0
+    assert evaluate_expression("Kp * 2", {"Kp": 1}) == 2
+
+
+def test_namespaces_are_not_kept_alive():
+    class Namespace(dict):
+        pass
+
+    namespace = Namespace(Kp=2.0, a=1, b=2, c=3)
+    reference = weakref.ref(namespace)
+    HighLevelBlock.from_dict(_block_data(0, "Kp * 2"), namespace, {})
+    del namespace
+    gc.collect()
+
+    assert reference() is None
+
+
+def test_constant_folding_and_compile_cache():
+    compiled = compile_expression("(1 + 2, -0.5)")
+    assert compiled.has_constant and compiled.constant == (3, -0.5)
+    assert compile_expression("(1 + 2, -0.5)") is compiled
+    assert compile_expression("Kp").names == ("Kp",)
+    assert compile_expression("f(Kp)").names is None
+
+
+@pytest.mark.parametrize("source", ["1 +", "undefined_name", "1 / 0"])
+def test_same_errors_as_eval(source):
+    with pytest.raises(Exception) as expected:
+        eval(source, {}, {})
+    with pytest.raises(type(expected.value)) as actual:
+        evaluate_expression(source, {})
+
+    assert str(actual.value) == str(expected.value)
+
+
+def _block_data(i, expression):
+    return {
+        "id": f"gain{i}",
+        "label": "Gain",
+        "inputPorts": 1,
+        "outputPorts": 1,
+        "inputPortTypes": [],
+        "outputPortTypes": [],
+        "blockLibrary": "core_BasicBlocks",
+        "blockType": "Gain",
+        "properties": {"Gain": {"type": "float", "value": expression}, "Gains": {"type": "float[]", "value": "[a, b, c]"}},
+    }
+
+
+def test_block_properties_are_evaluated(namespace):
+    blocks = [HighLevelBlock.from_dict(_block_data(i, ["Kp", "Kp * 2 + a", "0.5"][i % 3]), namespace) for i in range(6)]
+
+    assert [b.properties["Gain"]["value"] for b in blocks[:3]] == [2.5, 6.0, 0.5]
+    assert blocks[0].properties["Gains"]["value"] is not blocks[1].properties["Gains"]["value"]
+
+
+@pytest.mark.benchmark
+def test_reused_results_are_faster_than_eval(namespace):
+    expressions = ["Kp", "Kp * 2 + a", "0.5", "[a, b, c]"]
+    sources = [expressions[i % len(expressions)] for i in range(20000)]
+
+    eval_time = best_time(lambda: [eval(source, namespace, namespace) for source in sources])
+    cached_time = best_time(lambda: [evaluate_expression(source, namespace, {}) for source in sources])
+
+    assert cached_time < eval_time, (eval_time, cached_time)
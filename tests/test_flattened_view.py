@@ -0,0 +1,76 @@
+import json
+
+from conftest import INHERITED_PORT_TYPE, SystemBuilder
+
+from pysyslink_toolkit.HighLevelSystem import HighLevelSystem
+from pysyslink_toolkit.PortType import PortCategory
+
+
+def _port_block(block_id, block_type, index):
+    return SystemBuilder.block(
+        block_id, block_type, {"PortIndex": {"type": "int", "value": index}},
+        inputs=int(block_type == "output_port"), outputs=int(block_type == "input_port"),
+        block_library="subsystems_library", input_type=INHERITED_PORT_TYPE, output_type=INHERITED_PORT_TYPE,
+    )
+
+
+def _system_json():
+    inner = SystemBuilder.subsystem(
+        "sub1",
+        [
+            _port_block("in1", "input_port", 0),
+            SystemBuilder.block("gain1", "Gain", inputs=1, outputs=1, input_type=INHERITED_PORT_TYPE, output_type=INHERITED_PORT_TYPE),
+            _port_block("out1", "output_port", 0),
+        ],
+        [
+            SystemBuilder.link("l_in", "in1", 0, [("gain1", 0)]),
+            SystemBuilder.link("l_out", "gain1", 0, [("out1", 0)]),
+        ],
+        inputs=1, outputs=1,
+    )
+    return SystemBuilder.system_json(
+        [
+            SystemBuilder.block("const1", "Constant", outputs=1),
+            SystemBuilder.block("display1", "Display", inputs=1),
+        ],
+        [
+            SystemBuilder.link("l1", "const1", 0, [("sub1", 0)]),
+            SystemBuilder.link("l2", "sub1", 0, [("display1", 0)]),
+        ],
+        [inner],
+    )
+
+
+def _dump(system):
+    return json.dumps(system.to_dict(), default=str, sort_keys=True)
+
+
+def test_flattened_leaves_the_system_unchanged():
+    system = HighLevelSystem.from_dict(_system_json(), {})
+    before = _dump(system)
+
+    views = [system.flattened() for _ in range(2)]
+    for view in views:
+        view.propagate_and_validate_port_types()
+
+    assert _dump(system) == before
+    assert _dump(views[0]) == _dump(views[1])
+    gain = next(b for b in views[0].blocks if b.id == "sub1_gain1")
+    assert gain.input_port_types[0].port_category == PortCategory.fully_supported_signal_value
+    assert system.subsystems[0].json_data.blocks[1].input_port_types[0].port_category == PortCategory.inherited
+
+
+def test_flattened_matches_flatten_subsystems_and_shares_blocks():
+    system = HighLevelSystem.from_dict(_system_json(), {})
+    view = system.flattened()
+
+    assert view.subsystems == [] and len(system.subsystems) == 1
+    assert view.blocks[0] is system.blocks[0]
+    assert view.blocks[2].properties is system.subsystems[0].json_data.blocks[1].properties
+
+    in_place = HighLevelSystem.from_dict(_system_json(), {})
+    in_place.flatten_subsystems()
+    assert _dump(view) == _dump(in_place)
+    assert [(l.source_id, list(l.target_nodes)) for l in view.links] == [
+        ("const1", ["sub1_l_in_seg0"]), ("sub1_gain1", ["l2_seg0"]),
+    ]
@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+from conftest import SystemBuilder
+
+from pysyslink_toolkit.HighLevelSystem import HighLevelSystem
+
+
+def _port_block(block_id, block_type, index):
+    return SystemBuilder.block(
+        block_id, block_type, {"PortIndex": {"type": "int", "value": index}},
+        inputs=int(block_type == "output_port"), outputs=int(block_type == "input_port"),
+        block_library="subsystems_library",
+    )
+
+
+def _chain_subsystem(subsystem_id, n_blocks):
+    blocks = [_port_block("in", "input_port", 0), _port_block("out", "output_port", 0)]
+    links = []
+    previous = "in"
+    for i in range(n_blocks):
+        blocks.append(SystemBuilder.block(f"g{i}", "Gain", inputs=1, outputs=1))
+        links.append(SystemBuilder.link(f"l{i}", previous, 0, [(f"g{i}", 0)]))
+        previous = f"g{i}"
+    links.append(SystemBuilder.link("l_out", previous, 0, [("out", 0)]))
+    return SystemBuilder.subsystem(subsystem_id, blocks, links, inputs=1, outputs=1)
+
+
+def _system(n_subsystems, blocks_per_subsystem):
+    """
+    A constant feeding a chain of n_subsystems subsystems, each a chain of gains, ending in a display.
+    """
+    blocks = [
+        SystemBuilder.block("const", "Constant", outputs=1),
+        SystemBuilder.block("display", "Display", inputs=1),
+    ]
+    subsystems = [_chain_subsystem(f"sub{i}", blocks_per_subsystem) for i in range(n_subsystems)]
+    chain = ["const"] + [f"sub{i}" for i in range(n_subsystems)] + ["display"]
+    links = [SystemBuilder.link(f"top{i}", source, 0, [(target, 0)]) for i, (source, target) in enumerate(zip(chain, chain[1:]))]
+    return SystemBuilder.system_json(blocks, links, subsystems)
+
+
+def _flatten_time(n_subsystems, blocks_per_subsystem):
+    system = HighLevelSystem.from_dict(_system(n_subsystems, blocks_per_subsystem), {}, load_geometry=False)
+    start = time.perf_counter()
+    system.flatten_subsystems()
+    elapsed = time.perf_counter() - start
+    return system, elapsed
+
+
+def test_flattened_chain_is_connected():
+    system, _ = _flatten_time(3, 2)
+
+    assert [b.id for b in system.blocks] == ["const", "display"] + [f"sub{i}_g{j}" for i in range(3) for j in range(2)]
+    assert [(l.source_id, [t.target_id for t in l.target_nodes.values()]) for l in system.links] == [
+        ("const", ["sub0_g0"]), ("sub0_g1", ["sub1_g0"]), ("sub1_g1", ["sub2_g0"]), ("sub2_g1", ["display"]),
+        ("sub0_g0", ["sub0_g1"]), ("sub1_g0", ["sub1_g1"]), ("sub2_g0", ["sub2_g1"]),
+    ]
+
+
+def test_every_subsystem_block_is_flattened():
+    system, _ = _flatten_time(40, 25)
+    assert len(system.blocks) == 40 * 25 + 2
+
+
+@pytest.mark.benchmark
+def test_flattening_scales_linearly():
+    # flatten_subsystems changes the system, so each run flattens a new one
+    times = {n_subsystems: min(_flatten_time(n_subsystems, 250)[1] for _ in range(3)) for n_subsystems in (100, 400)}
+
+    # 4x the model, linear time is about 4x, quadratic time 16x
+    assert times[400] < 8 * times[100], times
@@ -0,0 +1,124 @@
+import gc
+import tracemalloc
+
+import pytest
+
+from conftest import SystemBuilder, best_time
+
+from pysyslink_toolkit.HighLevelSystem import HighLevelSystem, SegmentNode
+
+
+def _port_block(block_id, block_type, index):
+    return SystemBuilder.block(
+        block_id, block_type, {"PortIndex": {"type": "int", "value": index}},
+        inputs=int(block_type == "output_port"), outputs=int(block_type == "input_port"),
+        block_library="subsystems_library",
+    )
+
+
+def _system_with_subsystem():
+    inner = SystemBuilder.subsystem(
+        "sub1",
+        [
+            _port_block("in1", "input_port", 0),
+            SystemBuilder.block("gain1", "Gain", {"Gain": {"type": "float", "value": 2}}, inputs=1, outputs=1),
+            SystemBuilder.block("gain2", "Gain", {"Gain": {"type": "float", "value": 3}}, inputs=1, outputs=1),
+            _port_block("out1", "output_port", 0),
+        ],
+        [
+            SystemBuilder.link("l_in", "in1", 0, [("gain1", 0)]),
+            SystemBuilder.link("l_mid", "gain1", 0, [("gain2", 0)]),
+            SystemBuilder.link("l_out", "gain2", 0, [("out1", 0)]),
+        ],
+        inputs=1, outputs=1,
+    )
+    return SystemBuilder.system_json(
+        [
+            SystemBuilder.block("const1", "Constant", {"Value": {"type": "float", "value": 1}}, outputs=1),
+            SystemBuilder.block("display1", "Display", inputs=1),
+        ],
+        [
+            SystemBuilder.link("l1", "const1", 0, [("sub1", 0)]),
+            SystemBuilder.link("l2", "sub1", 0, [("display1", 0)]),
+        ],
+        [inner],
+    )
+
+
+def test_geometry_free_system_reads_the_same_after_flattening():
+    data = _system_with_subsystem()
+    eager = HighLevelSystem.from_dict(data, {})
+    lazy = HighLevelSystem.from_dict(data, {}, load_geometry=False)
+
+    for system in (eager, lazy):
+        system.flatten_subsystems()
+
+    assert [l.target_nodes.keys() for l in lazy.links] == [l.target_nodes.keys() for l in eager.links]
+    assert lazy.to_dict() == eager.to_dict()
+    assert "sub1_l_mid_root" in [l.segment_node.id for l in lazy.links]
+
+
+def test_compiling_does_not_build_segment_trees(system_builder, monkeypatch):
+    from pysyslink_toolkit.ToolkitSession import ToolkitSession
+
+    blocks = [
+        system_builder.block("const1", "Constant", {"Value": {"type": "float", "value": 1}}, outputs=1),
+        system_builder.block("display1", "Display", inputs=1),
+    ]
+    pslk_path = system_builder.write(blocks, [system_builder.link("l1", "const1", 0, [("display1", 0)])])
+    built = []
+    from_dict = SegmentNode.from_dict.__func__
+    monkeypatch.setattr(SegmentNode, "from_dict", classmethod(lambda cls, data: built.append(data) or from_dict(cls, data)))
+
+    ToolkitSession(system_builder.toolkit_config_path).compile_system(pslk_path, str(system_builder.directory / "out.yaml"))
+
+    assert built == []
+    assert "l1_l1_seg0" in (system_builder.directory / "out.yaml").read_text()
+
+
+def _link_heavy_system(n_links, depth):
+    def segments(link_id, level):
+        if level == depth:
+            return []
+        return [
+            {"id": f"{link_id}_s{level}_{i}", "orientation": "Vertical", "xOrY": float(i), "children": segments(link_id, level + 1)}
+            for i in range(2)
+        ]
+
+    links = []
+    for i in range(n_links):
+        link = SystemBuilder.link(f"l{i}", f"b{i}", 0, [(f"b{i + 1}", 0)])
+        link["segmentNode"]["children"] = segments(f"l{i}", 0)
+        links.append(link)
+    return SystemBuilder.system_json([], links)
+
+
+def _load(data, load_geometry):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        system = HighLevelSystem.from_dict(data, {}, load_geometry=load_geometry)
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return system, size
+
+
+def test_geometry_free_loading_uses_less_memory():
+    data = _link_heavy_system(2000, 4)
+
+    eager, eager_size = _load(data, True)
+    lazy, lazy_size = _load(data, False)
+
+    assert lazy_size < eager_size / 3
+    assert lazy.links[5].to_dict() == eager.links[5].to_dict()
+
+
+@pytest.mark.benchmark
+def test_geometry_free_loading_is_faster():
+    data = _link_heavy_system(2000, 4)
+
+    eager_time = best_time(lambda: HighLevelSystem.from_dict(data, {}, load_geometry=True), repeat=3)
+    lazy_time = best_time(lambda: HighLevelSystem.from_dict(data, {}, load_geometry=False), repeat=3)
+
+    assert lazy_time < eager_time / 2, (eager_time, lazy_time)
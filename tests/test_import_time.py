@@ -0,0 +1,47 @@
+import os
+import re
+import subprocess
+import sys
+import textwrap
+
+# Cumulative import time budget of the top-level package, in milliseconds. Around 50 ms here
+# once the light model classes are loaded, the budget leaves room for slower machines
+IMPORT_BUDGET_MS = float(os.environ.get("PYSYSLINK_TOOLKIT_IMPORT_BUDGET_MS", "150"))
+
+HEAVY_MODULES = ("yaml", "dacite", "numpy", "matplotlib", "mpld3", "asyncio")
+
+
+def _package_import_time_ms() -> float:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import pysyslink_toolkit"],
+        capture_output=True, text=True, check=True,
+    )
+    for line in completed.stderr.splitlines():
+        match = re.match(r"import time:\s*\d+\s*\|\s*(\d+)\s*\|\s?pysyslink_toolkit$", line)
+        if match:
+            return int(match.group(1)) / 1000.0
+    raise AssertionError("pysyslink_toolkit not found in -X importtime output:\n" + completed.stderr)
+
+
+def test_cold_import_within_budget():
+    # Best of a few runs, the first one may pay for writing the bytecode caches
+    import_time_ms = min(_package_import_time_ms() for _ in range(3))
+
+    assert import_time_ms <= IMPORT_BUDGET_MS, (
+        f"import pysyslink_toolkit took {import_time_ms:.1f} ms, budget is {IMPORT_BUDGET_MS:.0f} ms"
+    )
+
+
+def test_heavy_modules_are_loaded_on_first_use():
+    script = textwrap.dedent(f"""
+        import sys
+        import pysyslink_toolkit
+        import pysyslink_toolkit.cli
+        print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))
+        pysyslink_toolkit.load_block_library_plugins_from_paths
+        print("yaml" in sys.modules, "dacite" in sys.modules)
+    """)
+
+    completed = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+
+    assert completed.stdout.splitlines() == ["", "True True"]
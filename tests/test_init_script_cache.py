@@ -0,0 +1,154 @@
+import os
+import runpy
+import sys
+import time
+
+import pytest
+
+from pysyslink_toolkit.InitScriptCache import InitScriptCache
+
+SCRIPT = """\
+import math
+import os
+import sys
+sys.path.insert(0, os.path.dirname(__file__))
+import {helper} as helper
+
+table = helper.read_table(os.path.join(os.path.dirname(__file__), "table.csv"))
+
+gain = helper.SCALE * math.sqrt(4.0)
+"""
+
+HELPER = """\
+SCALE = {scale}
+
+def read_table(path):
+    with open(path) as f:
+        return [float(x) for x in f.read().split(",")]
+"""
+
+
+@pytest.fixture
+def script(tmp_path, request):
+    # A module name of its own per test, sys.modules outlives the test
+    helper = "init_helper_" + request.node.name.replace("[", "_").replace("]", "_")
+    (tmp_path / f"{helper}.py").write_text(HELPER.format(scale=1.0))
+    (tmp_path / "table.csv").write_text("1,2,3")
+    script_path = tmp_path / "init.py"
+    script_path.write_text(SCRIPT.format(helper=helper))
+    yield str(script_path)
+    sys.modules.pop(helper, None)
+    if str(tmp_path) in sys.path:
+        sys.path.remove(str(tmp_path))
+
+
+class CountingRun:
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+
+    def __call__(self):
+        self.count += 1
+        return runpy.run_path(self.path, init_globals={})
+
+
+def _rewrite(path, content):
+    with open(path, "w") as f:
+        f.write(content)
+    later = time.time() + 5
+    os.utime(path, (later, later))
+
+
+def test_unchanged_script_does_not_run_again(script):
+    cache = InitScriptCache()
+    run = CountingRun(script)
+
+    first = cache.get_or_run(script, run)
+    os.utime(script, (time.time() + 5, time.time() + 5))  # Touched, same contents
+    second = cache.get_or_run(script, run)
+
+    assert run.count == 1
+    assert second is first
+    assert first["table"] == [1.0, 2.0, 3.0] and first["gain"] == 2.0
+
+
+def test_opened_file_change_runs_again(script, tmp_path):
+    cache = InitScriptCache()
+    run = CountingRun(script)
+    cache.get_or_run(script, run)
+
+    _rewrite(tmp_path / "table.csv", "4,5")
+
+    assert cache.get_or_run(script, run)["table"] == [4.0, 5.0]
+    assert run.count == 2
+
+
+def test_imported_module_change_runs_again_with_new_code(script, tmp_path):
+    cache = InitScriptCache()
+    run = CountingRun(script)
+    cache.get_or_run(script, run)
+    helper_path = next(tmp_path.glob("init_helper_*.py"))
+
+    _rewrite(helper_path, HELPER.format(scale=10.0))
+
+    assert cache.get_or_run(script, run)["gain"] == 20.0
+    assert run.count == 2
+
+
+def test_transitively_imported_module_change_runs_again_with_new_code(tmp_path, request):
+    # init.py imports mylib, which imports K from helper
+    suffix = request.node.name
+    mylib, helper = f"mylib_{suffix}", f"helper_{suffix}"
+    (tmp_path / f"{mylib}.py").write_text(f"from {helper} import K\n")
+    helper_path = tmp_path / f"{helper}.py"
+    helper_path.write_text("K = 1\n")
+    script_path = tmp_path / "init.py"
+    script_path.write_text(
+        f"import os, sys\nsys.path.insert(0, os.path.dirname(__file__))\nimport {mylib}\nk = {mylib}.K\n"
+    )
+    cache = InitScriptCache()
+    run = CountingRun(str(script_path))
+    try:
+        assert cache.get_or_run(str(script_path), run)["k"] == 1
+
+        _rewrite(helper_path, "K = 2\n")
+        assert cache.get_or_run(str(script_path), run)["k"] == 2
+
+        # helper is still a dependency of the entry of the second run
+        _rewrite(helper_path, "K = 3\n")
+        assert cache.get_or_run(str(script_path), run)["k"] == 3
+        assert run.count == 3
+    finally:
+        sys.modules.pop(mylib, None)
+        sys.modules.pop(helper, None)
+        while str(tmp_path) in sys.path:
+            sys.path.remove(str(tmp_path))
+
+
+def test_disk_cache_is_shared_between_processes(script, tmp_path):
+    disk_cache_dir = str(tmp_path / "disk_cache")
+    run = CountingRun(script)
+    InitScriptCache(disk_cache_dir).get_or_run(script, run)
+
+    # A new cache stands for a new process
+    namespace = InitScriptCache(disk_cache_dir).get_or_run(script, run)
+
+    assert run.count == 1
+    assert namespace["gain"] == 2.0 and namespace["table"] == [1.0, 2.0, 3.0]
+    assert namespace["math"] is sys.modules["math"]
+    assert namespace["__file__"] == script
+
+    _rewrite(tmp_path / "table.csv", "7")
+    assert InitScriptCache(disk_cache_dir).get_or_run(script, run)["table"] == [7.0]
+    assert run.count == 2
+
+
+def test_namespace_with_script_functions_is_not_written_to_disk(tmp_path):
+    script_path = tmp_path / "init_with_function.py"
+    script_path.write_text("def twice(x):\n    return 2 * x\n\nvalue = twice(3)\n")
+    disk_cache_dir = str(tmp_path / "disk_cache")
+    run = CountingRun(str(script_path))
+
+    assert InitScriptCache(disk_cache_dir).get_or_run(str(script_path), run)["value"] == 6
+    assert InitScriptCache(disk_cache_dir).get_or_run(str(script_path), run)["value"] == 6
+    assert run.count == 2
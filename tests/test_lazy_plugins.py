@@ -0,0 +1,61 @@
+import subprocess
+import sys
+import textwrap
+
+from pysyslink_toolkit.block_libraries.LazyBlockLibraryPlugin import LazyBlockLibraryPlugin
+from pysyslink_toolkit.ToolkitSession import ToolkitSession
+from conftest import INHERITED_PORT_TYPE
+
+
+def _lazy_plugins(session):
+    return {
+        plugin.block_library_plugin_config.pluginName: plugin
+        for plugin in session.get_block_library_plugins()
+        if isinstance(plugin, LazyBlockLibraryPlugin)
+    }
+
+
+def _scope_system(system_builder):
+    blocks = [
+        system_builder.block("const1", "Constant", {"Value": {"type": "float", "value": 1}}, outputs=1),
+        system_builder.block("scope1", "scope", inputs=1, block_library="scope_library", input_type=INHERITED_PORT_TYPE),
+    ]
+    links = [system_builder.link("l1", "const1", 0, [("scope1", 0)])]
+    return system_builder.write(blocks, links)
+
+
+def test_plugins_are_registered_without_importing_modules(system_builder):
+    session = ToolkitSession(system_builder.toolkit_config_path)
+
+    lazy_plugins = _lazy_plugins(session)
+
+    assert {"scope_plugin", "subsystems_plugin", "neuron_plugin", "dummy_plugin"} <= set(lazy_plugins)
+    assert not any(plugin.is_loaded for plugin in lazy_plugins.values())
+    assert session.get_block_type_registry().lookup("neuron_library", "neuron") is not None
+
+
+def test_only_used_plugin_modules_are_imported(system_builder, tmp_path):
+    pslk_path = _scope_system(system_builder)
+    session = ToolkitSession(system_builder.toolkit_config_path)
+
+    session.compile_system(pslk_path, str(tmp_path / "out.yaml"))
+
+    lazy_plugins = _lazy_plugins(session)
+    assert lazy_plugins["scope_plugin"].is_loaded
+    assert not lazy_plugins["neuron_plugin"].is_loaded
+    assert not lazy_plugins["dummy_plugin"].is_loaded
+
+
+def test_compile_does_not_import_matplotlib(system_builder, tmp_path):
+    pslk_path = _scope_system(system_builder)
+    script = textwrap.dedent(f"""
+        import sys
+        from pysyslink_toolkit import api
+        result = api.compile_system({system_builder.toolkit_config_path!r}, {pslk_path!r}, {str(tmp_path / "out.yaml")!r})
+        assert result == "success", result
+        print("matplotlib" in sys.modules, "mpld3" in sys.modules)
+    """)
+
+    completed = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+
+    assert completed.stdout.strip().splitlines()[-1] == "False False"
@@ -0,0 +1,70 @@
+import io
+import logging
+
+import pytest
+
+from pysyslink_toolkit.ToolkitSession import ToolkitSession
+from pysyslink_toolkit.compile_system import compile_high_level_system
+from conftest import best_time
+
+
+def _gain_chain(system_builder, n_gains):
+    blocks = [system_builder.block("const", "Constant", {"Value": {"type": "float", "value": 1}}, outputs=1)]
+    blocks += [
+        system_builder.block(f"gain{i}", "Gain", {"Gain": {"type": "float", "value": 2}}, inputs=1, outputs=1)
+        for i in range(n_gains)
+    ]
+    blocks.append(system_builder.block("display", "Display", inputs=1))
+    links = [
+        system_builder.link(f"l{i}", a["id"], 0, [(b["id"], 0)])
+        for i, (a, b) in enumerate(zip(blocks, blocks[1:]))
+    ]
+    return system_builder.write(blocks, links)
+
+
+def test_compile_is_silent_by_default(system_builder, tmp_path, capsys):
+    pslk_path = _gain_chain(system_builder, 3)
+
+    ToolkitSession(system_builder.toolkit_config_path).compile_system(pslk_path, str(tmp_path / "out.yaml"))
+
+    assert capsys.readouterr().out == ""
+
+
+def test_debug_messages_come_from_module_loggers(system_builder, tmp_path, caplog):
+    pslk_path = _gain_chain(system_builder, 3)
+
+    with caplog.at_level(logging.DEBUG, logger="pysyslink_toolkit"):
+        ToolkitSession(system_builder.toolkit_config_path).compile_system(pslk_path, str(tmp_path / "out.yaml"))
+
+    loggers = {record.name for record in caplog.records}
+    assert "pysyslink_toolkit.block_libraries.CoreBlockLibraryPlugin" in loggers
+    assert "pysyslink_toolkit.compile_system" in loggers
+    assert any(record.getMessage() == "Compiling block gain2 of type Gain" for record in caplog.records)
+
+
+@pytest.mark.benchmark
+def test_compile_with_debug_disabled_is_faster(system_builder, tmp_path):
+    session = ToolkitSession(system_builder.toolkit_config_path)
+    system = session.get_high_level_system(_gain_chain(system_builder, 1000), load_geometry=False)
+    registry = session.get_block_type_registry()
+    output_path = str(tmp_path / "out.yaml")
+    package_logger = logging.getLogger("pysyslink_toolkit")
+
+    def compile_system():
+        compile_high_level_system(system, registry, output_path)
+
+    compile_system()
+    disabled_time = best_time(compile_system, repeat=3)
+
+    # Every message formatted and written out, as the print calls used to do
+    handler = logging.StreamHandler(io.StringIO())
+    level = package_logger.level
+    package_logger.addHandler(handler)
+    package_logger.setLevel(logging.DEBUG)
+    try:
+        debug_time = best_time(compile_system, repeat=3)
+    finally:
+        package_logger.removeHandler(handler)
+        package_logger.setLevel(level)
+
+    assert disabled_time < debug_time, (debug_time, disabled_time)
@@ -0,0 +1,128 @@
+import json
+import math
+import random
+
+import pytest
+import yaml
+
+from pysyslink_toolkit.LowLevelBlockStructure import LowLevelBlock, LowLevelLink
+from pysyslink_toolkit.ToolkitSession import ToolkitSession
+from pysyslink_toolkit.compile_system import serialize_block
+from pysyslink_toolkit.low_level_yaml_writer import YAML_DUMPER, write_low_level_system_json, write_low_level_system_yaml
+from conftest import best_time
+
+
+def _entries(n_blocks):
+    blocks = [
+        serialize_block(LowLevelBlock(
+            f"gain{i}", f"Gain {i}", "BasicCpp", "BasicBlocks/Gain", 1, ["double"], 1, ["double"],
+            **{"Gain[double]": i * 0.1, "Steps[int]": i, "Enabled[bool]": i % 2 == 0},
+        ))
+        for i in range(n_blocks)
+    ]
+    links = [
+        LowLevelLink(f"l{i}", f"l{i}", f"gain{i}", 0, f"gain{i + 1}", 0).to_dict() for i in range(n_blocks - 1)
+    ]
+    return blocks, links
+
+
+def _write(path, blocks, links):
+    write_low_level_system_yaml(str(path), iter(blocks), iter(links))
+    return path.read_text()
+
+
+def test_output_is_the_same_as_yaml_dump(tmp_path):
+    rng = random.Random(0)
+    scalars = [
+        "a", "Gain 1", "x" * 90, "word " * 20, "yes", "No", "null", "~", "1.0", "0x1F", "1e5", ".inf", "-", "-a",
+        "a: b", "#c", "' q", "", " a", "a ", "...", "---", "<<", "=", "[1]", "a,b", "é", "a\nb",
+        0, -3, 10**20, 1.0, 1e20, 1e-7, -0.0, math.inf, -math.inf, math.nan, True, False, None,
+    ]
+
+    def value():
+        if rng.random() < 0.2:
+            return [rng.choice(scalars) for _ in range(rng.randint(0, 3))]
+        if rng.random() < 0.05:
+            return {"nested": rng.choice(scalars)}
+        return rng.choice(scalars)
+
+    keys = ["Id[string]", "k", "Gain[double]", "yes", "1", "a b", "k" * 130]
+    blocks = [{rng.choice(keys) + str(i % 3): value() for i in range(rng.randint(0, 6))} for _ in range(300)]
+    _, links = _entries(20)
+
+    for block_list, link_list in [(blocks, links), ([], links), (blocks, []), ([], [])]:
+        expected = yaml.dump({"Blocks": block_list, "Links": link_list}, sort_keys=False)
+        written = _write(tmp_path / "out.yaml", block_list, link_list)
+        assert written == expected
+
+
+def test_compiled_entries_are_formatted_without_yaml_dump(tmp_path, monkeypatch):
+    blocks, links = _entries(50)
+    expected = yaml.dump({"Blocks": blocks, "Links": links}, sort_keys=False)
+    monkeypatch.setattr(yaml, "dump", None)
+
+    assert _write(tmp_path / "out.yaml", blocks, links) == expected
+
+
+def test_errors_leave_the_previous_output(tmp_path):
+    blocks, links = _entries(3)
+    path = tmp_path / "out.yaml"
+    path.write_text("previous")
+
+    def failing_links():
+        yield links[0]
+        raise RuntimeError("Cannot resolve link")
+
+    with pytest.raises(RuntimeError):
+        write_low_level_system_yaml(str(path), iter(blocks), failing_links())
+
+    assert path.read_text() == "previous"
+    assert [p.name for p in tmp_path.iterdir()] == ["out.yaml"]
+
+
+@pytest.mark.benchmark
+def test_writer_is_faster_than_yaml_dump(tmp_path):
+    blocks, links = _entries(2000)
+
+    def dump():
+        with open(tmp_path / "dump.yaml", "w") as f:
+            yaml.dump({"Blocks": blocks, "Links": links}, f, Dumper=YAML_DUMPER, sort_keys=False)
+
+    dumped = best_time(dump, repeat=3)
+    written = best_time(lambda: _write(tmp_path / "out.yaml", blocks, links), repeat=3)
+
+    assert written < dumped, (dumped, written)
+
+
+def test_json_output_loads_as_the_same_system(tmp_path):
+    blocks, links = _entries(20)
+    blocks.append({"Id[string]": "odd", "F": [1e20, 1e-7, -0.0, math.inf, -math.inf], "S": "é \"q\"",
+                   "N": {"nested": [1e16, None, True]}})
+    write_low_level_system_yaml(str(tmp_path / "out.yaml"), iter(blocks), iter(links))
+    write_low_level_system_json(str(tmp_path / "out.json"), iter(blocks), iter(links))
+
+    with open(tmp_path / "out.yaml") as yaml_file, open(tmp_path / "out.json") as json_file:
+        assert yaml.safe_load(json_file) == yaml.safe_load(yaml_file)
+    assert json.loads((tmp_path / "out.json").read_text().replace("-.inf", "-1e999").replace(".inf", "1e999")) == {
+        "Blocks": blocks, "Links": links,
+    }
+
+
+def test_compiled_json_output_matches_yaml_output(system_builder, tmp_path):
+    blocks = [system_builder.block("const", "Constant", {"Value": {"type": "double", "value": 1e-7}}, outputs=1)]
+    blocks += [
+        system_builder.block(f"gain{i}", "Gain", {"Gain": {"type": "double", "value": 2.0 ** i}}, inputs=1, outputs=1)
+        for i in range(60)
+    ]
+    blocks.append(system_builder.block("display", "Display", inputs=1))
+    links = [system_builder.link(f"l{i}", a["id"], 0, [(b["id"], 0)]) for i, (a, b) in enumerate(zip(blocks, blocks[1:]))]
+    pslk_path = system_builder.write(blocks, links)
+    session = ToolkitSession(system_builder.toolkit_config_path)
+
+    session.compile_system(pslk_path, str(tmp_path / "out.yaml"))
+    session.compile_system(pslk_path, str(tmp_path / "out.json"), output_format="json")
+
+    with open(tmp_path / "out.yaml") as yaml_file, open(tmp_path / "out.json") as json_file:
+        assert yaml.safe_load(json_file) == yaml.safe_load(yaml_file)
+    with pytest.raises(ValueError):
+        session.compile_system(pslk_path, str(tmp_path / "out.xml"), output_format="xml")
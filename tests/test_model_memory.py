@@ -0,0 +1,99 @@
+import gc
+import json
+import pickle
+import tracemalloc
+
+import pytest
+
+from pysyslink_toolkit.HighLevelBlock import HighLevelBlock
+from pysyslink_toolkit.HighLevelSystem import LinkData, SegmentNode, SubsystemData, TargetNodeInfo
+from pysyslink_toolkit.LowLevelBlockStructure import LowLevelBlock, LowLevelLink
+
+
+def _block_data(i):
+    return {
+        "id": f"block{i}",
+        "label": f"Gain {i}",
+        "inputPorts": 1,
+        "outputPorts": 1,
+        "inputPortTypes": [],
+        "outputPortTypes": [],
+        "blockLibrary": "core_BasicBlocks",
+        "blockType": "Gain",
+        "properties": {"Gain": {"type": "float", "value": 1.5}},
+    }
+
+
+def _link_data(i):
+    return {
+        "id": f"link{i}",
+        "sourceId": f"block{i}",
+        "sourcePort": 0,
+        "sourceX": 10.0 * i,
+        "sourceY": 2.0,
+        "segmentNode": {
+            "id": f"seg{i}",
+            "orientation": "Horizontal",
+            "xOrY": 3.0,
+            "children": [{"id": f"seg{i}_a", "orientation": "Vertical", "xOrY": 4.0, "children": []}],
+        },
+        "targetNodes": {f"seg{i}_a": {"targetId": f"block{i + 1}", "port": 0, "x": 5.0, "y": 6.0}},
+    }
+
+
+@pytest.mark.parametrize("cls", [HighLevelBlock, LinkData, SegmentNode, TargetNodeInfo, SubsystemData, LowLevelBlock, LowLevelLink])
+def test_model_classes_have_no_instance_dict(cls):
+    assert "__dict__" not in dir(cls)
+
+
+def test_ids_are_shared_and_attributes_unchanged():
+    blocks = [HighLevelBlock.from_dict(json.loads(json.dumps(_block_data(i))), {}) for i in range(2)]
+    link = LinkData.from_dict(json.loads(json.dumps(_link_data(0))), {})
+
+    assert blocks[0].block_library is blocks[1].block_library
+    assert link.source_id is blocks[0].id
+    assert link.target_nodes["seg0_a"].target_id is blocks[1].id
+    assert link.to_dict() == _link_data(0)
+    assert pickle.loads(pickle.dumps(link)).to_dict() == _link_data(0)
+    with pytest.raises(AttributeError):
+        blocks[0].unknown_attribute = 1
+
+
+def test_low_level_ids_may_be_ints_or_str_subclasses():
+    class BlockId(str):
+        pass
+
+    block = LowLevelBlock(1, "gain", BlockId("BasicCpp"), "BasicBlocks/Gain", 1, ["double"], 1, ["double"])
+    link = LowLevelLink(2, "link", 1, 0, BlockId("display"), 0)
+
+    assert block.id == 1 and type(block.block_type) is BlockId
+    assert link.to_dict()["SourceBlockId[string]"] == 1
+    assert type(link.destination_block_id) is BlockId
+
+
+def test_bytes_per_block_and_link():
+    n = 20000
+    text = json.dumps({"blocks": [_block_data(i) for i in range(n)], "links": [_link_data(i) for i in range(n)]})
+
+    tracemalloc.start()
+    try:
+        data = json.loads(text)
+        blocks = [HighLevelBlock.from_dict(b, {}) for b in data["blocks"]]
+        links = [LinkData.from_dict(l, {}) for l in data["links"]]
+        del data
+        gc.collect()
+        with_links = tracemalloc.get_traced_memory()[0]
+        del links
+        gc.collect()
+        with_blocks = tracemalloc.get_traced_memory()[0]
+        del blocks
+        gc.collect()
+        empty = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    bytes_per_block = (with_blocks - empty) / n
+    bytes_per_link = (with_links - with_blocks) / n
+    # About 950 and 1280 bytes with a __dict__ per instance and a string per id reference
+    assert bytes_per_block < 850
+    assert bytes_per_link < 1000
@@ -0,0 +1,151 @@
+import sys
+
+import pytest
+from conftest import SystemBuilder
+
+from pysyslink_toolkit import cli
+from pysyslink_toolkit.BlockCompilationCache import BlockCompilationCache
+from pysyslink_toolkit.HighLevelBlock import HighLevelBlock
+from pysyslink_toolkit.PortType import PortType
+from pysyslink_toolkit.ToolkitSession import ToolkitSession
+from pysyslink_toolkit.block_libraries.BlockTypeRegistry import BlockTypeRegistry
+from pysyslink_toolkit.block_libraries.ParseBlockLibraries import load_block_library_plugins_from_paths
+from pysyslink_toolkit.compile_system import compile_high_level_blocks
+
+
+CHAIN_PLUGIN_YAML = """\
+pluginName: chain_plugin
+pluginType: highLevelBlockLibrary
+blockType: high_level
+metadata:
+  pythonFilename: chain_plugin.py
+blockLibraries:
+  - name: chain_library
+    blockTypes:
+      - name: GainChain
+        configurationValues:
+          - name: Gains
+            defaultValue: [1.0]
+            type: double[]
+        inputPortNumber: 1
+        outputPortNumber: 1
+"""
+
+CHAIN_PLUGIN_PY = """\
+from pysyslink_toolkit.LowLevelBlockStructure import LowLevelBlock, LowLevelBlockStructure, LowLevelLink
+from pysyslink_toolkit.block_libraries.BlockLibraryPlugin import BlockLibraryPlugin
+
+
+class ChainPlugin(BlockLibraryPlugin):
+    def _compile_block(self, high_level_block):
+        gains = high_level_block.properties["Gains"]["value"]
+        blocks = [
+            LowLevelBlock(f"{high_level_block.id}_gain{i}", f"Gain {i}", "BasicCpp", "BasicBlocks/Gain",
+                          1, ["double"], 1, ["double"], **{"Gain[double]": float(gain)})
+            for i, gain in enumerate(gains)
+        ]
+        links = [
+            LowLevelLink(f"{high_level_block.id}_link{i}", f"link{i}", a.id, 0, b.id, 0)
+            for i, (a, b) in enumerate(zip(blocks, blocks[1:]))
+        ]
+        port_map = {("input", 0): (blocks[0].id, 0), ("output", 0): (blocks[-1].id, 0)}
+        return LowLevelBlockStructure(blocks, links, port_map)
+"""
+
+
+@pytest.fixture
+def chain_system_builder(tmp_path, core_plugin_dir):
+    """
+    SystemBuilder with the core blocks and chain_library/GainChain, a high-level block expanded into a chain of gains.
+    """
+    plugin_dir = tmp_path / "chain_plugins" / "chain_plugin"
+    plugin_dir.mkdir(parents=True)
+    (plugin_dir / "chain_plugin.pslkblp.yaml").write_text(CHAIN_PLUGIN_YAML)
+    (plugin_dir / "chain_plugin.py").write_text(CHAIN_PLUGIN_PY)
+    system_dir = tmp_path / "system"
+    system_dir.mkdir()
+    return SystemBuilder(system_dir, [core_plugin_dir, str(tmp_path / "chain_plugins")])
+
+
+def _chain_system(system_builder, n_chains, last_gain=0.5):
+    """
+    Constant -> n_chains GainChain blocks of 20 gains -> Display.
+    """
+    blocks = [system_builder.block("const", "Constant", {"Value": {"type": "double", "value": 1.0}}, outputs=1)]
+    links = []
+    previous = "const"
+    for i in range(n_chains):
+        chain_id = f"chain{i}"
+        gains = [float(i)] * 19 + [last_gain]
+        blocks.append(system_builder.block(
+            chain_id, "GainChain", {"Gains": {"type": "double[]", "value": gains}},
+            inputs=1, outputs=1, block_library="chain_library",
+        ))
+        links.append(system_builder.link(f"l{i}", previous, 0, [(chain_id, 0)]))
+        previous = chain_id
+    blocks.append(system_builder.block("display", "Display", inputs=1))
+    links.append(system_builder.link("l_out", previous, 0, [("display", 0)]))
+    return system_builder.write(blocks, links)
+
+
+def _compile(session, pslk_path, output_path, jobs):
+    cache = BlockCompilationCache.get_default()
+    cache.clear()
+    cache.reset_stats()
+    session.compile_system(pslk_path, str(output_path), jobs=jobs)
+    return output_path.read_bytes()
+
+
+def test_parallel_output_is_identical_to_serial(chain_system_builder, tmp_path):
+    pslk_path = _chain_system(chain_system_builder, 40)
+    session = ToolkitSession(chain_system_builder.toolkit_config_path)
+
+    serial = _compile(session, pslk_path, tmp_path / "serial.yaml", jobs=1)
+    parallel = _compile(session, pslk_path, tmp_path / "parallel.yaml", jobs=3)
+
+    assert parallel == serial
+    assert serial.count(b"BasicBlocks/Gain") == 40 * 20
+    assert BlockCompilationCache.get_default().stats()["misses"] == 42
+
+
+def test_parallel_compilation_only_sends_cache_misses(chain_system_builder, tmp_path):
+    pslk_path = _chain_system(chain_system_builder, 10)
+    session = ToolkitSession(chain_system_builder.toolkit_config_path)
+    session.compile_system(pslk_path, str(tmp_path / "first.yaml"), jobs=2)
+
+    _chain_system(chain_system_builder, 10, last_gain=0.75)
+    cache = BlockCompilationCache.get_default()
+    cache.reset_stats()
+    session.compile_system(pslk_path, str(tmp_path / "second.yaml"), jobs=2)
+
+    assert cache.stats() == {"hits": 2, "disk_hits": 0, "misses": 10, "uncacheable": 0}
+    assert b"0.75" in (tmp_path / "second.yaml").read_bytes()
+
+
+def test_parallel_compilation_raises_the_first_serial_error(core_plugin_dir, test_plugins_dir):
+    registry = BlockTypeRegistry(load_block_library_plugins_from_paths([core_plugin_dir, test_plugins_dir]))
+    port_type = PortType().interned()
+
+    def block(block_id, block_type):
+        return HighLevelBlock(block_id, block_id, 1, [port_type], 1, [port_type], "core_BasicBlocks", block_type,
+                              {"Gain": {"type": "double", "value": 1.0}})
+
+    blocks = [block(f"gain{i}", "Gain") for i in range(10)] + [block("bad1", "Missing"), block("bad2", "Other")]
+
+    errors = []
+    for jobs in (1, 2):
+        with pytest.raises(RuntimeError) as error:
+            compile_high_level_blocks(blocks, registry, jobs=jobs, plugin_paths=[core_plugin_dir, test_plugins_dir])
+        errors.append(str(error.value))
+
+    assert errors[0] == errors[1] == "No plugin could compile block: Missing"
+
+
+def test_cli_jobs_flag(chain_system_builder, monkeypatch):
+    pslk_path = _chain_system(chain_system_builder, 4)
+    monkeypatch.setattr(sys, "argv", ["pysyslink", "compile", pslk_path, "--jobs", "2"])
+
+    cli.main()
+
+    output = (chain_system_builder.directory / "system_low_level_system.yaml").read_bytes()
+    assert output.count(b"BasicBlocks/Gain") == 4 * 20
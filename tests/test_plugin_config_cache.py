@@ -0,0 +1,137 @@
+import importlib
+import os
+import time
+
+import pytest
+
+from pysyslink_toolkit.block_libraries import ParseBlockLibraries
+from pysyslink_toolkit.block_libraries.ParseBlockLibraries import (
+    _parse_block_library_configs_from_paths,
+    load_block_library_plugins_from_paths,
+)
+from pysyslink_toolkit.block_libraries.PluginConfigCache import PluginConfigCache
+
+plugin_config_cache_module = importlib.import_module("pysyslink_toolkit.block_libraries.PluginConfigCache")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PluginConfigCache(str(tmp_path / "cache"), max_entries=8)
+
+
+def _count_parses(monkeypatch):
+    calls = []
+    original = ParseBlockLibraries._parse_block_library_config_file
+
+    def counting(file_path, content=None):
+        calls.append(file_path)
+        return original(file_path, content)
+
+    monkeypatch.setattr(ParseBlockLibraries, "_parse_block_library_config_file", counting)
+    return calls
+
+
+def test_warm_load_does_not_parse(core_plugin_dir, cache, monkeypatch):
+    cold = _parse_block_library_configs_from_paths([core_plugin_dir], cache)
+    calls = _count_parses(monkeypatch)
+
+    warm = _parse_block_library_configs_from_paths([core_plugin_dir], PluginConfigCache(cache.cache_dir))
+
+    assert calls == []
+    assert warm == cold
+    assert warm[0] is not cold[0]
+
+
+@pytest.mark.parametrize("change", ["format_version", "schema"])
+def test_entries_of_another_cache_layout_are_not_read(core_plugin_dir, cache, monkeypatch, change):
+    with monkeypatch.context() as m:
+        if change == "format_version":
+            m.setattr(plugin_config_cache_module, "CACHE_FORMAT_VERSION", plugin_config_cache_module.CACHE_FORMAT_VERSION - 1)
+        else:
+            m.setattr(plugin_config_cache_module, "_get_schema_fingerprint", lambda: "previous fields")
+        _parse_block_library_configs_from_paths([core_plugin_dir], PluginConfigCache(cache.cache_dir))
+
+    calls = _count_parses(monkeypatch)
+    _parse_block_library_configs_from_paths([core_plugin_dir], PluginConfigCache(cache.cache_dir))
+
+    assert len(calls) == 1
+
+
+def test_changed_file_is_reparsed_and_stale_entry_dropped(core_plugin_dir, cache, monkeypatch):
+    _parse_block_library_configs_from_paths([core_plugin_dir], cache)
+    yaml_path = os.path.join(core_plugin_dir, "basic_blocks", "basic_blocks.pslkblp.yaml")
+    with open(yaml_path) as f:
+        content = f.read()
+    with open(yaml_path, "w") as f:
+        f.write(content.replace("name: Gain\n", "name: Gain2\n"))
+
+    calls = _count_parses(monkeypatch)
+    plugin_configs = _parse_block_library_configs_from_paths([core_plugin_dir], cache)
+
+    assert calls == [yaml_path]
+    block_names = [b.name for b in plugin_configs[0].blockLibraries[0].blockTypes]
+    assert "Gain2" in block_names
+    entries = os.listdir(os.path.join(cache.cache_dir, PluginConfigCache.ENTRIES_DIRNAME))
+    assert len(entries) == 1
+
+
+def test_touched_unchanged_file_is_not_reparsed(core_plugin_dir, cache, monkeypatch):
+    _parse_block_library_configs_from_paths([core_plugin_dir], cache)
+    yaml_path = os.path.join(core_plugin_dir, "basic_blocks", "basic_blocks.pslkblp.yaml")
+    later = time.time() + 10
+    os.utime(yaml_path, (later, later))
+
+    calls = _count_parses(monkeypatch)
+    _parse_block_library_configs_from_paths([core_plugin_dir], cache)
+
+    assert calls == []
+
+
+def test_lru_eviction_caps_entries(tmp_path, core_plugin_dir):
+    cache = PluginConfigCache(str(tmp_path / "cache"), max_entries=2)
+    source = os.path.join(core_plugin_dir, "basic_blocks", "basic_blocks.pslkblp.yaml")
+    with open(source) as f:
+        content = f.read()
+
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"lib{i}" / f"lib{i}.pslkblp.yaml"
+        path.parent.mkdir()
+        path.write_text(content.replace("basic_blocks_plugin", f"plugin_{i}"))
+        paths.append(str(path.parent))
+        _parse_block_library_configs_from_paths([str(path.parent)], cache)
+        cache._index[os.path.abspath(str(path))]["last_used"] = i
+
+    cache.flush()
+
+    reloaded = PluginConfigCache(cache.cache_dir, max_entries=2)
+    assert len(reloaded) == 2
+    assert sorted(os.path.basename(p) for p in reloaded._get_index()) == ["lib2.pslkblp.yaml", "lib3.pslkblp.yaml"]
+    assert len(os.listdir(os.path.join(cache.cache_dir, PluginConfigCache.ENTRIES_DIRNAME))) == 2
+
+
+def test_corrupt_entry_falls_back_to_parsing(core_plugin_dir, cache):
+    _parse_block_library_configs_from_paths([core_plugin_dir], cache)
+    entries_dir = os.path.join(cache.cache_dir, PluginConfigCache.ENTRIES_DIRNAME)
+    for name in os.listdir(entries_dir):
+        with open(os.path.join(entries_dir, name), "wb") as f:
+            f.write(b"not a pickle")
+
+    plugin_configs = _parse_block_library_configs_from_paths([core_plugin_dir], PluginConfigCache(cache.cache_dir))
+
+    assert plugin_configs[0].pluginName == "basic_blocks_plugin"
+
+
+def test_cached_plugins_are_independent(core_plugin_dir, cache):
+    first = load_block_library_plugins_from_paths([core_plugin_dir], cache)
+    second = load_block_library_plugins_from_paths([core_plugin_dir], cache)
+
+    def core_library_names(plugins):
+        return [
+            lib.name
+            for plugin in plugins if plugin.block_library_plugin_config.pluginName == "basic_blocks_plugin"
+            for lib in plugin.block_library_plugin_config.blockLibraries
+        ]
+
+    assert core_library_names(first) == ["core_BasicBlocks"]
+    assert core_library_names(second) == ["core_BasicBlocks"]
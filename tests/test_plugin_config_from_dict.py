@@ -0,0 +1,123 @@
+import copy
+import glob
+import os
+
+import pytest
+import yaml
+from dacite import Config, from_dict
+
+from pysyslink_toolkit.BlockRenderInformation import BlockShape
+from pysyslink_toolkit.PortType import PortType
+from pysyslink_toolkit.block_libraries.BlockLibraryPluginConfig import BlockLibraryPluginConfig, BlockLibraryPluginType
+from pysyslink_toolkit.block_libraries.ParseBlockLibraries import (
+    _get_default_dir_from_package,
+    _normalize_plugin_dict,
+    _parse_block_library_config_file,
+)
+from pysyslink_toolkit.block_libraries.PluginConfigFromDict import plugin_config_from_dict
+from conftest import CORE_PLUGIN_YAML, best_time
+
+DACITE_CONFIG = Config(cast=[BlockLibraryPluginType, BlockShape], type_hooks={PortType: PortType.from_dict})
+
+
+def _dacite(data):
+    return from_dict(data_class=BlockLibraryPluginConfig, data=data, config=DACITE_CONFIG)
+
+
+def _normalized(content):
+    return _normalize_plugin_dict(yaml.safe_load(content))
+
+
+def _plugin_contents():
+    contents = [CORE_PLUGIN_YAML]
+    for path in glob.glob(os.path.join(_get_default_dir_from_package(), "**", "*.pslkblp.yaml"), recursive=True):
+        with open(path) as f:
+            contents.append(f.read())
+    test_plugins_dir = os.path.join(os.path.dirname(__file__), "plugins")
+    for path in glob.glob(os.path.join(test_plugins_dir, "**", "*.pslkblp.yaml"), recursive=True):
+        with open(path) as f:
+            contents.append(f.read())
+    return contents
+
+
+@pytest.mark.parametrize("content", _plugin_contents())
+def test_same_objects_as_dacite(content):
+    data = _normalized(content)
+
+    assert plugin_config_from_dict(copy.deepcopy(data)) == _dacite(data)
+
+
+def _set(path, value):
+    def mutate(data):
+        target = data
+        for key in path[:-1]:
+            target = target[key]
+        if value is KeyError:
+            del target[path[-1]]
+        else:
+            target[path[-1]] = value
+    return mutate
+
+
+LIBRARY = ("blockLibraries", 0)
+GAIN = LIBRARY + ("blockTypes", 1)
+
+
+@pytest.mark.parametrize("mutate", [
+    _set(("pluginName",), KeyError),
+    _set(("pluginType",), "notAPluginType"),
+    _set(("metadata",), None),
+    _set(LIBRARY + ("name",), 3),
+    _set(GAIN + ("inputPortNumber",), 1.5),
+    _set(GAIN + ("blockShape",), "hexagon"),
+    _set(GAIN + ("configurationValues", "Gain", "defaultValue"), {"a": 1}),
+    _set(GAIN + ("configurationValues", "Gain", "defaultValue"), [1, "a"]),
+    _set(GAIN + ("configurationValues", "Gain", "type"), KeyError),
+    _set(GAIN + ("inputPortLabels",), {"labels": ["a", 1]}),
+    _set(GAIN + ("inputPortTypes",), {"all": {"supported_port_types_for_inheritance": ["Any"]}}),
+    _set(GAIN + ("outputPortTypes",), {"all": {"inheritance_group": "first"}}),
+], ids=lambda mutate: "")
+def test_same_errors_as_dacite(mutate):
+    data = _normalized(CORE_PLUGIN_YAML)
+    mutate(data)
+
+    with pytest.raises(Exception) as expected:
+        _dacite(copy.deepcopy(data))
+    with pytest.raises(type(expected.value)) as actual:
+        plugin_config_from_dict(data)
+
+    assert str(actual.value) == str(expected.value)
+
+
+def test_invalid_file_error_names_the_file(tmp_path):
+    path = tmp_path / "broken.pslkblp.yaml"
+    path.write_text(CORE_PLUGIN_YAML.replace("pluginName: basic_blocks_plugin\n", ""))
+
+    with pytest.raises(RuntimeError, match="Invalid plugin config in file .*broken.pslkblp.yaml: .*pluginName") as error:
+        _parse_block_library_config_file(str(path))
+
+    assert "dacite" not in str(error.value)
+
+
+def _large_library(n_block_types):
+    data = _normalized(CORE_PLUGIN_YAML)
+    block_types = data["blockLibraries"][0]["blockTypes"]
+    data["blockLibraries"][0]["blockTypes"] = [
+        dict(copy.deepcopy(block_types[i % len(block_types)]), name=f"Block{i}") for i in range(n_block_types)
+    ]
+    return data
+
+
+def test_same_result_as_dacite_on_large_library():
+    data = _large_library(200)
+    assert plugin_config_from_dict(data) == _dacite(data)
+
+
+@pytest.mark.benchmark
+def test_faster_than_dacite_on_large_library():
+    data = _large_library(2000)
+
+    dacite_time = best_time(lambda: _dacite(data), repeat=3)
+    specialized_time = best_time(lambda: plugin_config_from_dict(data), repeat=3)
+
+    assert specialized_time < dacite_time, (dacite_time, specialized_time)
@@ -0,0 +1,102 @@
+import glob
+import os
+
+import pytest
+import yaml
+
+from pysyslink_toolkit.block_libraries import ParseBlockLibraries
+from pysyslink_toolkit.block_libraries.ParseBlockLibraries import _parse_block_library_configs_from_paths
+from pysyslink_toolkit.block_libraries.PluginConfigCache import PluginConfigCache
+from conftest import CORE_PLUGIN_YAML, best_time
+
+N_LIBRARY_FILES = 300
+
+
+@pytest.fixture
+def synthetic_plugin_tree(tmp_path):
+    root = tmp_path / "synthetic"
+    for i in range(N_LIBRARY_FILES):
+        plugin_dir = root / f"group_{i % 10}" / f"library_{i}"
+        plugin_dir.mkdir(parents=True)
+        (plugin_dir / f"library_{i}.pslkblp.yaml").write_text(
+            CORE_PLUGIN_YAML.replace("basic_blocks_plugin", f"plugin_{i}").replace("BasicBlocks", f"Blocks{i}")
+        )
+    return str(root)
+
+
+def _yaml_files(root):
+    return glob.glob(os.path.join(root, "**", "*.pslkblp.yaml"), recursive=True)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_parse_keeps_glob_order(synthetic_plugin_tree, jobs):
+    plugin_configs = _parse_block_library_configs_from_paths([synthetic_plugin_tree], jobs=jobs)
+
+    assert [c.yaml_filename for c in plugin_configs] == _yaml_files(synthetic_plugin_tree)
+
+
+def test_process_pool_gives_the_serial_configs(synthetic_plugin_tree, tmp_path):
+    serial = _parse_block_library_configs_from_paths([synthetic_plugin_tree], jobs=1)
+    cache = PluginConfigCache(str(tmp_path / "cache"))
+
+    assert _parse_block_library_configs_from_paths([synthetic_plugin_tree], jobs=2) == serial
+    assert _parse_block_library_configs_from_paths([synthetic_plugin_tree], cache, jobs=2) == serial
+
+    # Some files cached, the others parsed by the pool
+    changed = _yaml_files(synthetic_plugin_tree)[::2]
+    for file_path in changed:
+        with open(file_path, "a") as f:
+            f.write("metadata:\n  changed: true\n")
+    plugin_configs = _parse_block_library_configs_from_paths([synthetic_plugin_tree], cache, jobs=2)
+
+    assert plugin_configs == _parse_block_library_configs_from_paths([synthetic_plugin_tree], jobs=1)
+    assert [c.yaml_filename for c in plugin_configs if c.metadata.get("changed")] == changed
+
+
+def test_process_pool_raises_the_first_serial_error(synthetic_plugin_tree):
+    yaml_files = _yaml_files(synthetic_plugin_tree)
+    with open(yaml_files[100], "a") as f:
+        f.write("  - name: [unclosed\n")
+    with open(yaml_files[200], "w") as f:
+        f.write("pluginName: broken\n")
+
+    with pytest.raises(Exception) as serial:
+        _parse_block_library_configs_from_paths([synthetic_plugin_tree], jobs=1)
+    with pytest.raises(type(serial.value)) as pooled:
+        _parse_block_library_configs_from_paths([synthetic_plugin_tree], jobs=2)
+
+    assert str(pooled.value).startswith(f"YAML parsing error in '{yaml_files[100]}'")
+    assert str(serial.value).startswith(f"YAML parsing error in '{yaml_files[100]}'")
+
+
+@pytest.mark.skipif(not hasattr(yaml, "CSafeLoader"), reason="PyYAML built without libyaml")
+def test_libyaml_and_pure_python_loaders_agree(synthetic_plugin_tree, monkeypatch):
+    libyaml_configs = _parse_block_library_configs_from_paths([synthetic_plugin_tree])
+    monkeypatch.setattr(ParseBlockLibraries, "YAML_SAFE_LOADER", yaml.SafeLoader)
+
+    assert _parse_block_library_configs_from_paths([synthetic_plugin_tree]) == libyaml_configs
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(not hasattr(yaml, "CSafeLoader"), reason="PyYAML built without libyaml")
+def test_libyaml_loader_is_faster_than_pure_python_loader(synthetic_plugin_tree, monkeypatch):
+    def parse():
+        _parse_block_library_configs_from_paths([synthetic_plugin_tree])
+
+    parse()  # Warm up the file system cache
+    libyaml = best_time(parse, repeat=3)
+    monkeypatch.setattr(ParseBlockLibraries, "YAML_SAFE_LOADER", yaml.SafeLoader)
+    pure_python = best_time(parse, repeat=3)
+
+    assert libyaml < pure_python, (pure_python, libyaml)
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif((os.cpu_count() or 1) < 2, reason="needs several CPUs")
+def test_process_pool_is_faster_than_serial_parse(synthetic_plugin_tree):
+    _parse_block_library_configs_from_paths([synthetic_plugin_tree], jobs=1)  # Warm up the file system cache
+
+    serial = best_time(lambda: _parse_block_library_configs_from_paths([synthetic_plugin_tree], jobs=1), repeat=3)
+    pooled = best_time(lambda: _parse_block_library_configs_from_paths([synthetic_plugin_tree]), repeat=3)
+
+    assert pooled < serial, (serial, pooled)
@@ -0,0 +1,194 @@
+import copy
+import random
+
+import pytest
+
+from pysyslink_toolkit.HighLevelBlock import HighLevelBlock
+from pysyslink_toolkit.HighLevelSystem import HighLevelSystem, LinkData, TargetNodeInfo
+from pysyslink_toolkit.PortType import FullySupportedSignalValueType, PortCategory, PortType
+from pysyslink_toolkit.PortTypeEngine import PortRef, PortTypeEngine
+from pysyslink_toolkit.port_type_propagation import _Ports, _solve
+from conftest import best_time
+
+
+def _double():
+    return PortType(signal_value_type=FullySupportedSignalValueType.Double).interned()
+
+
+def _int():
+    return PortType(signal_value_type=FullySupportedSignalValueType.Int).interned()
+
+
+def _inherited(group=0):
+    return PortType(port_category=PortCategory.inherited, inheritance_group=group).interned()
+
+
+def _block(block_id, inputs, outputs):
+    return HighLevelBlock(block_id, block_id, len(inputs), inputs, len(outputs), outputs, "lib", "Block", {})
+
+
+def _link(link_id, source_id, targets, source_port=0):
+    target_nodes = {
+        f"{link_id}_{i}": TargetNodeInfo(target_id, port, 0.0, 0.0) for i, (target_id, port) in enumerate(targets)
+    }
+    return LinkData(link_id, source_id, source_port, 0.0, 0.0, None, target_nodes)
+
+
+def _chain(prefix, n_blocks):
+    blocks = [_block(f"{prefix}source", [], [_double()])]
+    blocks += [_block(f"{prefix}pass{i}", [_inherited()], [_inherited()]) for i in range(n_blocks)]
+    blocks.append(_block(f"{prefix}sink", [_inherited()], []))
+    links = [_link(f"{prefix}l{i}", a.id, [(b.id, 0)]) for i, (a, b) in enumerate(zip(blocks, blocks[1:]))]
+    return blocks, links
+
+
+def _full_propagation(blocks, links):
+    """
+    Port types of each block after a full propagation, None if it raises.
+    """
+    blocks = copy.deepcopy(blocks)
+    try:
+        HighLevelSystem(None, None, None, blocks, list(links), []).propagate_and_validate_port_types()
+    except ValueError:
+        return None
+    return {b.id: (b.input_port_types, b.output_port_types) for b in blocks}
+
+
+def test_engine_resolves_like_full_propagation():
+    blocks, links = _chain("", 5)
+    engine = PortTypeEngine(blocks, links)
+
+    assert engine.errors() == []
+    assert engine.unresolved_ports() == []
+    for block_id, port_types in _full_propagation(blocks, links).items():
+        assert engine.block_port_types(block_id) == port_types
+    assert all(pt.port_category == PortCategory.inherited for pt in blocks[1].input_port_types)
+
+
+def test_edits_report_the_ports_that_changed():
+    blocks, links = _chain("", 3)
+    engine = PortTypeEngine(blocks, links)
+
+    changes = engine.remove_link("l1")
+    assert set(changes) == {
+        PortRef("pass1", "input", 0), PortRef("pass1", "output", 0), PortRef("pass2", "input", 0),
+        PortRef("pass2", "output", 0), PortRef("sink", "input", 0),
+    }
+    assert all(pt.port_category == PortCategory.inherited for pt in changes.values())
+
+    changes = engine.set_block(_block("pass1", [_inherited()], [_int()]))
+    assert changes[PortRef("pass1", "output", 0)] is _int()
+    assert changes[PortRef("sink", "input", 0)] is _int()
+    # Same inheritance group as the output
+    assert changes[PortRef("pass1", "input", 0)] is _int()
+
+    changes = engine.remove_block("pass2")
+    assert changes[PortRef("pass2", "input", 0)] is None
+    assert changes[PortRef("pass2", "output", 0)] is None
+    assert changes[PortRef("sink", "input", 0)] is _inherited()
+
+    engine.set_block(_block("pass1", [_inherited()], [_inherited()]))
+    assert engine.set_link(_link("l1", "pass0", [("pass1", 0)])) == {
+        PortRef("pass1", "input", 0): _double(), PortRef("pass1", "output", 0): _double(),
+    }
+
+
+def test_errors_are_kept_until_the_edit_fixing_them():
+    blocks, links = _chain("", 2)
+    engine = PortTypeEngine(blocks, links)
+
+    engine.set_block(_block("sink", [_int()], []))
+    assert len(engine.errors()) == 1
+    assert "pass1.out[0]" in engine.errors()[0]
+    assert engine.port_type(PortRef("pass1", "output", 0)) is _inherited()
+
+    engine.set_block(_block("sink", [_inherited()], []))
+    assert engine.errors() == []
+    assert engine.port_type(PortRef("pass1", "output", 0)) is _double()
+
+    engine.set_block(_block("pass1", [_double()], [_double()]))
+    engine.set_block(_block("sink", [_int()], []))
+    assert len(engine.errors()) == 1
+    assert "Connection pass1.out[0] -> sink.in[0]" in engine.errors()[0]
+    engine.remove_link("l2")
+    assert engine.errors() == []
+
+
+def test_random_edits_match_full_propagation():
+    rng = random.Random(1)
+    block_ids = [f"b{i}" for i in range(12)]
+    port_types = [_double(), _int(), _inherited(0), _inherited(0), _inherited(1), _inherited(1)]
+
+    def random_block(block_id):
+        return _block(
+            block_id,
+            [rng.choice(port_types) for _ in range(rng.randint(0, 2))],
+            [rng.choice(port_types) for _ in range(rng.randint(1, 2))],
+        )
+
+    blocks = {block_id: random_block(block_id) for block_id in block_ids}
+    links = {}
+    engine = PortTypeEngine(blocks.values())
+
+    for step in range(1500):
+        action = rng.random()
+        if action < 0.15:
+            block = random_block(rng.choice(block_ids))
+            blocks[block.id] = block
+            engine.set_block(block)
+        elif action < 0.25 and links:
+            link_id = rng.choice(sorted(links))
+            del links[link_id]
+            engine.remove_link(link_id)
+        else:
+            source = blocks[rng.choice(block_ids)]
+            targets = []
+            for _ in range(rng.randint(1, 2)):
+                target = blocks[rng.choice(block_ids)]
+                if target.input_port_types:
+                    targets.append((target.id, rng.randrange(len(target.input_port_types))))
+            link = _link(f"l{rng.randrange(10)}", source.id, targets, rng.randrange(len(source.output_port_types)))
+            links[link.id] = link
+            engine.set_link(link)
+
+        # Links to ports a block no longer has are left out, the full propagation rejects them
+        valid_links = [
+            link for link in links.values()
+            if link.source_port < len(blocks[link.source_id].output_port_types)
+            and all(t.port < len(blocks[t.target_id].input_port_types) for t in link.target_nodes.values())
+        ]
+        if len(valid_links) < len(links):
+            continue
+        # Types before the check for unresolved ports, most random systems have some
+        ports = _Ports(copy.deepcopy(list(blocks.values())), valid_links)
+        if not _solve(ports):
+            assert engine.errors(), step
+            continue
+        ports.write_back()
+        assert engine.errors() == [], step
+        for block in ports.blocks:
+            assert engine.block_port_types(block.id) == (block.input_port_types, block.output_port_types), step
+
+
+def _edit_time(n_chains):
+    blocks, links = [], []
+    for c in range(n_chains):
+        chain_blocks, chain_links = _chain(f"c{c}_", 20)
+        blocks += chain_blocks
+        links += chain_links
+    engine = PortTypeEngine(blocks, links)
+
+    def edit():
+        for _ in range(20):
+            engine.remove_link("c0_l10")
+            engine.set_link(links[10])
+
+    return best_time(edit)
+
+
+@pytest.mark.benchmark
+def test_edit_latency_does_not_grow_with_the_system():
+    small = _edit_time(10)
+    large = _edit_time(500)
+
+    assert large < 3 * small, (small, large)
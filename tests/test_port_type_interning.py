@@ -0,0 +1,88 @@
+import dataclasses
+import gc
+import pickle
+import tracemalloc
+import weakref
+
+import pytest
+
+from pysyslink_toolkit.HighLevelBlock import HighLevelBlock
+from pysyslink_toolkit import PortType as port_type_module
+from pysyslink_toolkit.PortType import FullySupportedSignalValueType, PortCategory, PortType
+
+DOUBLE = {"port_category": "FullySupportedSignalValue", "signal_value_type": "double"}
+INHERITED = {
+    "port_category": "Inherited",
+    "supported_port_types_for_inheritance": ["FullySupportedSignalValueType.Any", DOUBLE],
+    "inheritance_group": 1,
+}
+
+
+def test_equal_port_types_share_one_instance():
+    assert PortType.from_dict(dict(INHERITED)) is PortType.from_dict(dict(INHERITED))
+    assert PortType.from_dict(DOUBLE) is PortType(signal_value_type=FullySupportedSignalValueType.Double).interned()
+    assert PortType.from_dict(INHERITED) is not PortType.from_dict(dict(INHERITED, inheritance_group=2))
+    assert PortType.from_dict(INHERITED).to_dict() == INHERITED | {"supported_port_types_for_inheritance": [
+        "FullySupportedSignalValueType.Any", dict(DOUBLE, inheritance_group=0),
+    ]}
+
+
+def test_unused_port_types_are_not_kept():
+    structure = PortType(port_category=PortCategory.structure, structure_name="Transient").interned()
+    in_group = structure.with_inheritance_group(2)
+    reference = weakref.ref(structure)
+    keys = [structure._fields(), in_group._fields()]
+
+    assert PortType(port_category=PortCategory.structure, structure_name="Transient").interned() is structure
+    assert all(key in port_type_module._canonical_port_types for key in keys)
+    del structure, in_group
+    gc.collect()
+
+    assert reference() is None
+    assert not any(key in port_type_module._canonical_port_types for key in keys)
+
+
+def test_value_type_ignores_constraints_and_group():
+    double = PortType.from_dict(DOUBLE)
+    in_group = double.with_inheritance_group(3)
+
+    assert in_group.inheritance_group == 3 and in_group is double.with_inheritance_group(3)
+    assert in_group.value_type is double.value_type is double
+    assert PortType(port_category=PortCategory.inherited).value_type is not PortType.from_dict(INHERITED)
+
+
+def test_port_types_are_immutable_and_unpickled_canonical():
+    inherited = PortType.from_dict(INHERITED)
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        inherited.port_category = PortCategory.fully_supported_signal_value
+    assert pickle.loads(pickle.dumps(inherited)) is inherited
+    assert PortType(supported_port_types_for_inheritance=["FullySupportedSignalValueType.Any"]) == PortType(
+        supported_port_types_for_inheritance=("FullySupportedSignalValueType.Any",)
+    )
+
+
+def _block_data(i):
+    return {
+        "id": f"adder{i}", "label": "Adder", "inputPorts": 4, "outputPorts": 1,
+        "inputPortTypes": [dict(INHERITED) for _ in range(4)], "outputPortTypes": [dict(INHERITED)],
+        "blockLibrary": "core_BasicBlocks", "blockType": "Adder", "properties": {},
+    }
+
+
+def test_shared_port_types_use_less_memory():
+    block_data = [_block_data(i) for i in range(2000)]
+
+    tracemalloc.start()
+    blocks = [HighLevelBlock.from_dict(data, {}) for data in block_data]
+    blocks_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # One instance per port, as before port types were interned
+    tracemalloc.start()
+    own_types = [[dataclasses.replace(pt) for pt in b.input_port_types + b.output_port_types] for b in blocks]
+    own_types_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    assert len({id(pt) for b in blocks for pt in b.input_port_types + b.output_port_types}) == 1
+    assert blocks_size < own_types_size
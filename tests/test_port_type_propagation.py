@@ -0,0 +1,129 @@
+import time
+
+import pytest
+
+from pysyslink_toolkit.HighLevelBlock import HighLevelBlock
+from pysyslink_toolkit.HighLevelSystem import HighLevelSystem, LinkData, TargetNodeInfo
+from pysyslink_toolkit.PortType import FullySupportedSignalValueType, PortCategory, PortType
+from pysyslink_toolkit.port_type_propagation import _Ports, _propagate_to_fixed_point
+
+
+def _double():
+    return PortType(signal_value_type=FullySupportedSignalValueType.Double)
+
+
+def _inherited(supported=None, group=0):
+    return PortType(port_category=PortCategory.inherited, supported_port_types_for_inheritance=supported,
+                    inheritance_group=group)
+
+
+def _block(block_id, inputs, outputs):
+    return HighLevelBlock(block_id, block_id, len(inputs), inputs, len(outputs), outputs, "lib", "Block", {})
+
+
+def _link(link_id, source_id, targets):
+    target_nodes = {f"{link_id}_{i}": TargetNodeInfo(target_id, 0, 0.0, 0.0) for i, target_id in enumerate(targets)}
+    return LinkData(link_id, source_id, 0, 0.0, 0.0, None, target_nodes)
+
+
+def _system(blocks, links):
+    return HighLevelSystem(None, None, None, blocks, links, [])
+
+
+def _chain(n_blocks):
+    """
+    Source -> n pass through blocks inheriting their input type -> sink, links listed from the sink back.
+    """
+    blocks = [_block("source", [], [_double()])]
+    blocks += [_block(f"pass{i}", [_inherited()], [_inherited()]) for i in range(n_blocks)]
+    blocks.append(_block("sink", [_inherited(["FullySupportedSignalValueType.Any"])], []))
+    links = [_link(f"l{i}", a.id, [b.id]) for i, (a, b) in enumerate(zip(blocks, blocks[1:]))]
+    return blocks, links[::-1]
+
+
+def test_chain_is_resolved():
+    blocks, links = _chain(5)
+    _system(blocks, links).propagate_and_validate_port_types()
+
+    for block in blocks:
+        assert all(pt.port_category == PortCategory.fully_supported_signal_value for pt in block.input_port_types)
+        assert all(pt.signal_value_type == FullySupportedSignalValueType.Double for pt in block.output_port_types)
+
+
+def test_groups_share_a_type_and_shared_port_types_are_not_changed():
+    shared = _inherited(group=1).interned()
+    adder = _block("adder", [_inherited(group=1), shared], [_inherited(group=1)])
+    display = _block("display", [shared], [])
+    links = [
+        _link("l0", "source", ["adder"]), _link("l1", "adder", ["sink"]), _link("l2", "other", ["display"]),
+    ]
+    blocks = [
+        _block("source", [], [_double()]), adder, display, _block("sink", [_inherited()], []),
+        _block("other", [], [PortType(signal_value_type=FullySupportedSignalValueType.Int)]),
+    ]
+
+    _system(blocks, links).propagate_and_validate_port_types()
+
+    assert shared.port_category == PortCategory.inherited
+    assert all(pt.signal_value_type == FullySupportedSignalValueType.Double for pt in adder.input_port_types)
+    assert adder.input_port_types[0] is adder.input_port_types[1] is adder.output_port_types[0]
+    assert display.input_port_types[0].signal_value_type == FullySupportedSignalValueType.Int
+    assert blocks[3].input_port_types[0] is _double().interned()
+
+
+@pytest.mark.parametrize("blocks, links, message", [
+    (
+        [_block("a", [], [_double()]), _block("b", [PortType(signal_value_type=FullySupportedSignalValueType.Int)], [])],
+        [_link("l0", "a", ["b"])],
+        r"Incompatible port types .* Connection a.out\[0\] -> b.in\[0\]",
+    ),
+    (
+        [_block("a", [], [_double()]),
+         _block("b", [_inherited([PortType(signal_value_type=FullySupportedSignalValueType.Int)])], [])],
+        [_link("l0", "a", ["b"])],
+        "Incompatible inheritance: .* not allowed for port constraints",
+    ),
+    (
+        [_block("a", [], [_double()]), _block("b", [], [PortType(signal_value_type=FullySupportedSignalValueType.Int)]),
+         _block("c", [_inherited(), _inherited()], [])],
+        [_link("l0", "a", ["c"]), LinkData("l1", "b", 0, 0.0, 0.0, None, {"s": TargetNodeInfo("c", 1, 0.0, 0.0)})],
+        "Conflicting inherited group 0 on block 'c'",
+    ),
+    (
+        [_block("a", [_inherited()], [_inherited()])],
+        [],
+        r"Could not resolve input port type a.in\[0\]",
+    ),
+    (
+        [_block("a", [], [_double()])],
+        [_link("l0", "a", ["missing"])],
+        "Link target block 'missing' not found",
+    ),
+])
+def test_errors(blocks, links, message):
+    with pytest.raises(ValueError, match=message):
+        _system(blocks, links).propagate_and_validate_port_types()
+
+
+def _best_propagation_time(n_blocks, propagate, repeat=3):
+    # Propagation writes the port types back, so each run resolves a new chain
+    best = float("inf")
+    for _ in range(repeat):
+        blocks, links = _chain(n_blocks)
+        start = time.perf_counter()
+        propagate(blocks, links)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@pytest.mark.benchmark
+def test_chain_scales_linearly():
+    def union_find(blocks, links):
+        _system(blocks, links).propagate_and_validate_port_types()
+
+    times = {n_blocks: _best_propagation_time(n_blocks, union_find) for n_blocks in (500, 2000)}
+    fixed_point_time = _best_propagation_time(500, lambda blocks, links: _propagate_to_fixed_point(_Ports(blocks, links)))
+
+    # 4x the chain, linear time is about 4x, a pass per block 16x
+    assert times[2000] < 8 * times[500], times
+    assert times[500] < fixed_point_time, (fixed_point_time, times)
@@ -0,0 +1,98 @@
+import importlib
+import json
+import sys
+
+import pytest
+import yaml
+
+from pysyslink_toolkit import cli
+from pysyslink_toolkit.TextFileManager import load_structured_file, load_yaml_file
+from conftest import best_time
+
+toolkit_session_module = importlib.import_module("pysyslink_toolkit.ToolkitSession")
+
+
+def _large_system_json(n_blocks):
+    return {
+        "blocks": [
+            {
+                "id": f"block{i}",
+                "label": f"Gain {i}",
+                "blockLibrary": "core_BasicBlocks",
+                "blockType": "Gain",
+                "inputPorts": 1,
+                "outputPorts": 1,
+                "x": i * 10.5,
+                "y": -3.25,
+                "properties": {"Gain": {"type": "float", "value": i}, "Enabled": {"type": "bool", "value": True}},
+            }
+            for i in range(n_blocks)
+        ],
+        "links": [],
+        "initialization_python_script_path": None,
+    }
+
+
+def test_json_and_yaml_files_give_the_same_mapping(tmp_path):
+    data = _large_system_json(5)
+    json_path = tmp_path / "system.pslk"
+    json_path.write_text(json.dumps(data, indent=2))
+    yaml_path = tmp_path / "system.yaml"
+    yaml_path.write_text(yaml.safe_dump(data))
+    flow_yaml_path = tmp_path / "flow.yaml"
+    flow_yaml_path.write_text("{blocks: [], links: []}\n")
+
+    assert load_structured_file(str(json_path)) == load_yaml_file(str(json_path)) == data
+    assert load_structured_file(str(yaml_path)) == data
+    assert load_structured_file(str(flow_yaml_path)) == {"blocks": [], "links": []}
+
+
+def test_errors_match_load_yaml_file(tmp_path):
+    empty_path = tmp_path / "empty.pslk"
+    empty_path.write_text("")
+
+    with pytest.raises(FileNotFoundError, match="Configuration file not found"):
+        load_structured_file(str(tmp_path / "missing.pslk"))
+    with pytest.raises(ValueError, match="is empty"):
+        load_structured_file(str(empty_path))
+
+
+def test_large_system_loads_as_yaml_does(tmp_path):
+    path = tmp_path / "large.pslk"
+    path.write_text(json.dumps(_large_system_json(50)))
+
+    assert load_structured_file(str(path)) == load_yaml_file(str(path))
+
+
+@pytest.mark.benchmark
+def test_faster_than_pure_python_yaml(tmp_path):
+    path = tmp_path / "large.pslk"
+    path.write_text(json.dumps(_large_system_json(500)))
+
+    yaml_time = best_time(lambda: load_yaml_file(str(path)), repeat=3)
+    json_time = best_time(lambda: load_structured_file(str(path)), repeat=3)
+
+    assert json_time < yaml_time, (yaml_time, json_time)
+
+
+def test_cli_compile_reads_pslk_once(system_builder, monkeypatch):
+    blocks = [
+        system_builder.block("const1", "Constant", {"Value": {"type": "float", "value": 1}}, outputs=1),
+        system_builder.block("display1", "Display", inputs=1),
+    ]
+    pslk_path = system_builder.write(blocks, [system_builder.link("l1", "const1", 0, [("display1", 0)])])
+
+    reads = []
+    load = toolkit_session_module.load_structured_file
+
+    def counting_load(path):
+        reads.append(path)
+        return load(path)
+
+    monkeypatch.setattr(toolkit_session_module, "load_structured_file", counting_load)
+    monkeypatch.setattr(sys, "argv", ["pysyslink", "compile", pslk_path])
+
+    cli.main()
+
+    assert reads == [pslk_path]
+    assert (system_builder.directory / "system_low_level_system.yaml").exists()
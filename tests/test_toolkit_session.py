@@ -0,0 +1,184 @@
+import importlib
+import os
+import time
+from collections import OrderedDict
+
+import pytest
+import yaml
+
+from pysyslink_toolkit.BlockCompilationCache import BlockCompilationCache
+from pysyslink_toolkit.HighLevelSystem import HighLevelSystem
+from pysyslink_toolkit.ToolkitSession import ToolkitSession, clear_shared_caches, get_default_session
+
+# The package re-exports the ToolkitSession class under the module name
+toolkit_session_module = importlib.import_module("pysyslink_toolkit.ToolkitSession")
+
+
+@pytest.fixture
+def simple_system(system_builder):
+    blocks = [
+        system_builder.block("const1", "Constant", {"Value": {"type": "float", "value": "a * 2"}}, outputs=1),
+        system_builder.block("gain1", "Gain", {"Gain": {"type": "float", "value": 3}}, inputs=1, outputs=1),
+        system_builder.block("display1", "Display", inputs=1),
+    ]
+    links = [
+        system_builder.link("l1", "const1", 0, [("gain1", 0)]),
+        system_builder.link("l2", "gain1", 0, [("display1", 0)]),
+    ]
+    return system_builder.write(blocks, links, init_script="a = 2\n")
+
+
+@pytest.fixture
+def counters(monkeypatch):
+    counts = {"plugins": 0, "scripts": 0}
+    load_plugins = toolkit_session_module.load_block_library_plugins_from_paths
+    load_parameter_environment = HighLevelSystem.load_parameter_environment.__func__
+
+    def counting_load_plugins(*args, **kwargs):
+        counts["plugins"] += 1
+        return load_plugins(*args, **kwargs)
+
+    def counting_load_parameter_environment(cls, *args, **kwargs):
+        counts["scripts"] += 1
+        return load_parameter_environment(cls, *args, **kwargs)
+
+    monkeypatch.setattr(toolkit_session_module, "load_block_library_plugins_from_paths", counting_load_plugins)
+    monkeypatch.setattr(HighLevelSystem, "load_parameter_environment", classmethod(counting_load_parameter_environment))
+    return counts
+
+
+def _bump_mtime(path):
+    later = time.time() + 5
+    os.utime(path, (later, later))
+
+
+def test_compile_reuses_plugins_and_init_script(system_builder, simple_system, counters, tmp_path):
+    session = ToolkitSession(system_builder.toolkit_config_path)
+    output_path = str(tmp_path / "out.yaml")
+
+    session.compile_system(simple_system, output_path)
+    session.compile_system(simple_system, output_path)
+
+    assert counters == {"plugins": 1, "scripts": 1}
+    with open(output_path) as f:
+        output = yaml.safe_load(f)
+    const_block = next(b for b in output["Blocks"] if b["Id[string]"] == "const1")
+    assert const_block["Value[double]"] == 4.0
+    assert len(output["Links"]) == 2
+
+
+def test_changed_init_script_is_run_again(system_builder, simple_system, counters, tmp_path):
+    session = ToolkitSession(system_builder.toolkit_config_path)
+    output_path = str(tmp_path / "out.yaml")
+    session.compile_system(simple_system, output_path)
+
+    script_path = os.path.splitext(simple_system)[0] + "_init.py"
+    with open(script_path, "w") as f:
+        f.write("a = 5\n")
+    _bump_mtime(script_path)
+    session.compile_system(simple_system, output_path)
+
+    assert counters["scripts"] == 2
+    with open(output_path) as f:
+        output = yaml.safe_load(f)
+    const_block = next(b for b in output["Blocks"] if b["Id[string]"] == "const1")
+    assert const_block["Value[double]"] == 10.0
+
+
+def test_changed_plugin_file_reloads_plugins(system_builder, simple_system, counters, core_plugin_dir):
+    session = ToolkitSession(system_builder.toolkit_config_path, plugin_check_interval=0.0)
+    session.get_block_library_plugins()
+    session.get_block_library_plugins()
+    assert counters["plugins"] == 1
+
+    _bump_mtime(os.path.join(core_plugin_dir, "basic_blocks", "basic_blocks.pslkblp.yaml"))
+    session.get_block_library_plugins()
+    assert counters["plugins"] == 2
+
+    new_plugin_dir = os.path.join(core_plugin_dir, "extra")
+    os.makedirs(new_plugin_dir)
+    with open(os.path.join(core_plugin_dir, "basic_blocks", "basic_blocks.pslkblp.yaml")) as f:
+        content = f.read()
+    with open(os.path.join(new_plugin_dir, "extra.pslkblp.yaml"), "w") as f:
+        f.write(content.replace("basic_blocks_plugin", "extra_plugin").replace("BasicBlocks", "ExtraBlocks"))
+    plugins = session.get_block_library_plugins()
+    assert counters["plugins"] == 3
+    assert "extra_plugin" in [p.block_library_plugin_config.pluginName for p in plugins]
+
+
+def test_render_information_does_not_reload(system_builder, simple_system, counters):
+    session = ToolkitSession(system_builder.toolkit_config_path)
+    block_data = system_builder.block("const2", "Constant", {"Value": {"type": "float", "value": "a"}}, outputs=1)
+
+    for _ in range(3):
+        info = session.get_block_render_information(block_data, simple_system)
+
+    assert counters == {"plugins": 1, "scripts": 1}
+    assert (info.input_ports, info.output_ports) == (0, 1)
+
+
+def test_default_session_is_shared(system_builder):
+    assert get_default_session(system_builder.toolkit_config_path) is get_default_session(system_builder.toolkit_config_path)
+
+
+def test_default_session_keeps_reading_its_config_after_chdir(system_builder, tmp_path, monkeypatch):
+    monkeypatch.chdir(os.path.dirname(system_builder.toolkit_config_path))
+    session = get_default_session("toolkit_config.yaml")
+    plugin_paths = session.get_toolkit_config().plugin_paths
+
+    other_dir = tmp_path / "elsewhere"
+    other_dir.mkdir()
+    (other_dir / "toolkit_config.yaml").write_text("plugin_paths: []\n")
+    monkeypatch.chdir(other_dir)
+
+    assert session.toolkit_config_path == system_builder.toolkit_config_path
+    assert get_default_session(system_builder.toolkit_config_path) is session
+    assert session.get_toolkit_config().plugin_paths == plugin_paths
+
+
+def test_compile_reuses_the_parsed_system(system_builder, simple_system, tmp_path, monkeypatch):
+    session = ToolkitSession(system_builder.toolkit_config_path)
+    built = []
+    from_dict_file = HighLevelSystem.from_dict_file.__func__
+    monkeypatch.setattr(HighLevelSystem, "from_dict_file", classmethod(lambda cls, *args, **kwargs: built.append(args[0]) or from_dict_file(cls, *args, **kwargs)))
+    outputs = [str(tmp_path / "out1.yaml"), str(tmp_path / "out2.yaml")]
+
+    for output_path in outputs:
+        session.compile_system(simple_system, output_path)
+
+    assert built == [simple_system]
+    with open(outputs[0]) as f1, open(outputs[1]) as f2:
+        assert f1.read() == f2.read()
+
+
+def test_parsed_systems_are_bounded(system_builder, monkeypatch):
+    blocks = [system_builder.block("display1", "Display", inputs=1)]
+    paths = [system_builder.write(blocks, [], name=f"system{i}.pslk") for i in range(3)]
+    monkeypatch.setattr(toolkit_session_module, "MAX_CACHED_SYSTEM_JSONS", 2)
+    monkeypatch.setattr(toolkit_session_module, "_system_jsons", OrderedDict())
+    session = ToolkitSession(system_builder.toolkit_config_path)
+    session.MAX_HIGH_LEVEL_SYSTEMS = 2
+
+    for path in paths:
+        session.get_high_level_system(path)
+
+    assert list(toolkit_session_module._system_jsons) == [os.path.abspath(p) for p in paths[1:]]
+    assert [key[0] for key in session._high_level_systems] == [os.path.abspath(p) for p in paths[1:]]
+
+
+def test_invalidate_only_drops_the_session_caches(system_builder, simple_system, tmp_path):
+    first = ToolkitSession(system_builder.toolkit_config_path)
+    second = ToolkitSession(system_builder.toolkit_config_path)
+    first.compile_system(simple_system, str(tmp_path / "out1.yaml"))
+    second.compile_system(simple_system, str(tmp_path / "out2.yaml"))
+    compilation_cache = BlockCompilationCache.get_default()
+
+    first.invalidate()
+    assert not first._high_level_systems
+    assert second._high_level_systems
+    assert len(compilation_cache) > 0
+    assert os.path.abspath(simple_system) in toolkit_session_module._system_jsons
+
+    clear_shared_caches()
+    assert len(compilation_cache) == 0
+    assert not toolkit_session_module._system_jsons